@@ -0,0 +1,210 @@
+import sys
+import json
+import uuid
+import asyncio
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from mcp_chatbot import MCP_ChatBot
+from tracing import tracer
+
+
+class ServiceBusy(Exception):
+    """대기 중인 요청이 한도를 넘어 새 요청을 받을 수 없을 때 발생"""
+
+
+class AgentService:
+    """
+    여러 사용자의 쿼리를 동시에 처리하는 헤드리스 에이전트.
+
+    모든 대화가 하나의 MCP_ChatBot(같은 서버 세션)을 공유하지만, 대화 기록은
+    conversation_id별로 따로 보관한다. 같은 대화의 쿼리는 순서대로, 서로 다른
+    대화는 최대 max_concurrency개까지 동시에 처리한다. 처리 중이거나 대기 중인
+    요청이 max_pending개를 넘으면 ServiceBusy로 거절한다.
+    """
+
+    def __init__(self, chatbot: MCP_ChatBot, max_concurrency: int = 8, max_pending: int = 64,
+                 timeout: float = 120.0, max_conversations: int = 1000):
+        self.chatbot = chatbot
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.max_conversations = max_conversations
+        self.pending = 0
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        # 대화 ID -> 메시지 기록 (오래 쓰지 않은 대화부터 정리)
+        self._conversations: "OrderedDict[str, List[Dict]]" = OrderedDict()
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    def _history(self, conversation_id: str) -> List[Dict]:
+        history = self._conversations.setdefault(conversation_id, [])
+        self._conversations.move_to_end(conversation_id)
+        while len(self._conversations) > self.max_conversations:
+            old_id, _ = self._conversations.popitem(last=False)
+            self._locks.pop(old_id, None)
+        return history
+
+    def end_conversation(self, conversation_id: str) -> None:
+        self._conversations.pop(conversation_id, None)
+        self._locks.pop(conversation_id, None)
+
+    async def query(self, text: str, conversation_id: Optional[str] = None) -> Dict:
+        """
+        쿼리 하나를 처리하고 {"conversation_id", "answer"}를 반환한다.
+
+        시간 제한을 넘기면 asyncio.TimeoutError, 대기열이 가득 차면 ServiceBusy.
+        실패한 쿼리는 대화 기록에 남기지 않는다.
+        """
+        if self.pending >= self.max_pending:
+            raise ServiceBusy(f"{self.pending}개의 요청이 처리 중이다.")
+        conversation_id = conversation_id or uuid.uuid4().hex
+        self.pending += 1
+        try:
+            lock = self._locks.setdefault(conversation_id, asyncio.Lock())
+            async with lock, self._semaphore:
+                history = self._history(conversation_id)
+                messages = list(history)
+                answer = await asyncio.wait_for(
+                    self.chatbot.run_query(text, messages), self.timeout
+                )
+                if answer is None:
+                    raise RuntimeError("도구 호출에 실패하여 응답을 만들지 못했다.")
+                history[:] = messages
+                return {"conversation_id": conversation_id, "answer": answer}
+        finally:
+            self.pending -= 1
+
+    async def prompt(self, prompt_name: str, args_list: List[Dict]) -> Dict:
+        """프롬프트를 여러 인자 조합으로 동시에 실행하고 합친 보고서를 반환한다."""
+        if self.pending >= self.max_pending:
+            raise ServiceBusy(f"{self.pending}개의 요청이 처리 중이다.")
+        self.pending += 1
+        try:
+            report = await asyncio.wait_for(
+                self.chatbot.run_prompt_fanout(prompt_name, args_list), self.timeout
+            )
+            return {"report": report}
+        finally:
+            self.pending -= 1
+
+    async def serve_jsonl(self, reader=sys.stdin, writer=sys.stdout) -> None:
+        """
+        한 줄에 하나씩 들어오는 JSON 요청을 처리하고 완료되는 순서대로 결과를 쓴다.
+
+        요청: {"id": ..., "query": "...", "conversation_id": "..."(선택)}
+        응답: {"id": ..., "conversation_id": "...", "answer": "..."} 또는 {"id": ..., "error": "..."}
+        대기열이 가득 차면 거절하지 않고 입력 읽기를 멈춰 생산자 쪽으로 압력을 전달한다.
+        """
+        slots = asyncio.Semaphore(self.max_pending)
+        tasks = set()
+
+        async def handle(request: Dict) -> None:
+            try:
+                response = await self.query(request["query"], request.get("conversation_id"))
+            except asyncio.TimeoutError:
+                response = {"error": f"{self.timeout}초 안에 응답하지 못했다."}
+            except Exception as e:
+                response = {"error": str(e)}
+            finally:
+                slots.release()
+            writer.write(json.dumps({"id": request.get("id"), **response}, ensure_ascii=False) + "\n")
+            writer.flush()
+
+        while True:
+            line = await asyncio.to_thread(reader.readline)
+            if not line:
+                break
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except json.JSONDecodeError as e:
+                writer.write(json.dumps({"error": f"잘못된 JSON: {e}"}, ensure_ascii=False) + "\n")
+                writer.flush()
+                continue
+            await slots.acquire()
+            task = asyncio.create_task(handle(request))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+
+        if tasks:
+            await asyncio.gather(*tasks)
+
+    def http_app(self):
+        """
+        HTTP 인터페이스를 제공하는 Starlette 앱을 만든다.
+
+        POST /query {"query": "...", "conversation_id": "..."(선택)}
+        POST /prompt {"name": "...", "arguments": [{...}, ...]}
+        DELETE /conversations/{conversation_id}
+        GET /health
+        """
+        from starlette.applications import Starlette
+        from starlette.requests import Request
+        from starlette.responses import JSONResponse
+        from starlette.routing import Route
+
+        async def query(request: Request) -> JSONResponse:
+            try:
+                body = await request.json()
+                text = body["query"]
+            except (json.JSONDecodeError, KeyError, TypeError):
+                return JSONResponse({"error": "'query' 필드가 필요하다."}, status_code=400)
+            try:
+                return JSONResponse(await self.query(text, body.get("conversation_id")))
+            except ServiceBusy as e:
+                return JSONResponse({"error": str(e)}, status_code=503, headers={"Retry-After": "1"})
+            except asyncio.TimeoutError:
+                return JSONResponse({"error": f"{self.timeout}초 안에 응답하지 못했다."}, status_code=504)
+            except Exception as e:
+                return JSONResponse({"error": str(e)}, status_code=500)
+
+        async def prompt(request: Request) -> JSONResponse:
+            try:
+                body = await request.json()
+                name, args_list = body["name"], body["arguments"]
+            except (json.JSONDecodeError, KeyError, TypeError):
+                return JSONResponse({"error": "'name'과 'arguments' 필드가 필요하다."}, status_code=400)
+            try:
+                return JSONResponse(await self.prompt(name, args_list))
+            except ServiceBusy as e:
+                return JSONResponse({"error": str(e)}, status_code=503, headers={"Retry-After": "1"})
+            except asyncio.TimeoutError:
+                return JSONResponse({"error": f"{self.timeout}초 안에 응답하지 못했다."}, status_code=504)
+            except Exception as e:
+                return JSONResponse({"error": str(e)}, status_code=500)
+
+        async def end_conversation(request: Request) -> JSONResponse:
+            self.end_conversation(request.path_params["conversation_id"])
+            return JSONResponse({"ok": True})
+
+        async def health(request: Request) -> JSONResponse:
+            return JSONResponse({"pending": self.pending, "conversations": len(self._conversations)})
+
+        return Starlette(routes=[
+            Route("/query", query, methods=["POST"]),
+            Route("/prompt", prompt, methods=["POST"]),
+            Route("/conversations/{conversation_id}", end_conversation, methods=["DELETE"]),
+            Route("/health", health, methods=["GET"]),
+        ])
+
+
+async def run_service(transport: str = "stdin", host: str = "127.0.0.1", port: int = 8080,
+                      max_concurrency: int = 8, max_pending: int = 64, timeout: float = 120.0) -> None:
+    """서버에 연결한 뒤 stdin JSONL 또는 HTTP로 쿼리를 받는다"""
+    from dotenv import load_dotenv
+
+    # 환경 변수 로드
+    load_dotenv()
+    tracer.configure("mcp-chatbot")
+    chatbot = MCP_ChatBot()
+    try:
+        await chatbot.connect_to_servers()
+        service = AgentService(chatbot, max_concurrency, max_pending, timeout)
+        if transport == "http":
+            import uvicorn
+            server = uvicorn.Server(uvicorn.Config(service.http_app(), host=host, port=port))
+            await server.serve()
+        else:
+            await service.serve_jsonl()
+    finally:
+        await chatbot.cleanup()
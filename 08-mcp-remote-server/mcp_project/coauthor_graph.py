@@ -0,0 +1,261 @@
+import os
+import threading
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from paper_store import PaperRecord, PaperStore, author_key
+
+# 저자가 이보다 많은 논문(대형 공동 연구)은 공저 간선을 만들지 않는다
+MAX_AUTHORS_PER_PAPER = int(os.getenv("COAUTHOR_MAX_AUTHORS", "100"))
+RANK_METHODS = ("degree", "pagerank")
+
+
+def _csr(src, dst, weights, n: int):
+    """간선 목록(같은 간선은 가중치를 더한다)을 CSR 인접 배열 (indptr, indices, weights)로 만든다"""
+    import numpy as np
+
+    keys = src.astype(np.int64) * n + dst
+    unique, inverse = np.unique(keys, return_inverse=True)
+    summed = np.bincount(inverse, weights=weights).astype(np.int32)
+    keep = summed > 0
+    unique, summed = unique[keep], summed[keep]
+    rows = unique // n
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+    return indptr, (unique % n).astype(np.int32), summed
+
+
+def _pagerank(indptr, indices, weights, damping: float = 0.85, tol: float = 1e-8,
+              max_iter: int = 100):
+    """공저 논문 수를 가중치로 한 PageRank. 공저자가 없는 저자의 점수는 모두에게 고르게 나눈다"""
+    import numpy as np
+
+    n = len(indptr) - 1
+    if n == 0:
+        return np.zeros(0)
+    rows = np.repeat(np.arange(n), np.diff(indptr))
+    out_weight = np.bincount(rows, weights=weights, minlength=n)
+    dangling = out_weight == 0
+    share = np.divide(weights, out_weight[rows], out=np.zeros(len(weights)), where=out_weight[rows] > 0)
+    rank = np.full(n, 1.0 / n)
+    for _ in range(max_iter):
+        spread = np.bincount(indices, weights=rank[rows] * share, minlength=n)
+        updated = (1 - damping) / n + damping * (spread + rank[dangling].sum() / n)
+        done = np.abs(updated - rank).sum() < tol
+        rank = updated
+        if done:
+            break
+    return rank
+
+
+class CoauthorGraph:
+    """
+    저자 공저 관계 그래프.
+
+    저자 이름은 정규화한 키(author_key)마다 정수 ID로 바꾸고, 공저 관계는 ID 쌍의
+    간선 목록(array)에 덧붙인다. 질의할 때 간선 목록을 CSR 인접 배열로 합치고(같은
+    쌍은 공저 논문 수를 가중치로 더한다) 이웃, 차수, PageRank, 최단 경로를 numpy
+    배열 연산으로 계산한다.
+
+    그래프는 코퍼스 로그를 마지막으로 읽은 위치부터 이어서 갱신하므로, 다른 프로세스가
+    추가한 논문도 다음 질의에 반영된다. 저자가 바뀐 논문은 이전 간선을 음의 가중치로
+    상쇄한다. 로그가 다시 쓰였으면(dedupe) 처음부터 다시 만든다.
+    """
+
+    def __init__(self, store: PaperStore):
+        self.store = store
+        # 정규화한 저자 키 -> 저자 ID, 저자 ID -> 표시 이름 (처음 나온 표기)
+        self._ids: Dict[str, int] = {}
+        self.names: List[str] = []
+        # 논문 ID -> 간선을 만든 저자 ID 목록
+        self._paper_authors: Dict[str, Tuple[int, ...]] = {}
+        # 아직 CSR에 합치지 않은 간선 (양방향으로 하나씩)
+        self._src = array("i")
+        self._dst = array("i")
+        self._weights = array("i")
+        self._csr = None
+        self._pagerank = None
+        # 읽은 코퍼스 로그의 (inode, 위치)
+        self._corpus: Tuple[Optional[int], int] = (None, 0)
+        self._lock = threading.Lock()
+
+    # ---- 갱신 ----
+
+    def _intern(self, name: str) -> int:
+        key = author_key(name)
+        author_id = self._ids.get(key)
+        if author_id is None:
+            author_id = self._ids[key] = len(self.names)
+            self.names.append(name)
+        return author_id
+
+    def _add_edges(self, authors: Tuple[int, ...], weight: int) -> None:
+        for a in authors:
+            for b in authors:
+                if a != b:
+                    self._src.append(a)
+                    self._dst.append(b)
+                    self._weights.append(weight)
+
+    def _add_record(self, record: PaperRecord) -> None:
+        authors = tuple(dict.fromkeys(self._intern(name) for name in record.authors))
+        if len(authors) > MAX_AUTHORS_PER_PAPER:
+            authors = ()
+        previous = self._paper_authors.get(record.paper_id)
+        if previous == authors:
+            return
+        if previous:
+            self._add_edges(previous, -1)
+        self._add_edges(authors, 1)
+        self._paper_authors[record.paper_id] = authors
+        self._csr = self._pagerank = None
+
+    def _reset(self) -> None:
+        self._ids.clear()
+        self.names.clear()
+        self._paper_authors.clear()
+        self._src, self._dst, self._weights = array("i"), array("i"), array("i")
+        self._csr = self._pagerank = None
+
+    def refresh(self) -> None:
+        """코퍼스 로그에 새로 덧붙은 논문을 그래프에 반영한다"""
+        try:
+            st = os.stat(self.store.corpus_path)
+        except FileNotFoundError:
+            self._reset()
+            self._corpus = (None, 0)
+            return
+        inode, offset = self._corpus
+        if inode == st.st_ino and offset == st.st_size:
+            return
+        if inode != st.st_ino or st.st_size < offset:
+            self._reset()
+            records, offset = self.store.snapshot()
+        else:
+            records, offset = self.store.records_since(offset)
+        for record in records:
+            self._add_record(record)
+        self._corpus = (st.st_ino, offset)
+
+    def _adjacency(self):
+        """CSR 인접 배열. 쌓인 간선을 합친 결과로 간선 목록도 다시 채워 둔다"""
+        import numpy as np
+
+        if self._csr is None:
+            n = len(self.names)
+            src = np.frombuffer(self._src, dtype=np.int32)
+            dst = np.frombuffer(self._dst, dtype=np.int32)
+            weights = np.frombuffer(self._weights, dtype=np.int32)
+            indptr, indices, merged = _csr(src, dst, weights, n)
+            self._csr = (indptr, indices, merged)
+            rows = np.repeat(np.arange(n, dtype=np.int32), np.diff(indptr))
+            self._src, self._dst = array("i", rows.tobytes()), array("i", indices.tobytes())
+            self._weights = array("i", merged.tobytes())
+        return self._csr
+
+    def _topic_adjacency(self, paper_ids: Iterable[str]):
+        import numpy as np
+
+        src, dst = array("i"), array("i")
+        for paper_id in paper_ids:
+            authors = self._paper_authors.get(paper_id, ())
+            for a in authors:
+                for b in authors:
+                    if a != b:
+                        src.append(a)
+                        dst.append(b)
+        src = np.frombuffer(src, dtype=np.int32)
+        return _csr(src, np.frombuffer(dst, dtype=np.int32), np.ones(len(src)), len(self.names))
+
+    # ---- 질의 ----
+
+    def find(self, name: str) -> int:
+        """저자 이름의 ID. 없으면 이름이 비슷한 저자를 담은 KeyError"""
+        author_id = self._ids.get(author_key(name))
+        if author_id is not None:
+            return author_id
+        query = author_key(name)
+        similar = [self.names[i] for key, i in self._ids.items() if query in key][:5]
+        hint = f" 비슷한 이름: {', '.join(similar)}" if similar else ""
+        raise KeyError(f"저자를 찾을 수 없음: {name}.{hint}")
+
+    def neighbors(self, name: str, limit: int = 20) -> List[Tuple[str, int]]:
+        """공저자와 함께 쓴 논문 수를 많은 순서로 반환한다"""
+        import numpy as np
+
+        with self._lock:
+            self.refresh()
+            author_id = self.find(name)
+            indptr, indices, weights = self._adjacency()
+            start, end = indptr[author_id], indptr[author_id + 1]
+            order = np.argsort(-weights[start:end], kind="stable")[:limit]
+            return [(self.names[indices[start + i]], int(weights[start + i])) for i in order]
+
+    def top(self, by: str = "degree", k: int = 10,
+            paper_ids: Optional[Iterable[str]] = None) -> List[Tuple[str, float]]:
+        """
+        공저자 수(degree) 또는 PageRank가 가장 큰 저자 k명을 반환한다.
+
+        paper_ids를 주면 그 논문들(예: 한 주제)만으로 만든 부분 그래프에서 계산한다.
+        """
+        import numpy as np
+
+        if by not in RANK_METHODS:
+            raise ValueError(f"by는 {', '.join(RANK_METHODS)} 중 하나여야 한다: {by}")
+        with self._lock:
+            self.refresh()
+            if paper_ids is None:
+                indptr, indices, weights = self._adjacency()
+            else:
+                indptr, indices, weights = self._topic_adjacency(paper_ids)
+            if by == "degree":
+                scores = np.diff(indptr).astype(np.float64)
+            elif paper_ids is None:
+                if self._pagerank is None:
+                    self._pagerank = _pagerank(indptr, indices, weights)
+                scores = self._pagerank
+            else:
+                # 부분 그래프에 속한 저자만으로 PageRank를 계산한다
+                members = np.flatnonzero(np.diff(indptr))
+                local = np.full(len(indptr) - 1, -1, dtype=np.int64)
+                local[members] = np.arange(len(members))
+                counts = np.diff(indptr)[members]
+                sub_indptr = np.zeros(len(members) + 1, dtype=np.int64)
+                np.cumsum(counts, out=sub_indptr[1:])
+                scores = np.zeros(len(indptr) - 1)
+                scores[members] = _pagerank(sub_indptr, local[indices], weights)
+            k = min(k, int(np.count_nonzero(np.diff(indptr))))
+            if k <= 0:
+                return []
+            best = np.argpartition(-scores, k - 1)[:k]
+            best = best[np.argsort(-scores[best], kind="stable")]
+            return [(self.names[i], float(scores[i])) for i in best]
+
+    def shortest_path(self, source: str, target: str, max_hops: int = 6) -> Optional[List[str]]:
+        """두 저자를 잇는 가장 짧은 공저 경로(저자 이름 목록). max_hops 안에 없으면 None"""
+        import numpy as np
+
+        with self._lock:
+            self.refresh()
+            start, goal = self.find(source), self.find(target)
+            indptr, indices, _ = self._adjacency()
+            parent = np.full(len(self.names), -1, dtype=np.int64)
+            parent[start] = start
+            frontier = np.array([start], dtype=np.int64)
+            for _ in range(max_hops):
+                if parent[goal] >= 0 or len(frontier) == 0:
+                    break
+                # 현재 단계 저자들의 인접 구간을 한 번에 모은다
+                starts, counts = indptr[frontier], indptr[frontier + 1] - indptr[frontier]
+                positions = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+                neighbors, parents = indices[positions], np.repeat(frontier, counts)
+                unseen = parent[neighbors] < 0
+                neighbors, first = np.unique(neighbors[unseen], return_index=True)
+                parent[neighbors] = parents[unseen][first]
+                frontier = neighbors
+            if parent[goal] < 0:
+                return None
+            path = [goal]
+            while path[-1] != start:
+                path.append(int(parent[path[-1]]))
+            return [self.names[i] for i in reversed(path)]
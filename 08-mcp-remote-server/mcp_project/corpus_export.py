@@ -0,0 +1,297 @@
+import os
+import json
+import time
+import shutil
+import tempfile
+from typing import Dict, List, Optional, Tuple
+
+from paper_store import PaperRecord, PaperStore
+
+# 내보내기 상태 파일 (형식, 마지막으로 내보낸 코퍼스 로그 위치, 조각 수)
+STATE_FILE = "export.json"
+EXPORT_FORMATS = ("arrow", "parquet", "numpy")
+# 논문 표의 열 중 문자열 열 (그 밖에 authors는 문자열 목록, published는 날짜)
+STRING_COLUMNS = ("paper_id", "title", "summary", "pdf_url")
+
+
+def default_format() -> str:
+    """pyarrow가 있으면 메모리 매핑으로 읽을 수 있는 Arrow IPC, 없으면 NumPy 배열"""
+    try:
+        import pyarrow  # noqa: F401
+        return "arrow"
+    except ImportError:
+        return "numpy"
+
+
+def _import_backend(fmt: str) -> None:
+    """형식에 필요한 패키지를 미리 읽어, 없으면 디스크를 건드리기 전에 ImportError를 낸다."""
+    import numpy  # noqa: F401
+    if fmt == "parquet":
+        import pyarrow.parquet  # noqa: F401
+    elif fmt == "arrow":
+        import pyarrow.feather  # noqa: F401
+
+
+def _date(published: str) -> str:
+    # arXiv 발행일은 "2024-01-31" 또는 "2024-01-31T12:00:00" 형태다
+    return published[:10] if len(published) >= 10 else "NaT"
+
+
+# ---- Arrow / Parquet ----
+
+def _arrow_table(records: List[PaperRecord]):
+    import numpy as np
+    import pyarrow as pa
+
+    published = np.array([_date(r.published) for r in records], dtype="datetime64[D]")
+    return pa.table({
+        "paper_id": pa.array([r.paper_id for r in records], pa.string()),
+        "title": pa.array([r.title for r in records], pa.string()),
+        "authors": pa.array([list(r.authors) for r in records], pa.list_(pa.string())),
+        "summary": pa.array([r.summary for r in records], pa.string()),
+        "pdf_url": pa.array([r.pdf_url for r in records], pa.string()),
+        "published": pa.array(published, pa.date32(), mask=np.isnat(published)),
+    })
+
+
+def _write_arrow(table, path: str, fmt: str) -> None:
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        pq.write_table(table, path)
+    else:
+        import pyarrow.feather as feather
+        # 압축하지 않아야 읽을 때 메모리 매핑으로 복사 없이 쓸 수 있다
+        feather.write_feather(table, path, compression="uncompressed")
+
+
+def _topics_table(memberships: List[Tuple[str, str]]):
+    import pyarrow as pa
+
+    return pa.table({
+        "topic": pa.array([topic for topic, _ in memberships], pa.string()),
+        "paper_id": pa.array([paper_id for _, paper_id in memberships], pa.string()),
+    })
+
+
+# ---- NumPy ----
+
+def _save_strings(directory: str, name: str, values: List[str]) -> None:
+    """문자열 목록을 UTF-8 바이트 배열과 시작 위치 배열 두 개로 저장한다 (Arrow 문자열 배치와 같다)."""
+    import numpy as np
+
+    encoded = [value.encode("utf-8") for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    np.save(os.path.join(directory, f"{name}.data.npy"), np.frombuffer(b"".join(encoded), dtype=np.uint8))
+    np.save(os.path.join(directory, f"{name}.offsets.npy"), offsets)
+
+
+def _write_numpy(records: List[PaperRecord], directory: str) -> None:
+    import numpy as np
+
+    os.makedirs(directory, exist_ok=True)
+    for name in STRING_COLUMNS:
+        _save_strings(directory, name, [getattr(r, name) for r in records])
+    # 저자는 모든 이름을 이어 붙인 문자열 열과, 논문별 시작 위치로 저장한다
+    _save_strings(directory, "authors", [name for r in records for name in r.authors])
+    lists = np.zeros(len(records) + 1, dtype=np.int64)
+    np.cumsum([len(r.authors) for r in records], out=lists[1:])
+    np.save(os.path.join(directory, "authors.lists.npy"), lists)
+    np.save(os.path.join(directory, "published.npy"),
+            np.array([_date(r.published) for r in records], dtype="datetime64[D]"))
+
+
+class StringColumn:
+    """메모리 매핑한 UTF-8 바이트 배열과 시작 위치 배열로 된 문자열 열"""
+
+    def __init__(self, data, offsets):
+        self.data = data
+        self.offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> str:
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return self.data[start:end].tobytes().decode("utf-8")
+
+    def to_list(self) -> List[str]:
+        data = self.data.tobytes()
+        offsets = self.offsets.tolist()
+        return [data[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(self))]
+
+
+def _load_strings(directory: str, name: str) -> StringColumn:
+    import numpy as np
+
+    return StringColumn(np.load(os.path.join(directory, f"{name}.data.npy"), mmap_mode="r"),
+                        np.load(os.path.join(directory, f"{name}.offsets.npy"), mmap_mode="r"))
+
+
+def _load_numpy(directory: str) -> Dict:
+    import numpy as np
+
+    columns = {name: _load_strings(directory, name) for name in STRING_COLUMNS}
+    columns["authors"] = _load_strings(directory, "authors")
+    columns["authors_lists"] = np.load(os.path.join(directory, "authors.lists.npy"), mmap_mode="r")
+    columns["published"] = np.load(os.path.join(directory, "published.npy"), mmap_mode="r")
+    return columns
+
+
+# ---- 내보내기 ----
+
+def _part_name(index: int, fmt: str) -> str:
+    suffix = {"arrow": ".arrow", "parquet": ".parquet", "numpy": ""}[fmt]
+    return f"part-{index:05d}{suffix}"
+
+
+def _load_state(out_dir: str) -> Optional[Dict]:
+    try:
+        with open(os.path.join(out_dir, STATE_FILE), "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _save_state(out_dir: str, state: Dict) -> None:
+    path = os.path.join(out_dir, STATE_FILE)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _memberships(store: PaperStore) -> List[Tuple[str, str]]:
+    return [(key, paper_id) for key in sorted(store.topic_dirs()) for paper_id in store.load_topic(key)]
+
+
+def _write_topics(memberships: List[Tuple[str, str]], path: str, fmt: str) -> None:
+    if fmt == "numpy":
+        os.makedirs(path, exist_ok=True)
+        _save_strings(path, "topic", [topic for topic, _ in memberships])
+        _save_strings(path, "paper_id", [paper_id for _, paper_id in memberships])
+    else:
+        _write_arrow(_topics_table(memberships), path, fmt)
+
+
+def _move_into(src: str, dst: str, trash: str) -> None:
+    """src를 dst 자리로 옮긴다. 이미 있는 dst(디렉토리일 수도 있다)는 trash로 치운다."""
+    if os.path.lexists(dst):
+        os.replace(dst, os.path.join(trash, os.path.basename(dst)))
+    os.replace(src, dst)
+
+
+def export_corpus(store: PaperStore, out_dir: str, fmt: Optional[str] = None,
+                  incremental: bool = True) -> Dict:
+    """
+    코퍼스를 열 단위 파일로 내보낸다.
+
+    논문 표는 조각 파일(part-00000, part-00001, ...)로 나뉘며, 증분 모드에서는 지난
+    내보내기 이후 코퍼스 로그에 덧붙은 레코드만 새 조각으로 추가한다. 내용이 바뀐
+    논문은 새 조각에 다시 나오므로 paper_id별로 마지막 행이 최신이다. 코퍼스 로그가
+    다시 쓰였거나(dedupe) 형식이 다르면 처음부터 다시 내보낸다. 주제 소속 표(topic,
+    paper_id)는 작으므로 매번 새로 쓴다.
+
+    새 파일은 out_dir 안의 임시 디렉토리에 모두 쓴 뒤 제자리로 옮기고, export.json은
+    마지막에 쓴다. 그래서 필요한 패키지가 없거나 쓰는 도중 실패해도 이전 내보내기가
+    그대로 남는다.
+
+    fmt:
+        arrow: 압축하지 않은 Arrow IPC(Feather) 파일. 메모리 매핑으로 복사 없이 읽는다
+        parquet: Parquet 파일
+        numpy: 조각마다 .npy 파일을 담은 디렉토리. 문자열은 UTF-8 바이트와 시작 위치 배열
+        None: pyarrow가 있으면 arrow, 없으면 numpy
+
+    반환:
+        형식, 이번에 쓴 행 수, 전체 행 수, 조각 수, 경로
+    """
+    fmt = fmt or default_format()
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"알 수 없는 내보내기 형식: {fmt}")
+    _import_backend(fmt)
+    papers_dir = os.path.join(out_dir, "papers")
+
+    try:
+        corpus_inode = os.stat(store.corpus_path).st_ino
+    except FileNotFoundError:
+        corpus_inode = None
+    state = _load_state(out_dir) if incremental else None
+    if state is not None and (
+            state.get("format") != fmt or state.get("corpus_inode") != corpus_inode
+            or not os.path.isdir(papers_dir)
+            or (corpus_inode is not None and os.path.getsize(store.corpus_path) < state["corpus_offset"])):
+        state = None
+
+    rebuild = state is None
+    if rebuild:
+        records, offset = store.snapshot()
+        state = {"format": fmt, "corpus_inode": corpus_inode, "corpus_offset": 0, "parts": 0, "rows": 0}
+    elif corpus_inode is not None:
+        records, offset = store.records_since(state["corpus_offset"])
+    else:
+        records, offset = [], 0
+
+    os.makedirs(out_dir, exist_ok=True)
+    work_dir = tempfile.mkdtemp(prefix=".export-", dir=out_dir)
+    try:
+        new_papers = os.path.join(work_dir, "papers")
+        os.makedirs(new_papers)
+        if records:
+            path = os.path.join(new_papers, _part_name(state["parts"], fmt))
+            if fmt == "numpy":
+                _write_numpy(records, path)
+            else:
+                _write_arrow(_arrow_table(records), path, fmt)
+        topics_name = "topics" if fmt == "numpy" else f"topics.{fmt}"
+        _write_topics(_memberships(store), os.path.join(work_dir, topics_name), fmt)
+
+        # 새 파일이 모두 준비된 뒤에만 이전 내보내기를 바꾼다
+        trash = os.path.join(work_dir, "old")
+        os.makedirs(trash)
+        if rebuild:
+            # 옮기는 동안에는 상태 파일을 없애 두어 섞인 내보내기를 읽지 않게 한다
+            if os.path.exists(os.path.join(out_dir, STATE_FILE)):
+                os.remove(os.path.join(out_dir, STATE_FILE))
+            for name in ("topics", "topics.arrow", "topics.parquet"):
+                if os.path.lexists(os.path.join(out_dir, name)):
+                    os.replace(os.path.join(out_dir, name), os.path.join(trash, name))
+            _move_into(new_papers, papers_dir, trash)
+        else:
+            for name in os.listdir(new_papers):
+                _move_into(os.path.join(new_papers, name), os.path.join(papers_dir, name), trash)
+        _move_into(os.path.join(work_dir, topics_name), os.path.join(out_dir, topics_name), trash)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    if records:
+        state["parts"] += 1
+        state["rows"] += len(records)
+    state.update(corpus_offset=offset, exported_at=time.time())
+    _save_state(out_dir, state)
+    return {"format": fmt, "rows_written": len(records), "rows": state["rows"],
+            "parts": state["parts"], "path": out_dir}
+
+
+def load_export(out_dir: str):
+    """
+    내보낸 논문 표를 읽는다.
+
+    arrow/parquet 형식은 조각을 이어 붙인 pyarrow.Table을 반환한다 (arrow는 메모리
+    매핑이라 복사하지 않는다). numpy 형식은 조각마다 열 이름 -> 배열(문자열 열은
+    StringColumn, authors_lists는 논문별 저자 시작 위치) dict의 목록을 반환한다.
+    """
+    state = _load_state(out_dir)
+    if state is None:
+        raise FileNotFoundError(f"내보낸 코퍼스가 없음: {out_dir}")
+    fmt = state["format"]
+    paths = [os.path.join(out_dir, "papers", _part_name(i, fmt)) for i in range(state["parts"])]
+    if fmt == "numpy":
+        return [_load_numpy(path) for path in paths]
+
+    import pyarrow as pa
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        tables = [pq.read_table(path, memory_map=True) for path in paths]
+    else:
+        tables = [pa.ipc.open_file(pa.memory_map(path, "r")).read_all() for path in paths]
+    return pa.concat_tables(tables) if tables else _arrow_table([])
@@ -0,0 +1,85 @@
+import os
+import json
+import threading
+from typing import Dict, List, Optional
+
+
+class DiskCache:
+    """
+    키별 JSON 항목을 디스크에 저장하는 크기 제한 캐시.
+
+    항목은 cache_dir/<키 앞 2자리>/<키>.json 파일이다. 전체 크기가 max_bytes를
+    넘으면 가장 오래 쓰지 않은(mtime 기준) 항목부터 max_bytes의 90%까지 지운다.
+    파일 단위로 원자적으로 쓰므로 여러 프로세스가 같은 디렉토리를 공유해도 된다.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total_bytes: Optional[int] = None
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key + ".json")
+
+    def _entries(self) -> List[tuple]:
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for name in files:
+                if name.endswith(".json"):
+                    path = os.path.join(root, name)
+                    try:
+                        st = os.stat(path)
+                    except FileNotFoundError:
+                        continue
+                    entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def load(self, key: str) -> Optional[Dict]:
+        """저장된 항목을 읽는다. 없거나 손상되었으면 None"""
+        path = self.path(key)
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+            # 최근 사용 시각을 갱신해 제거 순서를 뒤로 미룬다
+            os.utime(path)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return entry
+
+    def store(self, key: str, entry: Dict) -> None:
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = json.dumps(entry, ensure_ascii=False).encode("utf-8")
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        try:
+            # 같은 키를 덮어쓰면 이전 파일 크기만큼 줄어든다
+            replaced = os.path.getsize(path)
+        except FileNotFoundError:
+            replaced = 0
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            if self._total_bytes is None:
+                self._total_bytes = sum(size for _, size, _ in self._entries())
+            else:
+                self._total_bytes += len(data) - replaced
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+
+    def _evict(self) -> None:
+        # 다른 프로세스가 쓴 항목까지 반영하도록 디렉토리를 다시 훑는다
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 0.9
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._total_bytes = total
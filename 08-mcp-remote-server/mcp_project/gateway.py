@@ -0,0 +1,351 @@
+from __future__ import annotations
+
+import json
+import asyncio
+import hashlib
+import itertools
+import weakref
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+import metrics
+from server_manager import Router, ServerManager
+
+if TYPE_CHECKING:
+    from mcp import ClientSession, types
+
+gateway_requests = metrics.registry.counter(
+    "gateway_requests_total", "게이트웨이가 백엔드로 전달한 요청 수", ("server", "method", "result"))
+
+# 게이트웨이 기본 포트 (research 서버는 8001)
+DEFAULT_PORT = 8002
+
+
+class Gateway:
+    """
+    설정된 MCP 서버들을 미리 띄워 두고 하나의 MCP 엔드포인트로 묶어 제공한다.
+
+    server_config.json의 서버마다 replicas개(기본값 1, 서버 설정의 "replicas"로 개별
+    지정)의 프로세스를 시작해 계속 유지한다. 도구/프롬프트 이름과 리소스 URI로 처리할
+    서버를 찾고, 그 서버의 복제본 중 처리 중인 요청이 가장 적은 것으로 보낸다.
+    같은 이름이 여러 서버에 있으면 설정 파일에서 먼저 나온 서버가 처리한다.
+
+    리소스 구독은 해당 서버의 모든 복제본에 걸어 두고, 어느 복제본에서 온 변경
+    알림이든 구독한 클라이언트 세션에 전달한다.
+
+    research 서버의 복제본들은 같은 papers 디렉토리를 쓴다. 코퍼스, topic.json,
+    catalog.json의 쓰기는 PaperStore가 파일 잠금으로 직렬화하고 다른 복제본의 쓰기는
+    다음 읽기에 반영되므로 replicas > 1로 띄워도 된다. 다만 본문 텍스트 캐시 같은
+    메모리 캐시는 복제본마다 따로 두므로, 같은 PDF를 복제본마다 한 번씩 읽을 수 있다.
+    PaperStore의 파일 잠금(fcntl)이 없는 Windows에서는 복제본을 하나만 둔다.
+    """
+
+    def __init__(self, server_configs: Dict[str, dict], replicas: int = 1):
+        from mcp.server.lowlevel import Server
+
+        self.server_configs = server_configs
+        # 서버 이름 -> 복제본 이름 목록 ("research#0", "research#1", ...)
+        self.replicas: Dict[str, List[str]] = {}
+        # 복제본은 유휴 상태여도 내리지 않는다
+        self.pool = ServerManager(idle_timeout=0, on_initialized=self._on_replica_initialized,
+                                  on_notification=self._on_replica_notification)
+        for name, config in server_configs.items():
+            config = dict(config)
+            count = int(config.pop("replicas", replicas))
+            self.replicas[name] = [f"{name}#{i}" for i in range(max(count, 1))]
+            for replica in self.replicas[name]:
+                self.pool.add(replica, config)
+        self._turns = itertools.count()
+
+        # 도구/프롬프트/리소스 목록과 이름 -> 서버 이름 라우팅 표
+        self.tools: List[types.Tool] = []
+        self.prompts: List[types.Prompt] = []
+        self.resources: List[types.Resource] = []
+        self.resource_templates: List[types.ResourceTemplate] = []
+        self.router = Router()
+        self.subscribable: set = set()
+        # 리소스 URI -> 구독한 클라이언트 세션 (연결이 끊긴 세션은 저절로 빠진다)
+        self._subscribers: Dict[str, weakref.WeakSet] = {}
+
+        self.server = Server("mcp-gateway")
+        self._install_handlers()
+
+    # ---- 복제본 풀 ----
+
+    def pick_replica(self, server_name: str) -> str:
+        """처리 중인 요청이 가장 적은 복제본을 고른다. 같으면 돌아가며 고른다"""
+        replicas = self.replicas[server_name]
+        start = next(self._turns) % len(replicas)
+        rotated = replicas[start:] + replicas[:start]
+        return min(rotated, key=lambda replica: self.pool.servers[replica].in_use)
+
+    async def start(self) -> None:
+        """모든 복제본을 띄우고, 서버마다 첫 복제본에서 기능 목록을 모은다"""
+        await asyncio.gather(*(
+            self._start_replica(replica)
+            for replicas in self.replicas.values() for replica in replicas
+        ))
+        for name, replicas in self.replicas.items():
+            session = next(
+                (self.pool.servers[r].session for r in replicas if self.pool.servers[r].running), None)
+            if session is None:
+                print(f"Gateway: '{name}' 서버의 복제본을 하나도 시작하지 못했다.")
+                continue
+            await self._discover(name, session, self.pool.servers[replicas[0]].init_result)
+        self.server.version = self._version()
+        print(f"Gateway: 서버 {len(self.replicas)}개, 복제본 {len(self.pool.servers)}개, "
+              f"도구 {len(self.tools)}개, 프롬프트 {len(self.prompts)}개")
+
+    async def _start_replica(self, replica: str) -> None:
+        try:
+            await self.pool.session(replica)
+        except Exception as e:
+            print(f"Error starting {replica}: {e}")
+
+    async def _discover(self, server_name: str, session: ClientSession,
+                        init: Optional[types.InitializeResult]) -> None:
+        from mcp.shared.exceptions import McpError
+
+        capabilities = init.capabilities if init else None
+        if capabilities is None or capabilities.tools:
+            for tool in (await session.list_tools()).tools:
+                self._route(tool.name, server_name, self.tools, tool)
+        if capabilities is None or capabilities.prompts:
+            try:
+                for prompt in (await session.list_prompts()).prompts:
+                    self._route(prompt.name, server_name, self.prompts, prompt)
+            except McpError:
+                pass
+        if capabilities is None or capabilities.resources:
+            try:
+                for resource in (await session.list_resources()).resources:
+                    self._route(str(resource.uri), server_name, self.resources, resource)
+                for template in (await session.list_resource_templates()).resourceTemplates:
+                    self.router.add_template(template.uriTemplate, server_name)
+                    self.resource_templates.append(template)
+            except McpError:
+                pass
+            if capabilities and capabilities.resources and capabilities.resources.subscribe:
+                self.subscribable.add(server_name)
+
+    def _route(self, name: str, server_name: str, items: list, item) -> None:
+        if self.router.add(name, server_name):
+            items.append(item)
+
+    def _version(self) -> str:
+        """모은 기능 목록의 해시. 챗봇은 이 값이 바뀌었을 때만 기능 목록을 다시 읽는다"""
+        listing = [
+            [item.model_dump(mode="json") for item in items]
+            for items in (self.tools, self.prompts, self.resources, self.resource_templates)
+        ]
+        payload = json.dumps(listing, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:12]
+
+    async def _on_replica_initialized(self, replica: str, session: ClientSession,
+                                      init: types.InitializeResult) -> None:
+        """복제본이 다시 시작되면 그 서버에 걸려 있던 구독을 복원한다"""
+        from pydantic import AnyUrl
+
+        server_name = replica.rsplit("#", 1)[0]
+        for uri in list(self._subscribers):
+            if self.router.server_for(uri) == server_name:
+                await session.subscribe_resource(AnyUrl(uri))
+
+    async def _on_replica_notification(self, replica: str, notification: types.ServerNotification) -> None:
+        """복제본의 리소스 변경 알림을 구독한 클라이언트에 전달한다"""
+        from mcp import types
+
+        if not isinstance(notification.root, types.ResourceUpdatedNotification):
+            return
+        uri = notification.root.params.uri
+        for session in list(self._subscribers.get(str(uri), ())):
+            try:
+                await session.send_resource_updated(uri)
+            except Exception:
+                # 닫힌 세션은 구독에서 뺀다
+                self._subscribers.get(str(uri), weakref.WeakSet()).discard(session)
+
+    async def forward(self, server_name: str, request, result_type):
+        """요청을 서버의 복제본 하나로 그대로 전달하고 결과를 반환한다"""
+        from mcp import types
+
+        replica = self.pick_replica(server_name)
+        method = request.method
+        try:
+            async with self.pool.use(replica) as session:
+                # 받은 요청에는 JSON-RPC 봉투 필드가 남아 있으므로 method/params만 옮긴다
+                forwarded = type(request)(method=request.method, params=request.params)
+                result = await session.send_request(types.ClientRequest(forwarded), result_type)
+        except Exception:
+            gateway_requests.inc(server=server_name, method=method, result="error")
+            raise
+        gateway_requests.inc(server=server_name, method=method, result="ok")
+        return types.ServerResult(result)
+
+    async def _for_all_replicas(self, server_name: str, call) -> None:
+        async def run(replica: str) -> None:
+            await call(await self.pool.session(replica))
+
+        await asyncio.gather(*(run(replica) for replica in self.replicas[server_name]))
+
+    # ---- MCP 요청 처리기 ----
+
+    def _install_handlers(self) -> None:
+        from mcp import types
+        from mcp.shared.exceptions import McpError
+
+        def not_found(what: str) -> McpError:
+            return McpError(types.ErrorData(code=types.INVALID_PARAMS, message=f"처리할 서버가 없음: {what}"))
+
+        async def list_tools(request: types.ListToolsRequest) -> types.ServerResult:
+            return types.ServerResult(types.ListToolsResult(tools=self.tools))
+
+        async def call_tool(request: types.CallToolRequest) -> types.ServerResult:
+            server_name = self.router.server_for(request.params.name)
+            if server_name is None:
+                raise not_found(request.params.name)
+            return await self.forward(server_name, request, types.CallToolResult)
+
+        async def list_prompts(request: types.ListPromptsRequest) -> types.ServerResult:
+            return types.ServerResult(types.ListPromptsResult(prompts=self.prompts))
+
+        async def get_prompt(request: types.GetPromptRequest) -> types.ServerResult:
+            server_name = self.router.server_for(request.params.name)
+            if server_name is None:
+                raise not_found(request.params.name)
+            return await self.forward(server_name, request, types.GetPromptResult)
+
+        async def list_resources(request: types.ListResourcesRequest) -> types.ServerResult:
+            return types.ServerResult(types.ListResourcesResult(resources=self.resources))
+
+        async def list_resource_templates(request: types.ListResourceTemplatesRequest) -> types.ServerResult:
+            return types.ServerResult(types.ListResourceTemplatesResult(resourceTemplates=self.resource_templates))
+
+        async def read_resource(request: types.ReadResourceRequest) -> types.ServerResult:
+            server_name = self.router.server_for(str(request.params.uri))
+            if server_name is None:
+                raise not_found(str(request.params.uri))
+            return await self.forward(server_name, request, types.ReadResourceResult)
+
+        async def subscribe(request: types.SubscribeRequest) -> types.ServerResult:
+            uri = str(request.params.uri)
+            server_name = self.router.server_for(uri)
+            if server_name not in self.subscribable:
+                raise not_found(uri)
+            if uri not in self._subscribers:
+                await self._for_all_replicas(
+                    server_name, lambda session: session.subscribe_resource(request.params.uri))
+            self._subscribers.setdefault(uri, weakref.WeakSet()).add(self.server.request_context.session)
+            return types.ServerResult(types.EmptyResult())
+
+        async def unsubscribe(request: types.UnsubscribeRequest) -> types.ServerResult:
+            uri = str(request.params.uri)
+            sessions = self._subscribers.get(uri)
+            if sessions is not None:
+                sessions.discard(self.server.request_context.session)
+                if not sessions:
+                    # 마지막 구독자가 빠지면 복제본의 구독도 푼다
+                    del self._subscribers[uri]
+                    await self._for_all_replicas(
+                        self.router.server_for(uri), lambda session: session.unsubscribe_resource(request.params.uri))
+            return types.ServerResult(types.EmptyResult())
+
+        handlers = self.server.request_handlers
+        handlers[types.ListToolsRequest] = list_tools
+        handlers[types.CallToolRequest] = call_tool
+        handlers[types.ListPromptsRequest] = list_prompts
+        handlers[types.GetPromptRequest] = get_prompt
+        handlers[types.ListResourcesRequest] = list_resources
+        handlers[types.ListResourceTemplatesRequest] = list_resource_templates
+        handlers[types.ReadResourceRequest] = read_resource
+        handlers[types.SubscribeRequest] = subscribe
+        handlers[types.UnsubscribeRequest] = unsubscribe
+
+        get_capabilities = self.server.get_capabilities
+
+        def capabilities(*args, **kwargs):
+            # 구독을 지원하는 백엔드가 있을 때만 resources.subscribe를 광고한다
+            result = get_capabilities(*args, **kwargs)
+            if result.resources is not None:
+                result.resources.subscribe = bool(self.subscribable)
+            return result
+
+        self.server.get_capabilities = capabilities
+
+    # ---- 전송 계층 ----
+
+    def sse_app(self):
+        """
+        게이트웨이를 SSE로 제공하는 Starlette 앱을 만든다.
+
+        GET /sse, POST /messages/: MCP SSE 전송
+        GET /health: 복제본별 실행 여부와 처리 중인 요청 수
+        GET /metrics: Prometheus 텍스트 형식 지표
+        """
+        from contextlib import asynccontextmanager
+        from mcp.server.sse import SseServerTransport
+        from starlette.applications import Starlette
+        from starlette.requests import Request
+        from starlette.responses import JSONResponse, PlainTextResponse, Response
+        from starlette.routing import Mount, Route
+
+        sse = SseServerTransport("/messages/")
+
+        async def handle_sse(request: Request) -> Response:
+            async with sse.connect_sse(request.scope, request.receive, request._send) as (read, write):
+                await self.server.run(read, write, self.server.create_initialization_options())
+            return Response()
+
+        async def health(request: Request) -> JSONResponse:
+            return JSONResponse({
+                replica: {"running": server.running, "in_use": server.in_use}
+                for replica, server in self.pool.servers.items()
+            })
+
+        async def metrics_endpoint(request: Request) -> PlainTextResponse:
+            return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
+
+        @asynccontextmanager
+        async def lifespan(app):
+            await self.start()
+            try:
+                yield
+            finally:
+                await self.pool.aclose()
+
+        app = Starlette(lifespan=lifespan, routes=[
+            Route("/sse", handle_sse, methods=["GET"]),
+            Mount("/messages/", app=sse.handle_post_message),
+            Route("/health", health, methods=["GET"]),
+            Route("/metrics", metrics_endpoint, methods=["GET"]),
+        ])
+        return metrics.track_sse_sessions(app, "/sse")
+
+    async def run_stdio(self) -> None:
+        """게이트웨이를 stdio로 제공한다 (클라이언트 하나)"""
+        from mcp.server.stdio import stdio_server
+
+        await self.start()
+        try:
+            async with stdio_server() as (read, write):
+                await self.server.run(read, write, self.server.create_initialization_options())
+        finally:
+            await self.pool.aclose()
+
+
+def load_gateway(config_path: str = "server_config.json", replicas: int = 1) -> Gateway:
+    """설정 파일의 서버들로 게이트웨이를 만든다. url로 설정된 서버(다른 게이트웨이 등)도 묶을 수 있다"""
+    with open(config_path, "r") as f:
+        cfg = json.load(f)
+    return Gateway(cfg.get("mcpServers", {}), replicas)
+
+
+async def run_gateway(config_path: str = "server_config.json", transport: str = "sse",
+                      host: str = "127.0.0.1", port: int = DEFAULT_PORT, replicas: int = 1) -> None:
+    """게이트웨이를 SSE 또는 stdio로 실행한다"""
+    gateway = load_gateway(config_path, replicas)
+    if transport == "stdio":
+        await gateway.run_stdio()
+        return
+    import uvicorn
+    server = uvicorn.Server(uvicorn.Config(gateway.sse_app(), host=host, port=port))
+    await server.serve()
@@ -0,0 +1,379 @@
+import os
+import time
+import threading
+import contextvars
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional
+
+import arxiv
+
+from paper_store import PaperRecord, PaperStore, topic_key
+from tracing import tracer
+import metrics
+
+# arXiv API 이용 약관이 권장하는 요청 간격(초)
+ARXIV_REQUEST_INTERVAL = 3.0
+# arXiv API가 한 번에 돌려주는 최대 결과 수
+ARXIV_PAGE_SIZE = 100
+
+
+class RateLimiter:
+    """
+    여러 스레드가 공유하는 최소 요청 간격 제한기.
+
+    wait()를 호출한 순서대로 요청 슬롯을 예약하므로, 동시 작업 수와 관계없이
+    전체 요청 속도가 min_interval당 한 번을 넘지 않는다.
+    """
+
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+
+    def reserve(self, timeout: Optional[float] = None) -> Optional[float]:
+        """
+        다음 슬롯을 예약하고 그때까지 남은 시간(초)을 반환한다.
+
+        슬롯이 timeout초 뒤보다 늦으면 예약하지 않고 None을 반환한다.
+        """
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            if timeout is not None and slot - now > timeout:
+                return None
+            self._next_slot = slot + self.min_interval
+        return slot - now
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """다음 슬롯까지 기다린다. 슬롯이 timeout초 안에 오지 않으면 예약 없이 False."""
+        delay = self.reserve(timeout)
+        if delay is None:
+            return False
+        if delay > 0:
+            time.sleep(delay)
+        return True
+
+
+# 프로세스 전체에서 공유하는 arXiv 요청 제한기
+arxiv_limiter = RateLimiter(ARXIV_REQUEST_INTERVAL)
+
+
+def to_record(paper: arxiv.Result) -> PaperRecord:
+    """arxiv 검색 결과를 PaperRecord로 변환한다."""
+    return PaperRecord.from_dict(paper.get_short_id(), {
+        'title': paper.title,
+        'authors': [author.name for author in paper.authors],
+        'summary': paper.summary,
+        'pdf_url': paper.pdf_url,
+        'published': str(paper.published.date())
+    })
+
+
+def fetch_pages(topic: str, max_results: int,
+                page_size: int = ARXIV_PAGE_SIZE,
+                limiter: Optional[RateLimiter] = arxiv_limiter,
+                retries: int = 3, reserved: bool = False,
+                observe: Optional[Callable[[float], None]] = None) -> Iterator[List[PaperRecord]]:
+    """
+    주제에 대한 arXiv 검색 결과를 페이지 단위로 가져온다.
+
+    재시도를 포함한 모든 페이지 요청이 전역 제한기를 거치므로 여러 스레드에서
+    동시에 호출해도 된다. reserved이면 호출한 쪽에서 첫 요청의 슬롯을 이미 예약한
+    것으로 보고, 그 뒤의 요청만 제한기에서 슬롯을 받는다. observe는 요청마다 슬롯을
+    받은 뒤부터 잰 응답 시간으로 호출된다. 결과가 요청한 수보다 적게 오면 마지막
+    페이지로 보고 중단한다.
+    """
+    # 요청 간격과 재시도는 여기서 관리하므로 클라이언트 자체 지연과 재시도는 끈다
+    client = arxiv.Client(page_size=min(page_size, max_results), delay_seconds=0, num_retries=0)
+    offset = 0
+    while offset < max_results:
+        count = min(page_size, max_results - offset)
+        search = arxiv.Search(
+            query = topic,
+            max_results = offset + count,
+            sort_by = arxiv.SortCriterion.Relevance
+        )
+        for attempt in range(retries + 1):
+            if reserved:
+                reserved = False
+            elif limiter:
+                limiter.wait()
+            started = time.perf_counter()
+            with tracer.span("arxiv.fetch_page", {"topic": topic, "offset": offset, "attempt": attempt}) as span:
+                try:
+                    page = [to_record(paper) for paper in client.results(search, offset=offset)]
+                except Exception as e:
+                    metrics.arxiv_errors.inc(error=type(e).__name__)
+                    if attempt == retries:
+                        raise
+                    continue
+                finally:
+                    elapsed = time.perf_counter() - started
+                    metrics.arxiv_latency.observe(elapsed)
+                    if observe:
+                        observe(elapsed)
+                if span:
+                    span.set_attribute("results", len(page))
+            break
+        if page:
+            yield page
+        if len(page) < count:
+            break
+        offset += count
+
+
+class CircuitBreaker:
+    """
+    연속 실패가 failure_threshold번이면 열리고 reset_timeout초 동안 요청을 막는다.
+
+    그 뒤에는 요청 하나만 시험 삼아 통과시키고(half-open), 성공하면 닫고 실패하면
+    다시 연다.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 60.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if self._trial or time.monotonic() - self.opened_at < self.reset_timeout:
+                return False
+            self._trial = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+        metrics.arxiv_breaker_open.set(0)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._trial = False
+        if self.opened_at is not None:
+            metrics.arxiv_breaker_open.set(1)
+
+
+class LatencyTracker:
+    """최근 요청 시간으로 백분위수를 추정한다. 표본이 적으면 default를 쓴다."""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float, default: float) -> float:
+        with self._lock:
+            samples = sorted(self._samples)
+        if len(samples) < self.min_samples:
+            return default
+        return samples[min(int(q * len(samples)), len(samples) - 1)]
+
+
+class RateLimited(Exception):
+    """시간 예산 안에 요청 간격 슬롯을 얻지 못했다. arXiv의 실패가 아니다."""
+
+
+@dataclass
+class SearchOutcome:
+    """검색 결과. stale이면 arXiv 대신 로컬 저장소에서 찾은 결과다."""
+    records: List[PaperRecord]
+    stale: bool = False
+    reason: str = ""
+
+
+class ArxivSearch:
+    """
+    대화형 검색용 arXiv 호출. 꼬리 지연을 시간 예산 안으로 묶는다.
+
+    - 호출마다 budget초의 시간 예산을 두고, 넘기면 실패로 처리한다. 요청 간격 슬롯을
+      기다리는 시간도 예산에 들어가며, 예산 안에 슬롯이 없으면 arXiv를 부르지 않고
+      차단기에 실패로 세지 않는다.
+    - 첫 요청이 최근 p95 지연보다 오래 걸리면 다음 슬롯을 예약해 같은 요청을 한 번 더
+      보내고 먼저 온 응답을 쓴다. 그 슬롯이 예산 뒤라면 보내지 않는다.
+    - 연속 실패가 쌓이면 회로 차단기가 열리고, 열려 있는 동안은 arXiv를 부르지 않는다.
+    실패하거나 차단기가 열려 있으면 로컬 저장소의 결과를 stale로 표시해 반환한다.
+
+    환경 변수:
+        ARXIV_TIMEOUT_BUDGET: 검색 한 번의 시간 예산(초, 기본값: 10)
+        ARXIV_HEDGE_DELAY: 지연 표본이 모이기 전에 쓰는 추가 요청 대기 시간(초, 기본값: 2)
+        ARXIV_BREAKER_FAILURES, ARXIV_BREAKER_RESET: 차단기를 여는 연속 실패 수(기본값: 5)와
+            다시 시도하기까지의 시간(초, 기본값: 60)
+    """
+
+    def __init__(self, limiter: RateLimiter = arxiv_limiter, workers: int = 8):
+        self.limiter = limiter
+        self.budget = float(os.getenv("ARXIV_TIMEOUT_BUDGET", "10"))
+        self.default_hedge_delay = float(os.getenv("ARXIV_HEDGE_DELAY", "2"))
+        self.breaker = CircuitBreaker(int(os.getenv("ARXIV_BREAKER_FAILURES", "5")),
+                                      float(os.getenv("ARXIV_BREAKER_RESET", "60")))
+        self.latency = LatencyTracker()
+        # 시간 예산을 넘겨 포기한 요청도 끝날 때까지 스레드를 차지하므로 넉넉히 둔다
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix="arxiv")
+
+    def _fetch(self, topic: str, max_results: int) -> List[PaperRecord]:
+        # 호출한 쪽이 첫 슬롯을 예약해 두고, 지연 표본에는 슬롯 대기 시간을 넣지 않는다
+        pages = fetch_pages(topic, max_results, limiter=self.limiter, reserved=True,
+                            observe=self.latency.observe)
+        return [record for page in pages for record in page]
+
+    def _fetch_after(self, delay: float, settled: threading.Event, topic: str,
+                     max_results: int) -> List[PaperRecord]:
+        # 예약한 슬롯까지 기다리는 사이 검색이 끝났으면 요청하지 않는다
+        if settled.wait(delay):
+            return []
+        return self._fetch(topic, max_results)
+
+    def _fetch_hedged(self, topic: str, max_results: int) -> List[PaperRecord]:
+        deadline = time.monotonic() + self.budget
+        ctx = contextvars.copy_context()
+        if not self.limiter.wait(self.budget):
+            raise RateLimited(f"{self.budget:g}초 안에 arXiv 요청 순서가 오지 않았다")
+        pending = {self._executor.submit(ctx.copy().run, self._fetch, topic, max_results)}
+        # 추가 요청 대기 시간은 첫 요청이 실제로 나간 뒤부터 잰다. 지연 표본은 페이지 요청
+        # 단위이므로 여러 페이지면 페이지 수와 요청 간격만큼 늘린다
+        pages = -(-max_results // ARXIV_PAGE_SIZE)
+        hedge_at = time.monotonic() + (self.latency.percentile(0.95, self.default_hedge_delay) * pages
+                                       + self.limiter.min_interval * (pages - 1))
+        hedged = False
+        settled = threading.Event()
+        error: Optional[BaseException] = None
+
+        try:
+            while pending:
+                until = deadline if hedged else min(hedge_at, deadline)
+                done, pending = wait(pending, timeout=max(until - time.monotonic(), 0),
+                                     return_when=FIRST_COMPLETED)
+                for future in done:
+                    if future.exception() is None:
+                        return future.result()
+                    error = future.exception()
+                if time.monotonic() >= deadline:
+                    break
+                if not hedged and pending:
+                    # 첫 요청이 p95보다 느리면 다음 슬롯을 예약해 같은 요청을 한 번 더 보낸다
+                    hedged = True
+                    delay = self.limiter.reserve(deadline - time.monotonic())
+                    if delay is not None:
+                        metrics.arxiv_hedges.inc()
+                        pending.add(self._executor.submit(ctx.copy().run, self._fetch_after,
+                                                          delay, settled, topic, max_results))
+        finally:
+            settled.set()
+        if error is not None and not pending:
+            raise error
+        raise TimeoutError(f"arXiv 검색이 {self.budget:g}초 안에 끝나지 않았다.")
+
+    def search(self, topic: str, max_results: int, store: PaperStore) -> SearchOutcome:
+        if not self.breaker.allow():
+            metrics.arxiv_fallbacks.inc(reason="circuit_open")
+            return SearchOutcome(store.search_local(topic, max_results), True,
+                                 "arXiv 회로 차단기가 열려 있어 로컬 저장소에서 찾았다.")
+        try:
+            records = self._fetch_hedged(topic, max_results)
+        except RateLimited as e:
+            metrics.arxiv_fallbacks.inc(reason="rate_limited")
+            return SearchOutcome(store.search_local(topic, max_results), True,
+                                 f"arXiv 요청이 밀려({e}) 로컬 저장소에서 찾았다.")
+        except Exception as e:
+            self.breaker.record_failure()
+            reason = "timeout" if isinstance(e, TimeoutError) else "error"
+            metrics.arxiv_fallbacks.inc(reason=reason)
+            return SearchOutcome(store.search_local(topic, max_results), True,
+                                 f"arXiv 요청 실패({e})로 로컬 저장소에서 찾았다.")
+        self.breaker.record_success()
+        return SearchOutcome(records)
+
+
+# 검색 도구가 공유하는 arXiv 호출기
+arxiv_search = ArxivSearch()
+
+
+@dataclass
+class IngestReport:
+    """일괄 수집 결과. 결과가 없던 주제는 papers에 0으로, 실패한 주제는 failed에 남는다."""
+    papers: Dict[str, int]
+    failed: Dict[str, str]
+
+
+def bulk_ingest(store: PaperStore, topics: List[str], max_results_per_topic: int,
+                workers: int = 4, batch_size: int = 500,
+                progress: Optional[Callable[[str], None]] = print) -> IngestReport:
+    """
+    여러 주제의 논문을 동시에 수집해 저장소에 기록한다.
+
+    인자:
+        store: 논문을 기록할 저장소
+        topics: 수집할 주제 목록
+        max_results_per_topic: 주제당 최대 논문 수
+        workers: 동시에 처리할 주제 수
+        batch_size: 한 번에 저장소에 기록할 논문 수
+        progress: 진행 상황 메시지를 받을 함수 (None이면 출력하지 않음)
+
+    반환:
+        주제별 수집된 논문 수와, 수집에 실패한 주제별 오류 메시지
+    """
+    # 정규화 키가 같은 주제는 한 번만 수집한다
+    unique: Dict[str, str] = {}
+    for topic in topics:
+        unique.setdefault(topic_key(topic), topic)
+    topics = list(unique.values())
+    results: Dict[str, int] = {}
+    failed: Dict[str, str] = {}
+    done = 0
+    started = time.monotonic()
+
+    def ingest_topic(topic: str) -> int:
+        buffer: List[PaperRecord] = []
+        total = 0
+        for page in fetch_pages(topic, max_results_per_topic):
+            buffer.extend(page)
+            if len(buffer) >= batch_size:
+                store.add_papers(topic, buffer)
+                total += len(buffer)
+                buffer = []
+        if buffer:
+            store.add_papers(topic, buffer)
+            total += len(buffer)
+        return total
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        # 작업 스레드에서도 호출한 쪽의 추적 컨텍스트를 이어 쓴다
+        futures = {
+            executor.submit(contextvars.copy_context().run, ingest_topic, topic): topic
+            for topic in topics
+        }
+        for future in as_completed(futures):
+            topic = futures[future]
+            done += 1
+            try:
+                results[topic] = future.result()
+                message = f"{topic}: {results[topic]}편 저장"
+            except Exception as e:
+                failed[topic] = f"{type(e).__name__}: {e}"
+                message = f"{topic}: 수집 실패 ({e})"
+            if progress:
+                elapsed = time.monotonic() - started
+                progress(f"[{done}/{len(topics)}] {message} ({elapsed:.0f}초 경과)")
+
+    return IngestReport(results, failed)
@@ -0,0 +1,277 @@
+import os
+import json
+import random
+import hashlib
+import asyncio
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import metrics
+from disk_cache import DiskCache
+
+# LLM 응답 캐시 기본 위치와 크기
+LLM_CACHE_DIR = os.path.join(".mcp_cache", "llm")
+LLM_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+
+@dataclass
+class Completion:
+    """LLM 응답 하나. 함수 호출이면 function_name과 JSON 문자열 인자가 채워진다"""
+    content: Optional[str] = None
+    function_name: Optional[str] = None
+    function_arguments: str = "{}"
+
+
+class LLMBackend:
+    """
+    챗봇이 사용하는 LLM 호출 인터페이스.
+
+    complete()는 대화 기록과 함수 정의를 받아 다음 응답 하나를 반환한다.
+    """
+    model = ""
+
+    def request_params(self) -> Dict:
+        """응답에 영향을 주는 모델/샘플링 설정"""
+        return {"model": self.model}
+
+    async def complete(self, messages: List[Dict], functions: List[Dict]) -> Completion:
+        raise NotImplementedError
+
+
+class OpenAIBackend(LLMBackend):
+    """OpenAI Chat Completions API를 호출한다."""
+
+    def __init__(self, model: str = "gpt-4o-mini", max_tokens: int = 2024, temperature: float = 0.7):
+        self.model = model
+        self.max_tokens = max_tokens
+        self.temperature = temperature
+        self._client = None
+
+    @property
+    def client(self):
+        """OpenAI API 클라이언트를 처음 사용할 때 초기화"""
+        if self._client is None:
+            from openai import OpenAI
+            import config
+            self._client = OpenAI(api_key=config.API_KEY)
+        return self._client
+
+    def request_params(self) -> Dict:
+        return {"model": self.model, "max_tokens": self.max_tokens, "temperature": self.temperature}
+
+    async def complete(self, messages: List[Dict], functions: List[Dict]) -> Completion:
+        # 동기 API 호출은 스레드에서 실행하여 다른 대화를 막지 않는다
+        resp = await asyncio.to_thread(
+            self.client.chat.completions.create,
+            model=self.model,
+            messages=messages,
+            functions=functions,
+            function_call="auto",
+            max_tokens=self.max_tokens,
+            temperature=self.temperature
+        )
+        msg = resp.choices[0].message
+        if getattr(msg, "function_call", None):
+            return Completion(function_name=msg.function_call.name,
+                              function_arguments=msg.function_call.arguments)
+        return Completion(content=msg.content)
+
+
+def _current_turn(messages: List[Dict]) -> tuple:
+    """마지막 사용자 메시지와 그 뒤로 받은 도구 결과 수를 반환한다"""
+    for index in range(len(messages) - 1, -1, -1):
+        if messages[index]["role"] == "user":
+            steps = sum(1 for m in messages[index + 1:] if m["role"] == "function")
+            return messages[index]["content"], steps
+    raise ValueError("대화 기록에 사용자 메시지가 없다.")
+
+
+def _step_completion(step: Dict) -> Completion:
+    if "function_call" in step:
+        call = step["function_call"]
+        arguments = call.get("arguments", {})
+        if not isinstance(arguments, str):
+            arguments = json.dumps(arguments)
+        return Completion(function_name=call["name"], function_arguments=arguments)
+    return Completion(content=step.get("content", ""))
+
+
+class ScriptedBackend(LLMBackend):
+    """
+    미리 기록한 응답 순서를 그대로 재생하는 오프라인 백엔드.
+
+    스크립트는 사용자 쿼리 -> 단계 목록이며, 단계는 {"function_call": {"name", "arguments"}}
+    또는 {"content": "..."}이다. 쿼리가 없으면 "*" 항목을 쓴다. 몇 번째 단계인지는
+    대화 기록에서 마지막 사용자 메시지 뒤의 도구 결과 수로 정하므로 여러 대화를
+    동시에 재생해도 서로 섞이지 않는다.
+
+    응답마다 latency초(± jitter초) 동안 기다려 실제 API 지연을 흉내 낸다.
+    단계에 "latency"가 있으면 그 값을 쓴다. seed를 주면 지연 시간도 재현된다.
+    """
+    model = "scripted"
+
+    def __init__(self, script: Dict[str, List[Dict]], latency: float = 0.0, jitter: float = 0.0,
+                 seed: Optional[int] = None):
+        self.script = script
+        self.latency = latency
+        self.jitter = jitter
+        self._random = random.Random(seed)
+
+    @classmethod
+    def from_file(cls, path: str, **kwargs) -> "ScriptedBackend":
+        with open(path, "r") as f:
+            return cls(json.load(f), **kwargs)
+
+    async def complete(self, messages: List[Dict], functions: List[Dict]) -> Completion:
+        query, step_index = _current_turn(messages)
+        steps = self.script.get(query, self.script.get("*"))
+        if steps is None:
+            raise KeyError(f"스크립트에 없는 쿼리: {query!r}")
+        if step_index >= len(steps):
+            raise RuntimeError(f"스크립트의 {len(steps)}단계를 모두 재생했다: {query!r}")
+        step = steps[step_index]
+
+        delay = step.get("latency", self.latency)
+        if self.jitter:
+            delay += self._random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return _step_completion(step)
+
+
+class RecordingBackend(LLMBackend):
+    """
+    다른 백엔드의 응답을 ScriptedBackend 스크립트 형식으로 기록한다.
+
+    응답을 받을 때마다 path에 스크립트 전체를 다시 쓰므로, 실행 도중 중단되어도
+    그때까지의 기록은 남는다.
+    """
+
+    def __init__(self, inner: LLMBackend, path: str):
+        self.inner = inner
+        self.model = inner.model
+        self.path = path
+        try:
+            with open(path, "r") as f:
+                self.script: Dict[str, List[Dict]] = json.load(f)
+        except FileNotFoundError:
+            self.script = {}
+        self._lock = threading.Lock()
+
+    async def complete(self, messages: List[Dict], functions: List[Dict]) -> Completion:
+        query, step_index = _current_turn(messages)
+        completion = await self.inner.complete(messages, functions)
+        if completion.function_name:
+            step = {"function_call": {"name": completion.function_name,
+                                      "arguments": json.loads(completion.function_arguments or "{}")}}
+        else:
+            step = {"content": completion.content}
+
+        with self._lock:
+            steps = self.script.setdefault(query, [])
+            # 같은 쿼리를 다시 기록하면 이번 실행의 순서로 덮어쓴다
+            del steps[step_index:]
+            steps.append(step)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(self.script, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_path, self.path)
+        return completion
+
+
+class CacheMiss(KeyError):
+    """replay 모드에서 캐시에 없는 요청을 받았을 때 발생"""
+
+
+def _jsonable(value):
+    # 도구 결과로 들어온 pydantic 객체 등을 해시할 수 있는 형태로 바꾼다
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    return str(value)
+
+
+def request_hash(params: Dict, messages: List[Dict], functions: List[Dict]) -> str:
+    """모델/샘플링 설정, 대화 기록, 함수 정의로 만든 안정적인 요청 해시"""
+    payload = json.dumps({"params": params, "messages": messages, "functions": functions},
+                         sort_keys=True, ensure_ascii=False, default=_jsonable)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CachingBackend(LLMBackend):
+    """
+    다른 백엔드의 응답을 요청 해시별로 디스크에 저장하고 재사용한다.
+
+    mode:
+        record: 캐시에 있으면 재사용하고, 없으면 호출한 뒤 저장한다
+        replay: 캐시에 있는 응답만 사용하고, 없으면 CacheMiss를 발생시킨다
+        passthrough: 캐시를 쓰지 않고 매번 호출한다
+
+    항목은 DiskCache에 요청 해시별로 저장한다.
+    """
+    MODES = ("record", "replay", "passthrough")
+
+    def __init__(self, inner: LLMBackend, mode: str = "record", cache_dir: str = LLM_CACHE_DIR,
+                 max_bytes: int = LLM_CACHE_MAX_BYTES):
+        if mode not in self.MODES:
+            raise ValueError(f"알 수 없는 캐시 모드: {mode}")
+        self.inner = inner
+        self.model = inner.model
+        self.mode = mode
+        self.cache = DiskCache(cache_dir, max_bytes)
+
+    def request_params(self) -> Dict:
+        return self.inner.request_params()
+
+    async def complete(self, messages: List[Dict], functions: List[Dict]) -> Completion:
+        if self.mode == "passthrough":
+            return await self.inner.complete(messages, functions)
+
+        key = request_hash(self.request_params(), messages, functions)
+        cached = await asyncio.to_thread(self.cache.load, key)
+        metrics.record_cache("llm_response", cached is not None)
+        if cached is not None:
+            return Completion(**cached)
+        if self.mode == "replay":
+            raise CacheMiss(f"캐시에 없는 LLM 요청: {key}")
+
+        completion = await self.inner.complete(messages, functions)
+        await asyncio.to_thread(self.cache.store, key, completion.__dict__)
+        return completion
+
+
+def create_backend() -> LLMBackend:
+    """
+    환경 변수에 따라 LLM 백엔드를 만든다.
+
+    LLM_BACKEND: openai(기본값) 또는 scripted
+    LLM_SCRIPT: scripted 백엔드가 재생할 스크립트 파일
+    LLM_LATENCY, LLM_JITTER, LLM_SEED: scripted 백엔드의 응답 지연(초)과 난수 시드
+    LLM_RECORD_SCRIPT: 지정하면 openai 응답을 이 파일에 스크립트로 기록
+    LLM_CACHE: record, replay, passthrough 중 하나이면 응답 캐시를 사용
+    LLM_CACHE_DIR, LLM_CACHE_MAX_BYTES: 응답 캐시 위치와 최대 크기
+    """
+    kind = os.getenv("LLM_BACKEND", "openai")
+    if kind == "scripted":
+        seed = os.getenv("LLM_SEED")
+        return ScriptedBackend.from_file(
+            os.getenv("LLM_SCRIPT", "llm_script.json"),
+            latency=float(os.getenv("LLM_LATENCY", "0")),
+            jitter=float(os.getenv("LLM_JITTER", "0")),
+            seed=int(seed) if seed else None,
+        )
+    if kind != "openai":
+        raise ValueError(f"알 수 없는 LLM_BACKEND: {kind}")
+    backend: LLMBackend = OpenAIBackend(os.getenv("LLM_MODEL", "gpt-4o-mini"))
+    cache_mode = os.getenv("LLM_CACHE")
+    if cache_mode:
+        backend = CachingBackend(
+            backend,
+            cache_mode,
+            os.getenv("LLM_CACHE_DIR", LLM_CACHE_DIR),
+            int(os.getenv("LLM_CACHE_MAX_BYTES", str(LLM_CACHE_MAX_BYTES))),
+        )
+    record_path = os.getenv("LLM_RECORD_SCRIPT")
+    if record_path:
+        backend = RecordingBackend(backend, record_path)
+    return backend
@@ -1,5 +1,149 @@
+import argparse
+
+
+def ingest(args: argparse.Namespace) -> None:
+    """주제 목록을 읽어 arXiv 논문을 일괄 수집한다."""
+    from ingest import bulk_ingest
+    from paper_store import PaperStore
+
+    topics = list(args.topics)
+    if args.topics_file:
+        with open(args.topics_file, "r") as f:
+            topics.extend(line.strip() for line in f if line.strip())
+    if not topics:
+        print("수집할 주제가 없다.")
+        return
+
+    report = bulk_ingest(
+        PaperStore(args.paper_dir),
+        topics,
+        args.max_results,
+        workers=args.workers,
+        batch_size=args.batch_size,
+    )
+    print(f"\n총 {len(report.papers)}개 주제, {sum(report.papers.values())}편 저장 완료")
+    if report.failed:
+        print(f"수집 실패 {len(report.failed)}개 주제: {', '.join(report.failed)}")
+
+
+def dedupe(args: argparse.Namespace) -> None:
+    """기존 papers/ 트리의 중복 주제와 논문을 병합한다."""
+    from paper_store import PaperStore
+
+    stats = PaperStore(args.paper_dir).dedupe()
+    print(f"병합한 폴더: {stats['merged_folders']}개, 옮긴 논문: {stats['migrated_papers']}편, "
+          f"코퍼스 논문 수: {stats['papers']}편")
+
+
+def export(args: argparse.Namespace) -> None:
+    """코퍼스를 분석용 열 단위 파일로 내보낸다."""
+    import os
+    from corpus_export import export_corpus
+    from paper_store import PaperStore
+
+    result = export_corpus(
+        PaperStore(args.paper_dir),
+        args.out or os.path.join(args.paper_dir, "_export"),
+        args.format,
+        incremental=not args.full,
+    )
+    print(f"{result['format']} 형식으로 {result['rows_written']}행을 내보냈다 "
+          f"(전체 {result['rows']}행, 조각 {result['parts']}개): {result['path']}")
+
+
+def serve(args: argparse.Namespace) -> None:
+    """챗봇을 헤드리스 서비스로 실행한다."""
+    import asyncio
+    from agent_service import run_service
+
+    asyncio.run(run_service(
+        transport=args.transport,
+        host=args.host,
+        port=args.port,
+        max_concurrency=args.concurrency,
+        max_pending=args.max_pending,
+        timeout=args.timeout,
+    ))
+
+
+def batch(args: argparse.Namespace) -> None:
+    """JSONL 파일의 쿼리를 일괄 처리하여 평가용 결과를 남긴다."""
+    import asyncio
+    from mcp_chatbot import batch_main
+
+    asyncio.run(batch_main(args.input, args.output, args.parallelism, args.timeout))
+
+
+def gateway(args: argparse.Namespace) -> None:
+    """설정된 MCP 서버들을 하나의 엔드포인트로 묶는 게이트웨이를 실행한다."""
+    import asyncio
+    from gateway import run_gateway
+
+    asyncio.run(run_gateway(
+        config_path=args.config,
+        transport=args.transport,
+        host=args.host,
+        port=args.port,
+        replicas=args.replicas,
+    ))
+
+
 def main():
-    print("Hello from mcp-project!")
+    parser = argparse.ArgumentParser(description="mcp-project 명령줄 도구")
+    parser.add_argument("--paper-dir", default="papers", help="논문 저장 디렉토리")
+    commands = parser.add_subparsers(dest="command")
+
+    ingest_parser = commands.add_parser("ingest", help="여러 주제의 논문을 arXiv에서 일괄 수집")
+    ingest_parser.add_argument("topics", nargs="*", help="수집할 주제")
+    ingest_parser.add_argument("--topics-file", help="한 줄에 주제 하나씩 적힌 파일")
+    ingest_parser.add_argument("--max-results", type=int, default=100, help="주제당 최대 논문 수")
+    ingest_parser.add_argument("--workers", type=int, default=4, help="동시에 처리할 주제 수")
+    ingest_parser.add_argument("--batch-size", type=int, default=500, help="한 번에 기록할 논문 수")
+    ingest_parser.set_defaults(func=ingest)
+
+    dedupe_parser = commands.add_parser("dedupe", help="주제 폴더를 정규화하고 중복 논문을 병합")
+    dedupe_parser.set_defaults(func=dedupe)
+
+    export_parser = commands.add_parser("export", help="코퍼스를 Arrow/Parquet/NumPy 열 단위 파일로 내보내기")
+    export_parser.add_argument("--format", choices=["arrow", "parquet", "numpy"],
+                               help="기본값: pyarrow가 있으면 arrow, 없으면 numpy")
+    export_parser.add_argument("--out", help="내보낼 디렉토리 (기본값: <paper-dir>/_export)")
+    export_parser.add_argument("--full", action="store_true",
+                               help="지난 내보내기 이후 추가분만 덧붙이지 않고 처음부터 다시 내보낸다")
+    export_parser.set_defaults(func=export)
+
+    serve_parser = commands.add_parser("serve", help="챗봇을 헤드리스 쿼리 서비스로 실행")
+    serve_parser.add_argument("--transport", choices=["stdin", "http"], default="stdin",
+                              help="stdin: 한 줄에 JSON 요청 하나, http: POST /query")
+    serve_parser.add_argument("--host", default="127.0.0.1", help="HTTP 바인드 주소")
+    serve_parser.add_argument("--port", type=int, default=8080, help="HTTP 포트")
+    serve_parser.add_argument("--concurrency", type=int, default=8, help="동시에 처리할 쿼리 수")
+    serve_parser.add_argument("--max-pending", type=int, default=64, help="대기를 포함한 최대 요청 수")
+    serve_parser.add_argument("--timeout", type=float, default=120.0, help="쿼리당 제한 시간(초)")
+    serve_parser.set_defaults(func=serve)
+
+    batch_parser = commands.add_parser("batch", help="JSONL 파일의 쿼리를 일괄 처리 (중단 후 재실행 시 이어서 처리)")
+    batch_parser.add_argument("input", help='한 줄에 {"id": ..., "query": "..."} 하나씩 적힌 파일')
+    batch_parser.add_argument("output", help="결과와 쿼리별 소요 시간을 덧붙일 JSONL 파일")
+    batch_parser.add_argument("--parallelism", type=int, default=4, help="동시에 처리할 쿼리 수")
+    batch_parser.add_argument("--timeout", type=float, default=None, help="쿼리당 제한 시간(초)")
+    batch_parser.set_defaults(func=batch)
+
+    gateway_parser = commands.add_parser("gateway", help="MCP 서버 풀을 하나의 MCP 엔드포인트로 제공")
+    gateway_parser.add_argument("--config", default="server_config.json", help="묶을 서버 설정 파일")
+    gateway_parser.add_argument("--transport", choices=["sse", "stdio"], default="sse",
+                                help='sse: 챗봇 설정에 {"url": "http://host:port/sse"}로 연결')
+    gateway_parser.add_argument("--host", default="127.0.0.1", help="SSE 바인드 주소")
+    gateway_parser.add_argument("--port", type=int, default=8002, help="SSE 포트")
+    gateway_parser.add_argument("--replicas", type=int, default=1,
+                                help='서버당 프로세스 수 (서버 설정의 "replicas"가 우선)')
+    gateway_parser.set_defaults(func=gateway)
+
+    args = parser.parse_args()
+    if args.command is None:
+        print("Hello from mcp-project!")
+        return
+    args.func(args)
 
 
 if __name__ == "__main__":
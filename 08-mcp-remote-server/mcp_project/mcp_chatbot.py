@@ -1,21 +1,29 @@
+from __future__ import annotations
+
 import os
+import sys
 import json
+import time
 import asyncio
-import nest_asyncio
-from dotenv import load_dotenv
-from typing import List, Dict, TypedDict
-from contextlib import AsyncExitStack
+import hashlib
+import itertools
+from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING, List, Dict, Optional, Tuple, TypedDict
+from llm_backend import LLMBackend, create_backend
+from server_manager import DEFAULT_IDLE_TIMEOUT, Router, ServerManager
+from tool_cache import create_tool_cache
+from tool_results import serialize_tool_result
+from tracing import TRACEPARENT_KEY, tracer
 
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
-from openai import OpenAI
+# openai, mcp, dotenv, nest_asyncio는 실제로 필요해질 때 불러와 시작 시간을 줄인다
+if TYPE_CHECKING:
+    from mcp import ClientSession, types
 
-# 환경 변수 로드
-load_dotenv()
+# 서버별 도구/프롬프트/리소스 목록 캐시
+CAPABILITY_CACHE_FILE = os.path.join(".mcp_cache", "capabilities.json")
 
-# OpenAI API 클라이언트 초기화
-import config
-client = OpenAI(api_key=config.API_KEY)
+# 쉼표로 나열한 프롬프트 인자를 동시에 실행할 최대 개수
+PROMPT_PARALLELISM = int(os.getenv("MCP_PROMPT_PARALLELISM", "4"))
 
 # 도구 정의를 위한 TypedDict
 class ToolDefinition(TypedDict):
@@ -23,115 +31,342 @@ class ToolDefinition(TypedDict):
     description: str
     input_schema: dict
 
+@dataclass
+class QueryStats:
+    """쿼리 하나를 처리하는 동안의 시간 측정값"""
+    turns: int = 0
+    tool_calls: int = 0
+    llm_seconds: float = 0.0
+    tool_seconds: float = 0.0
+    # 모델에 보낸 도구 결과 토큰 수와, 원래 텍스트 그대로 보냈을 때보다 줄인 토큰 수
+    tool_result_tokens: int = 0
+    tool_result_tokens_saved: int = 0
+
+def config_hash(server_config: dict) -> str:
+    """서버 설정과, 인자로 넘기는 로컬 스크립트의 수정 시각을 합쳐 해시한다"""
+    scripts = {
+        arg: os.path.getmtime(arg)
+        for arg in server_config.get("args", [])
+        if isinstance(arg, str) and os.path.isfile(arg)
+    }
+    payload = json.dumps({"config": server_config, "scripts": scripts}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+class CapabilityCache:
+    """서버 설정 해시와 서버 버전이 같을 때만 재사용하는 서버 기능 목록 캐시"""
+
+    def __init__(self, path: str = CAPABILITY_CACHE_FILE):
+        self.path = path
+        try:
+            with open(path, "r") as f:
+                self.entries: Dict[str, dict] = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            self.entries = {}
+
+    def get(self, server_name: str, server_config: dict) -> Optional[dict]:
+        entry = self.entries.get(server_name)
+        if entry and entry.get("config_hash") == config_hash(server_config):
+            return entry
+        return None
+
+    def put(self, server_name: str, server_config: dict, entry: dict) -> None:
+        entry["config_hash"] = config_hash(server_config)
+        self.entries[server_name] = entry
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.entries, f)
+        os.replace(tmp_path, self.path)
+
+def _ends_with_newline(path: str) -> bool:
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
 class MCP_ChatBot:
-    def __init__(self):
-        self.exit_stack = AsyncExitStack()
+    def __init__(self, idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+                 backend: Optional[LLMBackend] = None):
+        # LLM 호출 방식 (기본값은 환경 변수에 따라 OpenAI 또는 스크립트 재생)
+        self.backend = backend or create_backend()
         self.available_tools: List[ToolDefinition] = []
         self.available_prompts: List[Dict] = []
-        self.sessions: Dict[str, ClientSession] = {}
+        self.server_configs: Dict[str, dict] = {}
+        # 서버 이름 -> 도구/프롬프트/리소스 목록
+        self.capabilities: Dict[str, dict] = {}
+        self.capability_cache = CapabilityCache()
+        # 도구/프롬프트 이름과 리소스 URI -> 서버 이름
+        self.router = Router()
+        # 구독한 리소스 URI -> (구독한 세션, 마지막으로 읽은 내용). 변경 알림을 받으면 지운다
+        self.resource_cache: Dict[str, Tuple[ClientSession, str]] = {}
+        # 리소스 URI -> 구독한 세션, 그리고 URI별로 받은 변경 알림 수
+        self.subscriptions: Dict[str, ClientSession] = {}
+        self._resource_updates: Dict[str, int] = {}
+        # 서버 이름 -> 도구 결과 캐시 (서버 설정의 "cache"로 켠다. 예: fetch 서버에 "http")
+        self.tool_caches: Dict[str, object] = {}
+        # 서버는 처음 라우팅될 때 시작하고 idle_timeout초 동안 쓰이지 않으면 내린다
+        self.servers = ServerManager(idle_timeout, on_initialized=self._on_server_initialized,
+                                     on_notification=self._on_server_notification)
+
+    def _register(self, server_name: str, entry: dict) -> None:
+        """서버의 기능 목록을 등록하고 라우팅 표를 다시 만든다"""
+        self.capabilities[server_name] = entry
+        self.available_tools = []
+        self.available_prompts = []
+        self.router = Router()
+        # 설정 파일 순서로 등록하므로 이름이 겹치면 먼저 나온 서버가 처리한다
+        for name in sorted(self.capabilities, key=list(self.server_configs).index):
+            caps = self.capabilities[name]
+            for tool in caps["tools"]:
+                if self.router.add(tool["name"], name):
+                    self.available_tools.append(tool)
+            for prompt in caps["prompts"]:
+                if self.router.add(prompt["name"], name):
+                    self.available_prompts.append(prompt)
+            for uri in caps["resources"]:
+                self.router.add(uri, name)
+            for template in caps["resource_templates"]:
+                self.router.add_template(template, name)
+
+    async def _discover(self, session: ClientSession, version: str) -> dict:
+        """세션에서 도구/프롬프트/리소스 목록을 조회"""
+        entry = {"server_version": version, "tools": [], "prompts": [],
+                 "resources": [], "resource_templates": []}
+
+        # 도구 목록 조회
+        tools_resp = await session.list_tools()
+        for tool in tools_resp.tools:
+            entry["tools"].append({
+                "name": tool.name,
+                "description": tool.description,
+                "input_schema": tool.inputSchema
+            })
+
+        # 프롬프트 목록 조회
+        prompts_resp = await session.list_prompts()
+        if prompts_resp and prompts_resp.prompts:
+            for prompt in prompts_resp.prompts:
+                entry["prompts"].append({
+                    "name": prompt.name,
+                    "description": prompt.description,
+                    "arguments": [
+                        {"name": arg.name, "description": arg.description, "required": arg.required}
+                        for arg in prompt.arguments or []
+                    ]
+                })
+
+        # 리소스 및 리소스 템플릿 목록 조회
+        resources_resp = await session.list_resources()
+        if resources_resp and resources_resp.resources:
+            entry["resources"] = [str(resource.uri) for resource in resources_resp.resources]
+        templates_resp = await session.list_resource_templates()
+        if templates_resp and templates_resp.resourceTemplates:
+            entry["resource_templates"] = [t.uriTemplate for t in templates_resp.resourceTemplates]
+        return entry
+
+    async def _on_server_initialized(self, server_name: str, session: ClientSession,
+                                     init: types.InitializeResult) -> None:
+        """서버가 (다시) 시작될 때 호출. 서버 버전이 캐시와 다르면 기능 목록을 갱신"""
+        version = init.serverInfo.version
+        cached = self.capabilities.get(server_name)
+        if not cached or cached.get("server_version") != version:
+            entry = await self._discover(session, version)
+            self.capability_cache.put(server_name, self.server_configs[server_name], entry)
+            self._register(server_name, entry)
+
+    async def _on_server_notification(self, server_name: str, notification: types.ServerNotification) -> None:
+        """서버 알림 처리. 구독한 리소스가 바뀌면 로컬 사본을 버린다"""
+        from mcp import types
+
+        if isinstance(notification.root, types.ResourceUpdatedNotification):
+            uri = str(notification.root.params.uri)
+            self._resource_updates[uri] = self._resource_updates.get(uri, 0) + 1
+            self.resource_cache.pop(uri, None)
 
     async def connect_to_server(self, server_name: str, server_config: dict) -> None:
         """단일 MCP 서버에 연결하고 도구/프롬프트/리소스를 로드"""
         try:
-            params = StdioServerParameters(**server_config)
-            read, write = await self.exit_stack.enter_async_context(stdio_client(params))
-            session = await self.exit_stack.enter_async_context(ClientSession(read, write))
-            await session.initialize()
-
-            # 도구 목록 조회
-            tools_resp = await session.list_tools()
-            for tool in tools_resp.tools:
-                self.sessions[tool.name] = session
-                self.available_tools.append({
-                    "name": tool.name,
-                    "description": tool.description,
-                    "input_schema": tool.inputSchema
-                })
-
-            # 프롬프트 목록 조회
-            prompts_resp = await session.list_prompts()
-            if prompts_resp and prompts_resp.prompts:
-                for prompt in prompts_resp.prompts:
-                    self.sessions[prompt.name] = session
-                    self.available_prompts.append({
-                        "name": prompt.name,
-                        "description": prompt.description,
-                        "arguments": prompt.arguments
-                    })
-
-            # 리소스 목록 조회
-            resources_resp = await session.list_resources()
-            if resources_resp and resources_resp.resources:
-                for resource in resources_resp.resources:
-                    uri = str(resource.uri)
-                    self.sessions[uri] = session
+            self.server_configs[server_name] = server_config
+            self.servers.add(server_name, server_config)
+            with tracer.span("mcp.spawn_server", {"server": server_name}):
+                await self.servers.session(server_name)
         except Exception as e:
-            print(f"Error connecting to {server_name}: {e}")
+            print(f"Error connecting to {server_name}: {e}", file=sys.stderr)
 
     async def connect_to_servers(self) -> None:
-        """설정 파일로부터 모든 MCP 서버에 연결"""
+        """설정 파일을 읽고, 기능 목록 캐시가 없는 서버만 바로 연결한다"""
         try:
             with open("server_config.json", "r") as f:
                 cfg = json.load(f)
             for name, params in cfg.get("mcpServers", {}).items():
-                await self.connect_to_server(name, params)
+                self.server_configs[name] = params
+                self.servers.add(name, params)
+                if params.get("cache"):
+                    self.tool_caches[name] = create_tool_cache(params["cache"],
+                                                               params.get("cache_revalidate", False))
+                cached = self.capability_cache.get(name, params)
+                if cached:
+                    # 캐시된 기능 목록으로 라우팅하고 서버는 처음 사용할 때 시작
+                    self._register(name, cached)
+                else:
+                    await self.connect_to_server(name, params)
         except Exception as e:
-            print(f"Error loading config: {e}")
+            print(f"Error loading config: {e}", file=sys.stderr)
             raise
 
     async def process_query(self, query: str) -> None:
         """사용자 쿼리를 OpenAI로 전송, 도구 호출 및 응답 처리"""
-        messages = [{"role": "user", "content": query}]
+        answer = await self.run_query(query, echo=True)
+        if answer is not None:
+            print(answer)
+
+    async def run_query(self, query: str, messages: Optional[List[Dict]] = None,
+                        echo: bool = False, stats: Optional[QueryStats] = None,
+                        shared_results: Optional[Dict[str, asyncio.Future]] = None) -> Optional[str]:
+        """
+        쿼리 하나를 도구 호출까지 끝까지 처리하고 최종 응답을 반환한다.
+
+        messages를 주면 그 대화 기록에 이어서 처리하고 기록을 갱신하므로, 대화마다
+        별도의 목록을 넘기면 여러 대화를 같은 서버 세션 위에서 동시에 처리할 수 있다.
+        stats를 주면 LLM 호출 횟수와 LLM/도구 시간을 누적한다.
+        shared_results를 여러 쿼리에 함께 넘기면 같은 인자의 도구 호출은 한 번만 실행한다.
+        도구를 찾지 못하거나 호출에 실패하면 None을 반환한다.
+        """
+        # 유휴 종료 검사보다 먼저 사용 시각을 남겨, 이 쿼리가 쓸 서버를 내리지 않게 한다
+        self.servers.touch()
+        with tracer.span("chatbot.process_query", {"query.length": len(query)}):
+            return await self._run_query(query, [] if messages is None else messages, echo,
+                                         stats or QueryStats(), shared_results)
+
+    async def _call_tool(self, server_name: str, name: str, args: Dict) -> types.CallToolResult:
+        cache = self.tool_caches.get(server_name)
+        if cache is not None:
+            return await cache.call(name, args, lambda: self._send_tool_call(server_name, name, args))
+        return await self._send_tool_call(server_name, name, args)
+
+    async def _send_tool_call(self, server_name: str, name: str, args: Dict) -> types.CallToolResult:
+        async with self.servers.use(server_name) as session:
+            with tracer.span("mcp.call_tool", {"tool": name}):
+                # 서버 쪽 스팬이 이 스팬 아래에 이어지도록 요청 _meta로 전달
+                traceparent = tracer.current_traceparent()
+                meta = {TRACEPARENT_KEY: traceparent} if traceparent else None
+                return await session.call_tool(name, arguments=args, meta=meta)
+
+    async def _call_tool_shared(self, server_name: str, name: str, args: Dict,
+                                shared_results: Optional[Dict[str, asyncio.Future]]) -> types.CallToolResult:
+        """같은 도구와 인자의 호출은 먼저 시작한 호출의 결과를 함께 기다린다"""
+        if shared_results is None:
+            return await self._call_tool(server_name, name, args)
+        key = json.dumps([name, args], sort_keys=True)
+        future = shared_results.get(key)
+        if future is None:
+            future = shared_results[key] = asyncio.ensure_future(self._call_tool(server_name, name, args))
+        # 기다리던 쿼리 하나가 취소되어도 다른 쿼리가 쓰는 호출은 계속되도록 한다
+        return await asyncio.shield(future)
+
+    async def _run_query(self, query: str, messages: List[Dict], echo: bool, stats: QueryStats,
+                         shared_results: Optional[Dict[str, asyncio.Future]] = None) -> Optional[str]:
+        log = print if echo else (lambda *args: None)
+        messages.append({"role": "user", "content": query})
         functions = [
             {"name": t["name"], "description": t["description"], "parameters": t["input_schema"]}
             for t in self.available_tools
         ]
 
         while True:
-            resp = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=messages,
-                functions=functions,
-                function_call="auto",
-                max_tokens=2024,
-                temperature=0.7
-            )
-            msg = resp.choices[0].message
+            stats.turns += 1
+            started = time.perf_counter()
+            with tracer.span("llm.chat_completion", {"model": self.backend.model, "messages": len(messages)}):
+                reply = await self.backend.complete(messages, functions)
+            stats.llm_seconds += time.perf_counter() - started
 
             # 함수 호출 요청 처리
-            if getattr(msg, "function_call", None):
-                name = msg.function_call.name
-                args = json.loads(msg.function_call.arguments)
-                print(f"Calling tool {name} with args {args}")
-                session = self.sessions.get(name)
-                if not session:
-                    print(f"Tool '{name}' not found.")
-                    break
-                result = await session.call_tool(name, arguments=args)
-                messages.append({"role": "function", "name": name, "content": result.content})
+            if reply.function_name:
+                name = reply.function_name
+                args = json.loads(reply.function_arguments)
+                log(f"Calling tool {name} with args {args}")
+                server_name = self.router.server_for(name)
+                if not server_name:
+                    log(f"Tool '{name}' not found.")
+                    return None
+                stats.tool_calls += 1
+                started = time.perf_counter()
+                try:
+                    result = await self._call_tool_shared(server_name, name, args, shared_results)
+                except Exception as e:
+                    log(f"Error calling tool '{name}': {e}")
+                    return None
+                finally:
+                    stats.tool_seconds += time.perf_counter() - started
+                # 도구 결과는 토큰이 가장 적게 드는 텍스트 형태로 바꿔 보낸다
+                content, tokens, baseline = serialize_tool_result(result)
+                stats.tool_result_tokens += tokens
+                stats.tool_result_tokens_saved += baseline - tokens
+                log(f"Tool result: {tokens} tokens ({baseline - tokens} saved)")
+                messages.append({"role": "function", "name": name, "content": content})
                 continue
 
-            # 일반 응답 출력 후 종료
-            print(msg.content)
-            messages.append({"role": "assistant", "content": msg.content})
-            break
+            # 최종 응답을 기록에 추가하고 반환
+            messages.append({"role": "assistant", "content": reply.content})
+            return reply.content
+
+    async def _read_resource(self, session: ClientSession, uri: str) -> types.ReadResourceResult:
+        """현재 traceparent를 요청 _meta에 실어 resources/read를 보낸다."""
+        from mcp import types
+
+        traceparent = tracer.current_traceparent()
+        if not traceparent:
+            return await session.read_resource(uri=uri)
+        request = types.ClientRequest(types.ReadResourceRequest(
+            params=types.ReadResourceRequestParams(uri=uri, _meta={TRACEPARENT_KEY: traceparent})
+        ))
+        return await session.send_request(request, types.ReadResourceResult)
+
+    async def read_resource_text(self, uri: str) -> Optional[str]:
+        """
+        리소스 내용을 반환한다.
+
+        서버가 구독을 지원하면 처음 읽을 때 구독하고 내용을 보관해 두었다가, 변경
+        알림을 받기 전까지는 서버에 다시 요청하지 않는다. 서버가 내려가면 알림을
+        받을 수 없으므로 보관한 내용도 쓰지 않는다.
+        """
+        from pydantic import AnyUrl
+
+        server_name = self.router.server_for(uri)
+        if not server_name:
+            raise KeyError(uri)
+        # 알림의 URI와 비교할 수 있도록 정규화한다
+        key = str(AnyUrl(uri))
+        server = self.servers.servers[server_name]
+        cached = self.resource_cache.get(key)
+        if cached and server.running and cached[0] is server.session:
+            return cached[1]
+
+        async with self.servers.use(server_name) as session:
+            resources = server.init_result.capabilities.resources
+            subscribable = bool(resources and resources.subscribe)
+            if subscribable and self.subscriptions.get(key) is not session:
+                # 읽는 도중의 변경도 놓치지 않도록 먼저 구독한다
+                await session.subscribe_resource(AnyUrl(uri))
+                self.subscriptions[key] = session
+            updates = self._resource_updates.get(key, 0)
+            with tracer.span("mcp.read_resource", {"uri": uri}):
+                result = await self._read_resource(session, uri)
+        if not result or not result.contents:
+            return None
+        text = result.contents[0].text
+        if subscribable and self._resource_updates.get(key, 0) == updates:
+            self.resource_cache[key] = (session, text)
+        return text
 
     async def get_resource(self, uri: str) -> None:
         """리소스 URI를 통해 MCP 세션에서 콘텐츠 가져오기"""
-        session = self.sessions.get(uri)
-        if not session and uri.startswith("papers://"):
-            for k, s in self.sessions.items():
-                if k.startswith("papers://"):
-                    session = s
-                    uri = k
-                    break
-        if not session:
+        if not self.router.server_for(uri):
             print(f"Resource '{uri}' not found.")
             return
         try:
-            result = await session.read_resource(uri=uri)
-            if result and result.contents:
-                print(f"\nResource: {uri}\n{result.contents[0].text}")
+            text = await self.read_resource_text(uri)
+            if text is not None:
+                print(f"\nResource: {uri}\n{text}")
             else:
                 print("No content available.")
         except Exception as e:
@@ -148,29 +383,74 @@ class MCP_ChatBot:
             if p['arguments']:
                 print("  Arguments:")
                 for arg in p['arguments']:
-                    # PromptArgument 객체에는 .name 속성만 사용
-                    name = getattr(arg, 'name', '')
-                    print(f"    - {name}")
+                    print(f"    - {arg['name']}")
+
+    async def get_prompt_text(self, prompt_name: str, args: Dict) -> Optional[str]:
+        """프롬프트를 인자로 채워 첫 메시지의 텍스트를 반환"""
+        server_name = self.router.server_for(prompt_name)
+        if not server_name:
+            raise KeyError(f"Prompt '{prompt_name}' not found.")
+        async with self.servers.use(server_name) as session:
+            result = await session.get_prompt(prompt_name, arguments=args)
+        if not result or not result.messages:
+            return None
+        content = result.messages[0].content
+        if isinstance(content, str):
+            return content
+        if hasattr(content, 'text'):
+            return content.text
+        return " ".join([
+            item.text if hasattr(item, 'text') else str(item)
+            for item in content
+        ])
+
+    async def run_prompt_fanout(self, prompt_name: str, args_list: List[Dict],
+                                parallelism: int = PROMPT_PARALLELISM) -> str:
+        """
+        같은 프롬프트를 여러 인자 조합으로 동시에 실행하고 결과를 하나의 보고서로 합친다.
+
+        최대 parallelism개씩 실행하며, 여러 실행에서 같은 인자로 호출한 도구
+        (예: 겹치는 논문의 extract_info)는 한 번만 호출하고 결과를 공유한다.
+        """
+        semaphore = asyncio.Semaphore(max(parallelism, 1))
+        shared_results: Dict[str, asyncio.Future] = {}
+
+        async def run_one(args: Dict) -> str:
+            label = ", ".join(f"{k}={v}" for k, v in args.items())
+            async with semaphore:
+                answer = None
+                try:
+                    text = await self.get_prompt_text(prompt_name, args)
+                    if text:
+                        answer = await self.run_query(text, shared_results=shared_results)
+                except Exception as e:
+                    print(f"[{label}] Error: {e}")
+                print(f"[{label}] {'완료' if answer else '실패'}")
+            return f"## {label}\n\n{answer or '(응답을 만들지 못했다)'}"
+
+        with tracer.span("chatbot.prompt_fanout", {"prompt": prompt_name, "runs": len(args_list)}):
+            sections = await asyncio.gather(*(run_one(args) for args in args_list))
+        return f"# {prompt_name}\n\n" + "\n\n".join(sections)
 
     async def execute_prompt(self, prompt_name: str, args: Dict) -> None:
-        """지정된 프롬프트 실행 후 결과로 쿼리 처리"""
-        session = self.sessions.get(prompt_name)
-        if not session:
+        """
+        지정된 프롬프트 실행 후 결과로 쿼리 처리.
+
+        인자 값을 쉼표로 나열하면(예: topic=a,b,c) 값마다 동시에 실행하고 합친
+        보고서를 출력한다. 여러 인자를 나열하면 모든 조합을 실행한다.
+        """
+        if not self.router.server_for(prompt_name):
             print(f"Prompt '{prompt_name}' not found.")
             return
+        values = {key: [v.strip() for v in val.split(",") if v.strip()] or [val] for key, val in args.items()}
+        args_list = [dict(zip(values, combo)) for combo in itertools.product(*values.values())]
         try:
-            result = await session.get_prompt(prompt_name, arguments=args)
-            if result and result.messages:
-                content = result.messages[0].content
-                if isinstance(content, str):
-                    text = content
-                elif hasattr(content, 'text'):
-                    text = content.text
-                else:
-                    text = " ".join([
-                        item.text if hasattr(item, 'text') else str(item)
-                        for item in content
-                    ])
+            if len(args_list) > 1:
+                print(f"\nExecuting prompt '{prompt_name}' for {len(args_list)} argument sets...")
+                print(await self.run_prompt_fanout(prompt_name, args_list))
+                return
+            text = await self.get_prompt_text(prompt_name, args)
+            if text:
                 print(f"\nExecuting prompt '{prompt_name}'...")
                 await self.process_query(text)
         except Exception as e:
@@ -179,16 +459,23 @@ class MCP_ChatBot:
     async def chat_loop(self) -> None:
         """사용자 상호작용 메인 루프"""
         print("\nMCP Chatbot Started!")
-        print("Type queries, 'quit', '@folders', '@<topic>', '/prompts', '/prompt <name> <arg=value>'")
+        print("Type queries, 'quit', '@folders [recent|size|name] [page]', '@<topic>', '/prompts', '/prompt <name> <arg=value>'")
         while True:
-            q = input("\nQuery: ").strip()
+            # 입력을 기다리는 동안에도 이벤트 루프가 알림과 유휴 종료를 처리하도록 별도 스레드에서 읽는다
+            q = (await asyncio.to_thread(input, "\nQuery: ")).strip()
             if not q:
                 continue
             if q.lower() == 'quit':
                 break
             if q.startswith("@"):
-                topic = q[1:]
-                uri = "papers://folders" if topic == "folders" else f"papers://{topic}"
+                # @folders [recent|size|name] [페이지]
+                topic, *options = q[1:].split() or [""]
+                if topic == "folders" and options:
+                    sort = options[0]
+                    page = options[1] if len(options) > 1 else "1"
+                    uri = f"papers://folders/{sort}/{page}"
+                else:
+                    uri = "papers://folders" if topic == "folders" else f"papers://{topic}"
                 await self.get_resource(uri)
                 continue
             if q.startswith("/"):
@@ -212,11 +499,82 @@ class MCP_ChatBot:
                 continue
             await self.process_query(q)
 
+    async def run_batch(self, input_path: str, output_path: str, parallelism: int = 4,
+                        timeout: Optional[float] = None) -> Dict[str, int]:
+        """
+        JSONL 파일의 쿼리를 parallelism개씩 동시에 처리하고 결과를 JSONL로 기록한다.
+
+        입력 한 줄은 {"id": ..., "query": "..."}이며 id가 없으면 줄 번호를 쓴다.
+        결과는 끝나는 대로 output_path에 덧붙이므로, 중단된 뒤 다시 실행하면 이미
+        응답을 받은 id는 건너뛰고 나머지(오류로 끝난 것 포함)만 처리한다.
+        """
+        done = set()
+        if os.path.exists(output_path):
+            with open(output_path, "r") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # 중단되며 잘린 마지막 줄
+                        continue
+                    if "answer" in record:
+                        done.add(json.dumps(record.get("id")))
+
+        queue: asyncio.Queue = asyncio.Queue()
+        with open(input_path, "r") as f:
+            for number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                item = json.loads(line)
+                item.setdefault("id", number)
+                if json.dumps(item["id"]) not in done:
+                    queue.put_nowait(item)
+
+        counts = {"skipped": len(done), "succeeded": 0, "failed": 0}
+        total = queue.qsize()
+
+        async def worker(out) -> None:
+            while not queue.empty():
+                item = queue.get_nowait()
+                stats = QueryStats()
+                record = {"id": item["id"], "query": item["query"]}
+                started = time.perf_counter()
+                try:
+                    answer = await asyncio.wait_for(self.run_query(item["query"], stats=stats), timeout)
+                    if answer is None:
+                        record["error"] = "도구 호출에 실패하여 응답을 만들지 못했다."
+                    else:
+                        record["answer"] = answer
+                except asyncio.TimeoutError:
+                    record["error"] = f"{timeout}초 안에 응답하지 못했다."
+                except Exception as e:
+                    record["error"] = str(e)
+                record.update(asdict(stats), total_seconds=time.perf_counter() - started)
+                counts["failed" if "error" in record else "succeeded"] += 1
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+                print(f"[{counts['succeeded'] + counts['failed']}/{total}] {item['id']}: "
+                      f"{'error' if 'error' in record else 'ok'} ({record['total_seconds']:.1f}s)")
+
+        with open(output_path, "a") as out:
+            if out.tell() and not _ends_with_newline(output_path):
+                # 잘린 마지막 줄 뒤에 이어 쓰면 새 결과까지 읽을 수 없게 된다
+                out.write("\n")
+            await asyncio.gather(*(worker(out) for _ in range(max(parallelism, 1))))
+        return counts
+
     async def cleanup(self) -> None:
         """리소스 정리"""
-        await self.exit_stack.aclose()
+        await self.servers.aclose()
 
 async def main() -> None:
+    import nest_asyncio
+    from dotenv import load_dotenv
+
+    # 환경 변수 로드
+    load_dotenv()
+    # 추적 내보내기 설정은 .env의 환경 변수를 읽은 뒤에 한다
+    tracer.configure("mcp-chatbot")
     nest_asyncio.apply()
     chatbot = MCP_ChatBot()
     try:
@@ -225,5 +583,22 @@ async def main() -> None:
     finally:
         await chatbot.cleanup()
 
+async def batch_main(input_path: str, output_path: str, parallelism: int = 4,
+                     timeout: Optional[float] = None) -> None:
+    """서버에 연결한 뒤 JSONL 파일의 쿼리를 일괄 처리"""
+    from dotenv import load_dotenv
+
+    # 환경 변수 로드
+    load_dotenv()
+    # 추적 내보내기 설정은 .env의 환경 변수를 읽은 뒤에 한다
+    tracer.configure("mcp-chatbot")
+    chatbot = MCP_ChatBot()
+    try:
+        await chatbot.connect_to_servers()
+        counts = await chatbot.run_batch(input_path, output_path, parallelism, timeout)
+        print(f"\n성공 {counts['succeeded']}건, 실패 {counts['failed']}건, 이전 실행에서 완료 {counts['skipped']}건")
+    finally:
+        await chatbot.cleanup()
+
 if __name__ == "__main__":
     asyncio.run(main())
@@ -0,0 +1,253 @@
+import time
+import bisect
+import functools
+import inspect
+import threading
+from typing import Callable, Dict, List, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """단조 증가하는 카운터."""
+    kind = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def items(self) -> List[Tuple[Tuple[str, ...], float]]:
+        """(레이블 값, 카운트) 목록의 스냅샷을 반환한다."""
+        with self._lock:
+            return list(self._values.items())
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.label_names, k)} {v}" for k, v in self.items()]
+
+
+class Gauge(_Metric):
+    """증감하는 값. fn을 주면 노출할 때마다 값을 계산한다."""
+    kind = "gauge"
+
+    def __init__(self, *args, fn: Callable[[], Dict[Tuple[str, ...], float]] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._fn = fn
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels: str) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def samples(self) -> List[str]:
+        if self._fn:
+            items = list(self._fn().items())
+        else:
+            with self._lock:
+                items = list(self._values.items())
+        return [f"{self.name}{_format_labels(self.label_names, k)} {v}" for k, v in items]
+
+
+class Histogram(_Metric):
+    """누적 버킷 히스토그램."""
+    kind = "histogram"
+
+    def __init__(self, *args, buckets: Sequence[float] = DEFAULT_BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(sorted(buckets))
+        # 라벨 -> (버킷별 개수, 합계, 전체 개수)
+        self._values: Dict[Tuple[str, ...], list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            if index < len(self.buckets):
+                state[0][index] += 1
+            state[1] += value
+            state[2] += 1
+
+    def samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            items = [(k, (list(v[0]), v[1], v[2])) for k, v in self._values.items()]
+        for key, (counts, total, count) in items:
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                labels = _format_labels(self.label_names, key, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.label_names, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {count}")
+        return lines
+
+
+class Registry:
+    """메트릭 모음. render()는 Prometheus 텍스트 노출 형식을 반환한다."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, help_text: str, labels: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, help_text, labels))
+
+    def gauge(self, name: str, help_text: str, labels: Sequence[str] = (), fn=None) -> Gauge:
+        return self.register(Gauge(name, help_text, labels, fn=fn))
+
+    def histogram(self, name: str, help_text: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, help_text, labels, buckets=buckets))
+
+    def render(self) -> str:
+        return "\n".join(metric.render() for metric in self._metrics) + "\n"
+
+
+# 프로세스 전체에서 공유하는 메트릭
+registry = Registry()
+
+handler_latency = registry.histogram(
+    "mcp_handler_duration_seconds", "MCP 도구/리소스 처리 시간", ("kind", "name"))
+handler_in_flight = registry.gauge(
+    "mcp_handler_in_flight", "처리 중인 MCP 도구/리소스 요청 수", ("kind", "name"))
+handler_errors = registry.counter(
+    "mcp_handler_errors_total", "예외로 끝난 MCP 도구/리소스 요청 수", ("kind", "name"))
+arxiv_latency = registry.histogram(
+    "arxiv_request_duration_seconds", "arXiv API 페이지 요청 시간")
+arxiv_errors = registry.counter(
+    "arxiv_request_errors_total", "실패한 arXiv API 요청 수", ("error",))
+arxiv_hedges = registry.counter(
+    "arxiv_hedged_requests_total", "지연된 arXiv 요청을 대신해 보낸 추가 요청 수")
+arxiv_fallbacks = registry.counter(
+    "arxiv_fallbacks_total", "arXiv 대신 로컬 저장소로 응답한 검색 수", ("reason",))
+arxiv_breaker_open = registry.gauge(
+    "arxiv_circuit_open", "arXiv 회로 차단기가 열려 있으면 1")
+arxiv_breaker_open.set(0)
+http_cache_lookups = registry.counter(
+    "http_cache_lookups_total", "HTTP 도구 캐시 항목 조회 결과 (fresh, not_modified, changed)", ("result",))
+store_bytes = registry.counter(
+    "store_bytes_total", "논문 저장소에서 읽고 쓴 바이트 수", ("op",))
+cache_requests = registry.counter(
+    "cache_requests_total", "캐시 조회 수", ("cache", "result"))
+sse_sessions = registry.gauge(
+    "sse_active_sessions", "연결된 SSE 세션 수")
+sse_sessions.set(0)
+
+
+def _cache_hit_ratios() -> Dict[Tuple[str, ...], float]:
+    totals: Dict[str, List[float]] = {}
+    for (cache, result), value in cache_requests.items():
+        hits_and_total = totals.setdefault(cache, [0.0, 0.0])
+        if result == "hit":
+            hits_and_total[0] += value
+        hits_and_total[1] += value
+    return {(cache,): hits / total for cache, (hits, total) in totals.items() if total}
+
+
+registry.gauge("cache_hit_ratio", "캐시 적중률", ("cache",), fn=_cache_hit_ratios)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    """캐시 조회 결과를 기록한다."""
+    cache_requests.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def measured(kind: str, name: str, fn: Callable) -> Callable:
+    """핸들러의 처리 시간, 동시 처리 수, 오류 수를 기록하도록 감싼다."""
+    if inspect.iscoroutinefunction(fn):
+        @functools.wraps(fn)
+        async def async_wrapper(*args, **kwargs):
+            handler_in_flight.inc(kind=kind, name=name)
+            started = time.perf_counter()
+            try:
+                return await fn(*args, **kwargs)
+            except BaseException:
+                handler_errors.inc(kind=kind, name=name)
+                raise
+            finally:
+                handler_latency.observe(time.perf_counter() - started, kind=kind, name=name)
+                handler_in_flight.dec(kind=kind, name=name)
+        return async_wrapper
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        handler_in_flight.inc(kind=kind, name=name)
+        started = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        except BaseException:
+            handler_errors.inc(kind=kind, name=name)
+            raise
+        finally:
+            handler_latency.observe(time.perf_counter() - started, kind=kind, name=name)
+            handler_in_flight.dec(kind=kind, name=name)
+    return wrapper
+
+
+def track_sse_sessions(app, sse_path: str):
+    """SSE 연결이 열려 있는 동안 sse_active_sessions를 올려 두는 ASGI 미들웨어."""
+    async def wrapped(scope, receive, send):
+        if scope["type"] == "http" and scope["path"] == sse_path:
+            sse_sessions.inc()
+            try:
+                await app(scope, receive, send)
+            finally:
+                sse_sessions.dec()
+        else:
+            await app(scope, receive, send)
+    return wrapped
@@ -0,0 +1,755 @@
+import os
+import re
+import sys
+import json
+import time
+import bisect
+import shutil
+import threading
+import functools
+import unicodedata
+from array import array
+from collections import Counter
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows에서는 프로세스 간 잠금 없이 동작한다
+    fcntl = None
+
+from tracing import tracer
+import metrics
+
+# 모든 논문을 한 번씩만 기록하는 추가 전용 로그
+CORPUS_FILE = "corpus.jsonl"
+# 주제 디렉토리마다 두는 소속 논문 ID 목록
+TOPIC_FILE = "topic.json"
+# 이전 버전의 주제별 논문 파일 (병합 명령에서만 읽는다)
+LEGACY_PAPERS_FILE = "papers_info.json"
+# 주제별 논문 수, 갱신 시각, 최신 발행일을 모아 둔 목록
+CATALOG_FILE = "catalog.json"
+# 여러 프로세스의 읽기-수정-쓰기를 직렬화하는 잠금 파일
+LOCK_FILE = ".lock"
+# 주제 목록 정렬 기준: 최근 갱신순, 논문 수순, 이름순
+CATALOG_SORTS = ("recent", "size", "name")
+
+
+@dataclass(slots=True)
+class PaperRecord:
+    """
+    메모리에 상주하는 논문 한 건의 압축 표현.
+
+    __slots__ 기반이라 논문마다 dict를 두지 않으며, 저자 이름과 발행일처럼
+    자주 반복되는 문자열은 intern하여 여러 논문이 같은 객체를 공유한다.
+    """
+    paper_id: str
+    title: str
+    authors: Tuple[str, ...]
+    summary: str
+    pdf_url: str
+    published: str
+
+    @classmethod
+    def from_dict(cls, paper_id: str, info: dict) -> "PaperRecord":
+        """papers_info.json의 항목 하나로부터 레코드를 만든다."""
+        return cls(
+            paper_id=sys.intern(paper_id),
+            title=info.get("title", ""),
+            authors=tuple(sys.intern(name) for name in info.get("authors", [])),
+            summary=info.get("summary", ""),
+            pdf_url=info.get("pdf_url", ""),
+            published=sys.intern(info.get("published", "")),
+        )
+
+    def to_dict(self) -> dict:
+        """papers_info.json 및 도구 응답에 쓰이는 dict 형태로 변환한다."""
+        return {
+            "title": self.title,
+            "authors": list(self.authors),
+            "summary": self.summary,
+            "pdf_url": self.pdf_url,
+            "published": self.published,
+        }
+
+
+@dataclass(slots=True)
+class TopicInfo:
+    """주제 목록(catalog.json)의 항목 하나."""
+    key: str
+    name: str
+    papers: int
+    updated: float
+    newest: str
+
+    def to_dict(self) -> dict:
+        return {"name": self.name, "papers": self.papers, "updated": self.updated, "newest": self.newest}
+
+
+# 글자와 숫자로 이루어진 단어 (밑줄은 구분자로 본다)
+WORD_PATTERN = re.compile(r"[^\W_]+")
+
+
+@functools.lru_cache(maxsize=65536)
+def _stem(word: str) -> str:
+    """영어 복수형 접미사만 제거하는 가벼운 어간 처리."""
+    if len(word) <= 3 or not word.isascii():
+        return word
+    if word.endswith("ies") and len(word) > 4:
+        return word[:-3] + "y"
+    if word.endswith(("sses", "xes", "ches", "shes")):
+        return word[:-2]
+    if word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+def author_key(name: str) -> str:
+    """저자 이름을 인덱스 키로 정규화한다 (유니코드 정규화, 대소문자 통합, 공백 정리)."""
+    return " ".join(unicodedata.normalize("NFKC", name).casefold().split())
+
+
+def _words(text: str) -> Set[str]:
+    """topic_key와 같은 방식으로 정규화한 단어 집합."""
+    return {_stem(word) for word in set(WORD_PATTERN.findall(unicodedata.normalize("NFKC", text).casefold()))}
+
+
+def topic_key(topic: str) -> str:
+    """
+    주제 이름을 정규화된 디렉토리 키로 변환한다.
+
+    유니코드 정규화와 대소문자 통합 후 구두점과 공백을 하나의 구분자로 접고,
+    단어마다 복수형을 제거한다. "LLM agents", "llm-agents", "LLM  agents"는
+    모두 "llm_agent"가 된다. 글자나 숫자가 하나도 없으면 빈 문자열이 된다.
+    """
+    text = unicodedata.normalize("NFKC", topic).casefold()
+    words = WORD_PATTERN.findall(text)
+    return "_".join(_stem(word) for word in words)
+
+
+class PaperStore:
+    """
+    papers 디렉토리를 읽고 쓰는 저장소.
+
+    논문 본문은 corpus.jsonl에 한 번씩만 기록하고, 각 주제 디렉토리의
+    topic.json은 소속 논문 ID만 참조한다. 코퍼스는 PaperRecord로 변환해
+    메모리에 유지하며, 다른 프로세스가 로그 끝에 덧붙인 부분만 이어서 읽는다.
+    주제 목록은 쓰기마다 catalog.json에 갱신하므로 디렉토리를 훑지 않고 읽는다.
+    topic.json과 catalog.json은 통째로 바꿔치기하여 쓰고, 읽기-수정-쓰기는 .lock
+    파일의 flock으로 묶으므로 여러 서버 프로세스가 같은 디렉토리에 써도 된다.
+    저자, 발행일, 제목/요약 단어 보조 인덱스는 레코드가 메모리에 반영될 때마다
+    함께 갱신한다. 발행일 인덱스는 코퍼스를 읽은 뒤 처음 조회할 때 한 번에 정렬한다.
+    검색 도구, 인덱스, 리소스 렌더링이 모두 이 저장소를 공유한다.
+    """
+
+    def __init__(self, paper_dir: str):
+        self.paper_dir = paper_dir
+        self.corpus_path = os.path.join(paper_dir, CORPUS_FILE)
+        self.catalog_path = os.path.join(paper_dir, CATALOG_FILE)
+        # 논문 ID -> 레코드
+        self._papers: Dict[str, PaperRecord] = {}
+        # 코퍼스 로그에서 이미 읽은 바이트 위치
+        self._corpus_offset = 0
+        # 정규화한 저자 이름 -> 논문 ID 집합
+        self._by_author: Dict[str, Set[str]] = {}
+        # (발행일, 논문 ID)의 정렬된 목록. 코퍼스를 읽을 때는 갱신하지 않고 표시만 해 두었다가
+        # 다음 조회에서 한 번에 정렬하고(_dates_stale), 그 뒤의 추가는 제자리에 끼워 넣는다
+        self._by_date: List[Tuple[str, str]] = []
+        self._dates_stale = False
+        # 제목/요약 단어 -> 문서 번호 배열. 문서 번호는 레코드가 바뀔 때마다 새로 받고,
+        # 이전 번호는 _doc_ids에서 None이 되어 검색에서 빠진다. 로컬 검색을 처음 할 때
+        # 만들고(_words_indexed) 그 뒤로는 레코드가 반영될 때마다 갱신한다
+        self._words_indexed = False
+        self._title_words: Dict[str, array] = {}
+        self._summary_words: Dict[str, array] = {}
+        self._doc_ids: List[Optional[str]] = []
+        self._docs: Dict[str, int] = {}
+        # 주제 키 -> (파일 수정 시각, 표시 이름, 소속 논문 ID 목록)
+        self._topics: Dict[str, Tuple[float, str, List[str]]] = {}
+        # 주제 키 -> 목록 항목과, 읽어 들인 catalog.json의 수정 시각
+        self._catalog: Dict[str, TopicInfo] = {}
+        self._catalog_mtime: Optional[float] = None
+        # 정렬 기준 -> 정렬된 목록 (목록이 바뀌면 비운다)
+        self._catalog_views: Dict[str, List[TopicInfo]] = {}
+        # 주제가 바뀔 때마다 주제 키로 호출할 함수들 (쓰기 스레드에서 호출된다). 다른 프로세스가
+        # 바꾼 주제는 바뀐 catalog.json을 다시 읽을 때(poll_changes 등) 호출한다
+        self.listeners: List[Callable[[str], None]] = []
+        # 동시 수집 작업의 쓰기를 직렬화
+        self._lock = threading.RLock()
+        # 잠금 파일과 중첩 깊이 (self._lock을 잡은 상태에서만 바꾼다)
+        self._lock_file = None
+        self._lock_depth = 0
+
+    @contextmanager
+    def _store_lock(self):
+        """
+        스레드 잠금과 함께 다른 프로세스와 공유하는 파일 잠금을 잡는다.
+
+        같은 스레드 안에서 중첩해 잡을 수 있으며, 가장 바깥에서만 flock을 건다.
+        """
+        with self._lock:
+            if self._lock_depth == 0 and fcntl is not None:
+                os.makedirs(self.paper_dir, exist_ok=True)
+                self._lock_file = open(os.path.join(self.paper_dir, LOCK_FILE), "a")
+                fcntl.flock(self._lock_file, fcntl.LOCK_EX)
+            self._lock_depth += 1
+            try:
+                yield
+            finally:
+                self._lock_depth -= 1
+                if self._lock_depth == 0 and self._lock_file is not None:
+                    fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+                    self._lock_file.close()
+                    self._lock_file = None
+
+    @staticmethod
+    def topic_dir(topic: str) -> str:
+        """주제 이름을 디렉토리 이름으로 변환한다."""
+        return topic_key(topic)
+
+    def _topic_file(self, key: str) -> str:
+        return os.path.join(self.paper_dir, key, TOPIC_FILE)
+
+    # --- 코퍼스 ---
+
+    def _refresh_corpus(self) -> None:
+        """코퍼스 로그에서 아직 읽지 않은 부분을 메모리에 반영한다."""
+        try:
+            size = os.path.getsize(self.corpus_path)
+        except FileNotFoundError:
+            self._clear_papers()
+            return
+        if size == self._corpus_offset:
+            return
+        if size < self._corpus_offset:
+            # 병합 명령 등으로 로그가 다시 쓰였으면 처음부터 읽는다
+            self._clear_papers()
+
+        with tracer.span("store.read_corpus", {"offset": self._corpus_offset, "size": size}), \
+                open(self.corpus_path, "rb") as corpus:
+            corpus.seek(self._corpus_offset)
+            self._dates_stale = True
+            for line in corpus:
+                if not line.endswith(b"\n"):
+                    # 다른 프로세스가 기록 중인 마지막 줄은 다음에 읽는다
+                    break
+                self._corpus_offset += len(line)
+                metrics.store_bytes.inc(len(line), op="read")
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError as e:
+                    print(f"{self.corpus_path} 읽기 오류: {str(e)}")
+                    continue
+                self._put_record(PaperRecord.from_dict(entry.pop("id"), entry))
+
+    def _clear_papers(self) -> None:
+        self._papers.clear()
+        self._by_author.clear()
+        self._by_date.clear()
+        self._title_words.clear()
+        self._summary_words.clear()
+        self._doc_ids.clear()
+        self._docs.clear()
+        self._corpus_offset = 0
+
+    def _index_words(self, record: PaperRecord, title: Optional[Set[str]] = None,
+                     summary: Optional[Set[str]] = None) -> None:
+        previous = self._docs.get(record.paper_id)
+        if previous is not None:
+            self._doc_ids[previous] = None
+        doc = self._docs[record.paper_id] = len(self._doc_ids)
+        self._doc_ids.append(record.paper_id)
+        for word in _words(record.title) if title is None else title:
+            self._title_words.setdefault(word, array("i")).append(doc)
+        for word in _words(record.summary) if summary is None else summary:
+            self._summary_words.setdefault(word, array("i")).append(doc)
+
+    def _ensure_word_index(self) -> None:
+        """
+        제목/요약 단어 인덱스를 처음 한 번 만든다.
+
+        단어 분리는 잠금 밖에서 하고, 그사이 바뀐 레코드는 잠금 안에서 다시 색인한다.
+        """
+        with self._lock:
+            if self._words_indexed:
+                return
+            self._refresh_corpus()
+            records = list(self._papers.values())
+        with tracer.span("store.index_words", {"papers": len(records)}):
+            words = [(record, _words(record.title), _words(record.summary)) for record in records]
+        with self._lock:
+            if self._words_indexed:
+                return
+            for record, title, summary in words:
+                if self._papers.get(record.paper_id) is record:
+                    self._index_words(record, title, summary)
+            for paper_id, record in self._papers.items():
+                if paper_id not in self._docs:
+                    self._index_words(record)
+            self._words_indexed = True
+
+    def _put_record(self, record: PaperRecord) -> None:
+        """레코드를 메모리에 반영하고 보조 인덱스를 갱신한다."""
+        previous = self._papers.get(record.paper_id)
+        if previous is not None:
+            if previous == record:
+                return
+            for author in previous.authors:
+                ids = self._by_author.get(author_key(author))
+                if ids is not None:
+                    ids.discard(record.paper_id)
+            if not self._dates_stale:
+                entry = (previous.published, previous.paper_id)
+                index = bisect.bisect_left(self._by_date, entry)
+                if index < len(self._by_date) and self._by_date[index] == entry:
+                    del self._by_date[index]
+
+        self._papers[record.paper_id] = record
+        if self._words_indexed and (previous is None or (previous.title, previous.summary)
+                                    != (record.title, record.summary)):
+            self._index_words(record)
+        for author in record.authors:
+            self._by_author.setdefault(author_key(author), set()).add(record.paper_id)
+        if not self._dates_stale:
+            bisect.insort(self._by_date, (record.published, record.paper_id))
+
+    def _date_index(self) -> List[Tuple[str, str]]:
+        """발행일 인덱스를 반환한다. 코퍼스를 읽은 뒤 처음 부르면 한 번에 정렬해 만든다."""
+        if self._dates_stale:
+            self._by_date = sorted((record.published, paper_id)
+                                   for paper_id, record in self._papers.items())
+            self._dates_stale = False
+        return self._by_date
+
+    def get(self, paper_id: str) -> Optional[PaperRecord]:
+        """논문 ID에 해당하는 레코드를 반환한다."""
+        with self._lock:
+            self._refresh_corpus()
+            return self._papers.get(paper_id)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh_corpus()
+            return len(self._papers)
+
+    def snapshot(self) -> Tuple[List[PaperRecord], int]:
+        """모든 논문의 최신 레코드와, 그 시점까지 읽은 코퍼스 로그 위치를 반환한다."""
+        with self._lock:
+            self._refresh_corpus()
+            return list(self._papers.values()), self._corpus_offset
+
+    def records_since(self, offset: int) -> Tuple[List[PaperRecord], int]:
+        """
+        코퍼스 로그의 offset 이후에 덧붙은 레코드와 새 로그 위치를 반환한다.
+
+        같은 논문이 여러 번 나올 수 있으며 뒤에 나온 레코드가 최신이다.
+        """
+        with self._lock:
+            self._refresh_corpus()
+            end = self._corpus_offset
+        records = []
+        with open(self.corpus_path, "rb") as corpus:
+            corpus.seek(offset)
+            data = corpus.read(end - offset)
+        metrics.store_bytes.inc(len(data), op="read")
+        for line in data.splitlines():
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            records.append(PaperRecord.from_dict(entry.pop("id"), entry))
+        return records, end
+
+    # --- 주제 ---
+
+    def topic_dirs(self) -> List[str]:
+        """topic.json을 가진 모든 주제 키를 반환한다."""
+        if not os.path.isdir(self.paper_dir):
+            return []
+        return [
+            name for name in os.listdir(self.paper_dir)
+            if os.path.isfile(self._topic_file(name))
+        ]
+
+    def _load_membership(self, key: str) -> Tuple[str, List[str]]:
+        file_path = self._topic_file(key)
+        try:
+            mtime = os.path.getmtime(file_path)
+        except FileNotFoundError:
+            self._topics.pop(key, None)
+            return key, []
+
+        cached = self._topics.get(key)
+        metrics.record_cache("topic_membership", bool(cached and cached[0] == mtime))
+        if cached and cached[0] == mtime:
+            return cached[1], cached[2]
+
+        with open(file_path, "rb") as json_file:
+            data = json_file.read()
+        metrics.store_bytes.inc(len(data), op="read")
+        raw = json.loads(data)
+        name = raw.get("name", key)
+        paper_ids = [sys.intern(paper_id) for paper_id in raw.get("paper_ids", [])]
+        self._topics[key] = (mtime, name, paper_ids)
+        return name, paper_ids
+
+    def topic_name(self, key: str) -> str:
+        """주제 키의 표시 이름(처음 검색할 때 사용한 이름)을 반환한다."""
+        with self._lock:
+            return self._load_membership(key)[0]
+
+    def load_topic(self, key: str) -> Dict[str, PaperRecord]:
+        """
+        주제에 속한 논문 레코드를 반환한다.
+
+        주제가 없으면 빈 dict를, topic.json이 손상된 경우 json.JSONDecodeError를 그대로 전달한다.
+        """
+        with self._lock:
+            _, paper_ids = self._load_membership(key)
+            self._refresh_corpus()
+            return {
+                paper_id: self._papers[paper_id]
+                for paper_id in paper_ids
+                if paper_id in self._papers
+            }
+
+    # --- 보조 인덱스 ---
+
+    def query(self, author: Optional[str] = None, since: Optional[str] = None,
+              until: Optional[str] = None, topic: Optional[str] = None,
+              limit: Optional[int] = None) -> List[PaperRecord]:
+        """
+        저자, 발행일 범위, 주제로 논문을 찾아 최신 발행일순으로 반환한다.
+
+        since와 until은 날짜 접두사로 비교하므로 until="2024"는 2024년 전체를 포함한다.
+        저자는 대소문자와 공백 차이를 무시하고 비교하며, 정확히 일치하는 저자가 없으면
+        이름의 일부가 일치하는 저자를 찾는다. 가장 좁은 조건의 인덱스에서 후보를 고른 뒤
+        나머지 조건으로 거른다.
+        """
+        with self._lock:
+            self._refresh_corpus()
+            low = since or ""
+            high = (until + "\uffff") if until else None
+
+            candidates: Optional[Set[str]] = None
+            if author:
+                key = author_key(author)
+                candidates = set(self._by_author.get(key, ()))
+                if not candidates:
+                    for name, ids in self._by_author.items():
+                        if key in name:
+                            candidates.update(ids)
+            if topic:
+                members = set(self._load_membership(topic_key(topic))[1])
+                candidates = members if candidates is None else candidates & members
+
+            if candidates is None:
+                # 날짜 조건만 있으면 정렬된 발행일 인덱스의 구간을 그대로 사용한다
+                by_date = self._date_index()
+                start = bisect.bisect_left(by_date, (low,))
+                end = len(by_date) if high is None else bisect.bisect_left(by_date, (high,))
+                records = [self._papers[paper_id] for _, paper_id in reversed(by_date[start:end])]
+            else:
+                records = sorted(
+                    (self._papers[p] for p in candidates if p in self._papers),
+                    key=lambda r: (r.published, r.paper_id), reverse=True,
+                )
+                records = [r for r in records
+                           if r.published >= low and (high is None or r.published < high)]
+            return records if limit is None else records[:limit]
+
+    def search_local(self, topic: str, limit: int) -> List[PaperRecord]:
+        """
+        arXiv에 요청할 수 없을 때 쓰는 로컬 검색.
+
+        같은 주제로 저장한 논문이 있으면 최신 발행일순으로 반환하고, 없으면 제목과
+        요약에 주제 단어가 많이 나오는 논문을 고른다.
+        """
+        members = self.load_topic(topic_key(topic))
+        if members:
+            return sorted(members.values(), key=lambda r: r.published, reverse=True)[:limit]
+
+        self._ensure_word_index()
+        with self._lock:
+            self._refresh_corpus()
+            # 단어 인덱스에서 제목에 나온 단어는 2점, 요약에 나온 단어는 1점으로 센다
+            scores: Counter = Counter()
+            for word in _words(topic):
+                title = self._title_words.get(word, ())
+                scores.update(title)
+                scores.update(title)
+                scores.update(self._summary_words.get(word, ()))
+            scored = []
+            for doc, score in scores.items():
+                paper_id = self._doc_ids[doc]
+                if paper_id is not None:
+                    record = self._papers[paper_id]
+                    scored.append((score, record.published, record))
+            scored.sort(key=lambda item: (item[0], item[1], item[2].paper_id), reverse=True)
+            return [record for _, _, record in scored[:limit]]
+
+    # --- 주제 목록 ---
+
+    def _load_catalog(self) -> Dict[str, TopicInfo]:
+        """catalog.json이 바뀌었으면 다시 읽는다. 없으면 주제 폴더로부터 만든다."""
+        try:
+            mtime = os.path.getmtime(self.catalog_path)
+        except FileNotFoundError:
+            if self._catalog_mtime is not None or not self._catalog:
+                self._rebuild_catalog()
+            return self._catalog
+        if mtime == self._catalog_mtime:
+            return self._catalog
+
+        with open(self.catalog_path, "rb") as catalog_file:
+            data = catalog_file.read()
+        metrics.store_bytes.inc(len(data), op="read")
+        try:
+            raw = json.loads(data)
+        except json.JSONDecodeError as e:
+            print(f"{self.catalog_path} 읽기 오류: {str(e)}")
+            self._rebuild_catalog()
+            return self._catalog
+        previous = self._catalog if self._catalog_mtime is not None else None
+        self._catalog = {
+            key: TopicInfo(sys.intern(key), entry["name"], entry["papers"], entry["updated"], entry["newest"])
+            for key, entry in raw.items()
+        }
+        self._catalog_mtime = mtime
+        self._catalog_views.clear()
+        if previous is not None:
+            # 다른 프로세스가 쓴 변경도 같은 프로세스의 쓰기처럼 알린다
+            for key in sorted(previous.keys() | self._catalog.keys()):
+                if previous.get(key) != self._catalog.get(key):
+                    self._notify(key)
+        return self._catalog
+
+    def poll_changes(self) -> None:
+        """다른 프로세스가 catalog.json을 바꿨으면 다시 읽고 바뀐 주제마다 listeners를 부른다."""
+        with self._lock:
+            self._load_catalog()
+
+    def _notify(self, key: str) -> None:
+        for listener in self.listeners:
+            listener(key)
+
+    def _save_catalog(self) -> None:
+        if not os.path.isdir(self.paper_dir):
+            return
+        data = json.dumps({key: info.to_dict() for key, info in self._catalog.items()},
+                          ensure_ascii=False).encode("utf-8")
+        _write_file(self.catalog_path, data)
+        metrics.store_bytes.inc(len(data), op="write")
+        self._catalog_mtime = os.path.getmtime(self.catalog_path)
+        self._catalog_views.clear()
+
+    def _rebuild_catalog(self) -> None:
+        """모든 topic.json을 읽어 주제 목록을 새로 만든다."""
+        if not os.path.isdir(self.paper_dir):
+            self._catalog = {}
+            return
+        with self._store_lock():
+            self._refresh_corpus()
+            catalog = {}
+            for key in self.topic_dirs():
+                try:
+                    name, paper_ids = self._load_membership(key)
+                except json.JSONDecodeError:
+                    continue
+                published = [self._papers[p].published for p in paper_ids if p in self._papers]
+                catalog[key] = TopicInfo(key, name, len(paper_ids), os.path.getmtime(self._topic_file(key)),
+                                         max(published, default=""))
+            self._catalog = catalog
+            self._save_catalog()
+
+    def rebuild_catalog(self) -> int:
+        """주제 목록을 주제 폴더로부터 다시 만들고 주제 수를 반환한다."""
+        with self._lock:
+            self._rebuild_catalog()
+            return len(self._catalog)
+
+    def catalog(self, sort: str = "recent", offset: int = 0,
+                limit: Optional[int] = None) -> Tuple[int, List[TopicInfo]]:
+        """
+        정렬된 주제 목록의 일부와 전체 주제 수를 반환한다.
+
+        정렬 결과는 목록이 바뀔 때까지 재사용하므로 반복 조회는 슬라이스 비용만 든다.
+        """
+        if sort not in CATALOG_SORTS:
+            raise ValueError(f"정렬 기준은 {', '.join(CATALOG_SORTS)} 중 하나여야 한다: {sort}")
+        with self._lock:
+            catalog = self._load_catalog()
+            view = self._catalog_views.get(sort)
+            if view is None:
+                if sort == "recent":
+                    view = sorted(catalog.values(), key=lambda t: t.updated, reverse=True)
+                elif sort == "size":
+                    view = sorted(catalog.values(), key=lambda t: (-t.papers, t.key))
+                else:
+                    view = sorted(catalog.values(), key=lambda t: t.key)
+                self._catalog_views[sort] = view
+            end = None if limit is None else offset + limit
+            return len(view), view[offset:end]
+
+    def topic_info(self, key: str) -> Optional[TopicInfo]:
+        """주제 목록에서 주제 키의 항목을 반환한다."""
+        with self._lock:
+            return self._load_catalog().get(key)
+
+    def _update_catalog(self, key: str, name: str, paper_count: int, published: Iterable[str]) -> None:
+        catalog = self._load_catalog()
+        previous = catalog.get(key)
+        newest = max([*published, previous.newest if previous else ""])
+        catalog[key] = TopicInfo(key, name, paper_count, time.time(), newest)
+        self._save_catalog()
+
+    # --- 쓰기 ---
+
+    def add_papers(self, topic: str, records: Iterable[PaperRecord]) -> str:
+        """
+        레코드를 코퍼스에 기록하고 주제 소속에 추가한 뒤 topic.json 경로를 반환한다.
+
+        내용이 바뀌지 않은 논문은 코퍼스에 다시 쓰지 않는다. 주제 이름에 글자나
+        숫자가 없으면 ValueError를 발생시킨다.
+        """
+        with self._store_lock():
+            return self._add_papers(topic, records)
+
+    def _add_papers(self, topic: str, records: Iterable[PaperRecord]) -> str:
+        with tracer.span("store.add_papers", {"topic": topic}):
+            return self._write_papers(topic, records)
+
+    def _write_papers(self, topic: str, records: Iterable[PaperRecord]) -> str:
+        key = topic_key(topic)
+        if not key:
+            raise ValueError(f"주제 이름에 글자나 숫자가 없다: {topic!r}")
+        os.makedirs(os.path.join(self.paper_dir, key), exist_ok=True)
+        self._refresh_corpus()
+
+        lines = []
+        new_ids = []
+        published = []
+        for record in records:
+            new_ids.append(record.paper_id)
+            published.append(record.published)
+            if self._papers.get(record.paper_id) != record:
+                self._put_record(record)
+                lines.append(json.dumps({"id": record.paper_id, **record.to_dict()}) + "\n")
+        if lines:
+            data = "".join(lines).encode("utf-8")
+            # 덧붙인 줄은 다음 _refresh_corpus에서 다시 읽혀도 결과가 같다
+            with open(self.corpus_path, "ab") as corpus:
+                corpus.write(data)
+            metrics.store_bytes.inc(len(data), op="write")
+
+        try:
+            name, paper_ids = self._load_membership(key)
+        except json.JSONDecodeError:
+            name, paper_ids = key, []
+        if name == key:
+            name = topic
+        members = dict.fromkeys(paper_ids)
+        members.update(dict.fromkeys(new_ids))
+
+        file_path = self._topic_file(key)
+        data = json.dumps({"name": name, "paper_ids": list(members)}, indent=2).encode("utf-8")
+        _write_file(file_path, data)
+        metrics.store_bytes.inc(len(data), op="write")
+        self._topics[key] = (os.path.getmtime(file_path), name, list(members))
+        self._update_catalog(key, name, len(members), published)
+        self._notify(key)
+        return file_path
+
+    def dedupe(self) -> Dict[str, int]:
+        """
+        기존 papers/ 트리를 정규화된 주제와 단일 코퍼스로 병합한다.
+
+        이전 버전의 papers_info.json 폴더를 모두 읽어 코퍼스로 옮기고, 정규화 키가
+        같은 주제 폴더를 하나로 합친다. 마지막으로 코퍼스 로그를 최신 레코드만
+        남기도록 다시 쓴다. 여러 번 실행해도 결과는 같다.
+
+        반환:
+            병합된 폴더 수, 옮긴 논문 수, 코퍼스의 논문 수
+        """
+        with self._store_lock():
+            stats = {"merged_folders": 0, "migrated_papers": 0, "papers": 0}
+            if not os.path.isdir(self.paper_dir):
+                return stats
+
+            for name in sorted(os.listdir(self.paper_dir)):
+                folder = os.path.join(self.paper_dir, name)
+                if name.startswith(("_", ".")) or not os.path.isdir(folder):
+                    # '_'로 시작하는 폴더는 PDF/텍스트 등 주제가 아닌 저장 공간이다
+                    continue
+                legacy_file = os.path.join(folder, LEGACY_PAPERS_FILE)
+                topic_file = self._topic_file(name)
+                key = topic_key(name.replace("_", " "))
+
+                if os.path.isfile(legacy_file):
+                    try:
+                        with open(legacy_file, "r") as json_file:
+                            papers_info = json.load(json_file)
+                    except json.JSONDecodeError as e:
+                        print(f"{legacy_file} 읽기 오류: {str(e)}")
+                        continue
+                    records = [
+                        PaperRecord.from_dict(paper_id, info)
+                        for paper_id, info in papers_info.items()
+                    ]
+                    self._add_papers(name.replace("_", " "), records)
+                    os.remove(legacy_file)
+                    stats["migrated_papers"] += len(records)
+                    stats["merged_folders"] += 1
+
+                if name != key and os.path.isfile(topic_file):
+                    # 정규화 키와 다른 폴더의 소속 목록을 정규화된 폴더로 합친다
+                    topic, paper_ids = self._load_membership(name)
+                    records = [self._papers[p] for p in paper_ids if p in self._papers]
+                    self._add_papers(topic, records)
+                    os.remove(topic_file)
+                    self._topics.pop(name, None)
+                    stats["merged_folders"] += 1
+
+                if name != key and not os.listdir(folder):
+                    shutil.rmtree(folder)
+
+            self._compact_corpus()
+            self._rebuild_catalog()
+            stats["papers"] = len(self._papers)
+            return stats
+
+    def _compact_corpus(self) -> None:
+        """코퍼스 로그를 논문당 최신 레코드 한 줄로 다시 쓴다."""
+        self._refresh_corpus()
+        tmp_path = self.corpus_path + ".tmp"
+        with open(tmp_path, "w") as corpus:
+            for paper_id, record in self._papers.items():
+                corpus.write(json.dumps({"id": paper_id, **record.to_dict()}) + "\n")
+        os.replace(tmp_path, self.corpus_path)
+        self._corpus_offset = os.path.getsize(self.corpus_path)
+
+
+def _write_file(path: str, data: bytes) -> None:
+    """임시 파일에 쓴 뒤 바꿔치기하여, 읽는 쪽이 반쯤 쓴 파일을 보지 않게 한다."""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def render_topic_markdown(topic: str, records: Dict[str, PaperRecord]) -> str:
+    """주제의 논문 레코드를 papers://{topic} 리소스용 마크다운으로 렌더링한다."""
+    parts = [
+        f"# {topic.replace('_', ' ').title()} 주제의 논문\n\n",
+        f"총 논문 수: {len(records)}\n\n",
+    ]
+    for paper_id, record in records.items():
+        parts.append(f"## {record.title}\n")
+        parts.append(f"- **논문 ID**: {paper_id}\n")
+        parts.append(f"- **저자**: {', '.join(record.authors)}\n")
+        parts.append(f"- **발행일**: {record.published}\n")
+        parts.append(f"- **PDF URL**: [{record.pdf_url}]({record.pdf_url})\n\n")
+        parts.append(f"### 요약\n{record.summary[:500]}...\n\n")
+        parts.append("---\n\n")
+    return "".join(parts)
@@ -0,0 +1,354 @@
+import os
+import json
+import mmap
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+from paper_store import PaperStore
+import metrics
+
+# papers 디렉토리 아래의 PDF/텍스트 저장 위치 (주제 키는 '_'로 시작하지 않는다)
+PDF_DIR = "_pdf"
+TEXT_DIR = "_text"
+# 논문 ID -> PDF 내용 해시
+PDF_INDEX_FILE = "index.json"
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+# 리소스로 제공하는 텍스트 청크 하나의 최대 바이트 수
+TEXT_CHUNK_BYTES = 8 * 1024
+
+
+def create_http_client() -> httpx.Client:
+    """연결을 재사용하는 공유 HTTP 클라이언트를 만든다."""
+    return httpx.Client(
+        follow_redirects=True,
+        timeout=httpx.Timeout(30.0, connect=10.0),
+        limits=httpx.Limits(max_connections=16, max_keepalive_connections=8),
+        headers={"User-Agent": "mcp-research-server"},
+    )
+
+
+class ByteLRUCache:
+    """저장된 값의 총 바이트 수를 기준으로 오래된 항목부터 내보내는 LRU 캐시."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._items: "OrderedDict[str, tuple[str, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                return None
+            self._items.move_to_end(key)
+            return item[0]
+
+    def put(self, key: str, value: str) -> None:
+        size = len(value.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old:
+                self.total_bytes -= old[1]
+            self._items[key] = (value, size)
+            self.total_bytes += size
+            while self.total_bytes > self.max_bytes:
+                _, (_, evicted) = self._items.popitem(last=False)
+                self.total_bytes -= evicted
+
+
+def extract_pdf_text(pdf_path: str) -> str:
+    """PDF 파일에서 페이지 순서대로 텍스트를 추출한다."""
+    try:
+        from pypdf import PdfReader
+    except ImportError as e:
+        raise RuntimeError("PDF 텍스트 추출에는 pypdf 패키지가 필요하다.") from e
+
+    reader = PdfReader(pdf_path)
+    return "\n\n".join(page.extract_text() or "" for page in reader.pages)
+
+
+def _utf8_boundary(data: bytes, pos: int) -> int:
+    """pos가 UTF-8 문자 중간이면 그 문자의 시작 위치로 당긴다."""
+    while 0 < pos < len(data) and (data[pos] & 0xC0) == 0x80:
+        pos -= 1
+    return pos
+
+
+def build_chunk_index(data: bytes, max_bytes: int = TEXT_CHUNK_BYTES) -> List[Tuple[int, int]]:
+    """
+    UTF-8 텍스트를 문단 경계 기준으로 나눈 (시작, 끝) 바이트 오프셋 목록을 만든다.
+
+    문단(빈 줄로 구분)을 max_bytes를 넘지 않는 한 이어 붙이고, 한 문단이
+    max_bytes보다 길면 그 안의 줄바꿈이나 공백에서, 그것도 없으면 문자 경계에서 자른다.
+    """
+    chunks: List[Tuple[int, int]] = []
+    start = 0
+    size = len(data)
+    while start < size:
+        end = min(start + max_bytes, size)
+        if end < size:
+            paragraph = data.rfind(b"\n\n", start, end)
+            if paragraph > start:
+                end = paragraph + 2
+            else:
+                space = max(data.rfind(b"\n", start, end), data.rfind(b" ", start, end))
+                if space > start:
+                    end = space + 1
+                else:
+                    end = _utf8_boundary(data, end)
+                    if end <= start:
+                        end = min(start + max_bytes, size)
+        chunks.append((start, end))
+        start = end
+    return chunks
+
+
+def _validator(response: httpx.Response) -> Optional[str]:
+    """If-Range에 쓸 수 있는 검증자. 약한 ETag는 If-Range에 쓸 수 없다."""
+    etag = response.headers.get("ETag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return response.headers.get("Last-Modified")
+
+
+def _int_header(response: httpx.Response, name: str) -> Optional[int]:
+    try:
+        return int(response.headers[name])
+    except (KeyError, ValueError):
+        return None
+
+
+def _content_start(response: httpx.Response) -> Optional[int]:
+    """Content-Range: bytes <start>-<end>/<total>의 시작 위치"""
+    value = response.headers.get("Content-Range", "")
+    try:
+        return int(value.split()[1].split("-")[0])
+    except (IndexError, ValueError):
+        return None
+
+
+def _content_total(response: httpx.Response) -> Optional[int]:
+    """Content-Range의 총 길이 (모르면 None)"""
+    total = response.headers.get("Content-Range", "").rpartition("/")[2]
+    return int(total) if total.isdigit() else None
+
+
+def _load_partial_meta(meta_path: str) -> Dict:
+    try:
+        with open(meta_path, "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _save_partial_meta(meta_path: str, validator: Optional[str], total: Optional[int]) -> None:
+    tmp_path = meta_path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump({"validator": validator, "total": total}, f)
+    os.replace(tmp_path, meta_path)
+
+
+def _discard_partial(partial_path: str) -> None:
+    """부분 파일과 그 검증자 정보를 지운다."""
+    for path in (partial_path, partial_path + ".json"):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+class PaperTextService:
+    """
+    논문 PDF를 내려받아 텍스트로 제공하는 서비스.
+
+    PDF는 내용 해시(SHA-256) 이름으로 한 번만 저장하고, 텍스트도 해시별로 한 번만
+    추출한다. 중단된 다운로드는 Range 요청으로 이어받으며, 추출된 텍스트는
+    총 바이트 수 제한이 있는 메모리 LRU 캐시에 보관한다.
+    """
+
+    def __init__(self, store: PaperStore, client: Optional[httpx.Client] = None,
+                 cache_bytes: int = 64 * 1024 * 1024):
+        self.store = store
+        self.client = client or create_http_client()
+        self.cache = ByteLRUCache(cache_bytes)
+        self.pdf_dir = os.path.join(store.paper_dir, PDF_DIR)
+        self.text_dir = os.path.join(store.paper_dir, TEXT_DIR)
+        self._index_path = os.path.join(self.pdf_dir, PDF_INDEX_FILE)
+        self._index: Optional[Dict[str, str]] = None
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    # --- 논문 ID -> 내용 해시 ---
+
+    def _load_index(self) -> Dict[str, str]:
+        if self._index is None:
+            try:
+                with open(self._index_path, "r") as f:
+                    self._index = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                self._index = {}
+        return self._index
+
+    def _save_digest(self, paper_id: str, digest: str) -> None:
+        with self._lock:
+            index = self._load_index()
+            index[paper_id] = digest
+            tmp_path = self._index_path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(index, f)
+            os.replace(tmp_path, self._index_path)
+
+    def _paper_lock(self, paper_id: str) -> threading.Lock:
+        with self._lock:
+            return self._locks.setdefault(paper_id, threading.Lock())
+
+    def pdf_path(self, digest: str) -> str:
+        return os.path.join(self.pdf_dir, digest[:2], f"{digest}.pdf")
+
+    def text_path(self, digest: str) -> str:
+        return os.path.join(self.text_dir, digest[:2], f"{digest}.txt")
+
+    # --- 다운로드 ---
+
+    def _download(self, paper_id: str, url: str) -> str:
+        """
+        PDF를 이어받기 가능한 방식으로 내려받고 내용 해시를 반환한다.
+
+        .part 파일 옆의 .json에 원본의 검증자(강한 ETag 또는 Last-Modified)와 총 길이를
+        저장해 두고, 이어받을 때 If-Range로 보낸다. 원본이 바뀌어 200이 오면 처음부터
+        다시 받고, 받은 바이트 수가 총 길이와 다르면 부분 파일을 지우고 실패한다.
+        """
+        partial_dir = os.path.join(self.pdf_dir, "partial")
+        os.makedirs(partial_dir, exist_ok=True)
+        partial_path = os.path.join(partial_dir, paper_id.replace("/", "_") + ".part")
+        meta_path = partial_path + ".json"
+
+        meta = _load_partial_meta(meta_path)
+        offset = os.path.getsize(partial_path) if os.path.exists(partial_path) else 0
+        if offset and not meta.get("validator"):
+            # 어떤 버전의 앞부분인지 모르는 조각에는 이어 붙이지 않는다
+            offset = 0
+        headers = {"Range": f"bytes={offset}-", "If-Range": meta["validator"]} if offset else {}
+        with self.client.stream("GET", url, headers=headers) as response:
+            if response.status_code == 416:
+                # 이미 전부 받은 상태인지 원본의 총 길이로 확인한다
+                total = _content_total(response)
+                if total is None or total != offset or meta.get("total") != offset:
+                    _discard_partial(partial_path)
+                    raise IOError(f"{url}: 이어받을 수 없는 부분 파일이라 지웠다 (416)")
+            else:
+                response.raise_for_status()
+                if response.status_code == 206:
+                    start = _content_start(response)
+                    if start != offset:
+                        _discard_partial(partial_path)
+                        raise IOError(f"{url}: 요청한 위치({offset})와 다른 범위를 받았다 ({start})")
+                    mode, total = "ab", _content_total(response)
+                else:
+                    # 압축 전송이면 Content-Length가 풀린 바이트 수와 다르다
+                    encoded = response.headers.get("Content-Encoding", "identity") != "identity"
+                    mode, total = "wb", None if encoded else _int_header(response, "Content-Length")
+                    _save_partial_meta(meta_path, _validator(response), total)
+                with open(partial_path, mode) as f:
+                    for chunk in response.iter_bytes(DOWNLOAD_CHUNK_SIZE):
+                        f.write(chunk)
+
+        received = os.path.getsize(partial_path)
+        if total is not None and received != total:
+            _discard_partial(partial_path)
+            raise IOError(f"{url}: {total}바이트 중 {received}바이트를 받았다")
+
+        sha = hashlib.sha256()
+        with open(partial_path, "rb") as f:
+            for chunk in iter(lambda: f.read(DOWNLOAD_CHUNK_SIZE), b""):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+
+        pdf_path = self.pdf_path(digest)
+        os.makedirs(os.path.dirname(pdf_path), exist_ok=True)
+        if os.path.exists(pdf_path):
+            os.remove(partial_path)
+        else:
+            os.replace(partial_path, pdf_path)
+        _discard_partial(partial_path)
+        self._save_digest(paper_id, digest)
+        return digest
+
+    # --- 텍스트 ---
+
+    def chunk_index_path(self, digest: str) -> str:
+        return os.path.join(self.text_dir, digest[:2], f"{digest}.chunks.json")
+
+    def _ensure_text(self, paper_id: str) -> str:
+        """추출된 텍스트 파일과 청크 인덱스가 디스크에 있도록 하고 내용 해시를 반환한다."""
+        digest = self._load_index().get(paper_id)
+        if not digest or not os.path.exists(self.text_path(digest)):
+            if not digest or not os.path.exists(self.pdf_path(digest)):
+                record = self.store.get(paper_id)
+                if record is None or not record.pdf_url:
+                    raise KeyError(paper_id)
+                digest = self._download(paper_id, record.pdf_url)
+
+            text_path = self.text_path(digest)
+            if not os.path.exists(text_path):
+                text = extract_pdf_text(self.pdf_path(digest))
+                os.makedirs(os.path.dirname(text_path), exist_ok=True)
+                tmp_path = text_path + ".tmp"
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    f.write(text)
+                os.replace(tmp_path, text_path)
+
+        if not os.path.exists(self.chunk_index_path(digest)):
+            with open(self.text_path(digest), "rb") as f:
+                chunks = build_chunk_index(f.read())
+            tmp_path = self.chunk_index_path(digest) + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump(chunks, f)
+            os.replace(tmp_path, self.chunk_index_path(digest))
+        return digest
+
+    def get_text(self, paper_id: str) -> str:
+        """
+        논문의 전체 텍스트를 반환한다.
+
+        메모리 캐시, 디스크의 추출 텍스트, 디스크의 PDF, 네트워크 순서로 확인하며
+        앞 단계에서 찾으면 뒤 단계는 건너뛴다. 논문이 저장소에 없으면 KeyError.
+        """
+        with self._paper_lock(paper_id):
+            digest = self._load_index().get(paper_id)
+            cached = self.cache.get(digest) if digest else None
+            metrics.record_cache("paper_text", cached is not None)
+            if cached is not None:
+                return cached
+
+            digest = self._ensure_text(paper_id)
+            with open(self.text_path(digest), "r", encoding="utf-8") as f:
+                text = f.read()
+            self.cache.put(digest, text)
+            return text
+
+    def get_chunk(self, paper_id: str, chunk: int) -> Tuple[str, int]:
+        """
+        논문 텍스트의 chunk번째 조각과 전체 청크 수를 반환한다.
+
+        미리 계산된 바이트 오프셋으로 mmap한 파일의 해당 구간만 읽으므로 논문
+        길이와 관계없이 한 청크 분량만 메모리에 올린다. 범위를 벗어나면 IndexError.
+        """
+        with self._paper_lock(paper_id):
+            digest = self._ensure_text(paper_id)
+        with open(self.chunk_index_path(digest), "r") as f:
+            chunks = json.load(f)
+        if not 0 <= chunk < len(chunks):
+            raise IndexError(chunk)
+
+        start, end = chunks[chunk]
+        with open(self.text_path(digest), "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return mapped[start:end].decode("utf-8"), len(chunks)
@@ -0,0 +1,94 @@
+import os
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+import metrics
+
+prefetch_jobs = metrics.registry.counter(
+    "prefetch_jobs_total", "백그라운드 미리 읽기 작업 수", ("kind", "result"))
+
+
+class PrefetchScope:
+    """
+    세션 하나에서 예약한 미리 읽기 작업 모음.
+
+    세션이 끝나면 close()로 아직 시작하지 않은 작업을 모두 취소한다. 이미 실행 중인
+    작업은 끝까지 진행되지만 결과는 캐시에 남을 뿐 세션에 영향을 주지 않는다.
+    """
+
+    def __init__(self, prefetcher: "Prefetcher"):
+        self._prefetcher = prefetcher
+        # 예약한 작업 -> 작업 종류
+        self._futures: Dict[Future, str] = {}
+        self._lock = threading.Lock()
+        self.closed = False
+
+    def submit(self, kind: str, fn: Callable, *args) -> None:
+        executor = self._prefetcher.executor
+        if self.closed or executor is None:
+            return
+        future = executor.submit(self._run, kind, fn, *args)
+        with self._lock:
+            self._futures[future] = kind
+        future.add_done_callback(self._done)
+
+    def _run(self, kind: str, fn: Callable, *args) -> None:
+        if self.closed:
+            prefetch_jobs.inc(kind=kind, result="cancelled")
+            return
+        try:
+            fn(*args)
+            prefetch_jobs.inc(kind=kind, result="done")
+        except Exception as e:
+            prefetch_jobs.inc(kind=kind, result="error")
+            print(f"미리 읽기 실패 ({kind} {args}): {e}")
+
+    def _done(self, future: Future) -> None:
+        with self._lock:
+            self._futures.pop(future, None)
+
+    def close(self) -> None:
+        self.closed = True
+        with self._lock:
+            futures, self._futures = self._futures, {}
+        for future, kind in futures.items():
+            if future.cancel():
+                prefetch_jobs.inc(kind=kind, result="cancelled")
+
+
+class Prefetcher:
+    """
+    도구 응답 뒤에 이어질 요청에 대비해 캐시를 미리 채우는 작업자 풀.
+
+    기본값은 꺼짐이며, 환경 변수로 켠다:
+        RESEARCH_PREFETCH: 쉼표로 구분한 대상. topic(papers://{topic} 렌더링),
+            text(검색된 논문의 PDF 다운로드와 텍스트 추출)
+        RESEARCH_PREFETCH_WORKERS: 동시에 실행할 작업 수 (기본값: 2)
+    """
+
+    def __init__(self, kinds: Optional[str] = None, workers: Optional[int] = None):
+        kinds = os.getenv("RESEARCH_PREFETCH", "") if kinds is None else kinds
+        self.kinds = {kind.strip() for kind in kinds.split(",") if kind.strip()}
+        self.workers = workers or int(os.getenv("RESEARCH_PREFETCH_WORKERS", "2"))
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def enabled(self, kind: str) -> bool:
+        return kind in self.kinds
+
+    @property
+    def executor(self) -> Optional[ThreadPoolExecutor]:
+        if not self.kinds:
+            return None
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="prefetch")
+            return self._executor
+
+    def scope(self) -> PrefetchScope:
+        return PrefetchScope(self)
+
+
+# 서버 프로세스 전체에서 공유하는 미리 읽기 작업자 풀
+prefetcher = Prefetcher()
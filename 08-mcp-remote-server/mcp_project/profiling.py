@@ -0,0 +1,161 @@
+import os
+import io
+import time
+import queue
+import asyncio
+import pstats
+import random
+import cProfile
+import functools
+import inspect
+import threading
+import contextvars
+from collections import deque
+from typing import Callable, Deque, Optional, Tuple
+
+
+class Profiler:
+    """
+    요청 단위 표본 프로파일러.
+
+    켜져 있으면 sample_rate 비율의 호출만 cProfile로 측정해 out_dir에 .prof 파일로
+    남기고(최근 keep개만 유지), 누적 통계로 상위 함수 요약(summary.txt)을 갱신한다.
+    꺼져 있을 때 감싼 함수의 추가 비용은 속성 확인 한 번이다.
+
+    cProfile은 스레드 단위로 측정하므로 동기 함수만 측정한다. 비동기 핸들러는
+    이벤트 루프에서 기다리는 동안 다른 코루틴이 섞이므로 직접 측정하지 않고,
+    핸들러 안에서 to_thread()로 넘긴 작업을 작업 스레드 안에서 측정한다.
+    덤프 파일 기록, 오래된 덤프 정리, 요약 갱신은 백그라운드 스레드에서 한다.
+
+    환경 변수:
+        RESEARCH_PROFILE: 1이면 시작할 때부터 켠다
+        RESEARCH_PROFILE_RATE: 표본 비율 (기본값: 0.1)
+        RESEARCH_PROFILE_DIR: 덤프 디렉토리 (기본값: profiles)
+    """
+
+    def __init__(self, out_dir: Optional[str] = None, keep: int = 50, top_n: int = 30):
+        self.enabled = os.getenv("RESEARCH_PROFILE", "0") == "1"
+        self.sample_rate = float(os.getenv("RESEARCH_PROFILE_RATE", "0.1"))
+        self.out_dir = out_dir or os.getenv("RESEARCH_PROFILE_DIR", "profiles")
+        self.keep = keep
+        self.top_n = top_n
+        self.samples = 0
+        self._stats: Optional[pstats.Stats] = None
+        # cProfile은 동시에 하나만 활성화할 수 있으므로 측정 중이면 표본을 건너뛴다
+        self._active = threading.Lock()
+        self._lock = threading.Lock()
+        # 비동기 핸들러가 작업 스레드에 넘길 표본 이름
+        self._handler: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+            "profiled_handler", default=None)
+        # 기록할 (이름, 프로파일)과 이 프로세스가 남긴 덤프 경로 (오래된 순)
+        self._pending: "queue.Queue[Tuple[str, cProfile.Profile]]" = queue.Queue()
+        self._dumps: Optional[Deque[str]] = None
+        self._writer: Optional[threading.Thread] = None
+
+    def configure(self, enabled: bool, sample_rate: Optional[float] = None) -> None:
+        self.enabled = enabled
+        if sample_rate is not None:
+            self.sample_rate = min(max(sample_rate, 0.0), 1.0)
+
+    def _should_sample(self) -> bool:
+        return random.random() < self.sample_rate and self._active.acquire(blocking=False)
+
+    def _record(self, name: str, profile: cProfile.Profile) -> None:
+        """측정을 마친 프로파일을 백그라운드 기록 스레드에 넘긴다."""
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="profiler", daemon=True)
+                self._writer.start()
+        self._pending.put((name, profile))
+
+    def _write_loop(self) -> None:
+        while True:
+            name, profile = self._pending.get()
+            try:
+                self._write(name, profile)
+            except Exception as e:
+                print(f"프로파일 기록 오류: {str(e)}")
+
+    def _write(self, name: str, profile: cProfile.Profile) -> None:
+        os.makedirs(self.out_dir, exist_ok=True)
+        path = os.path.join(self.out_dir, f"{name}-{time.time_ns() // 1_000_000}.prof")
+        profile.dump_stats(path)
+
+        if self._dumps is None:
+            # 이전 실행이 남긴 덤프는 처음 한 번만 훑는다
+            self._dumps = deque(sorted(
+                (os.path.join(self.out_dir, f) for f in os.listdir(self.out_dir) if f.endswith(".prof")),
+                key=os.path.getmtime,
+            ))
+        else:
+            self._dumps.append(path)
+        while len(self._dumps) > self.keep:
+            try:
+                os.remove(self._dumps.popleft())
+            except FileNotFoundError:
+                pass
+
+        with self._lock:
+            self.samples += 1
+            if self._stats is None:
+                self._stats = pstats.Stats(profile)
+            else:
+                self._stats.add(profile)
+            summary = self._render_summary(self.top_n)
+        with open(os.path.join(self.out_dir, "summary.txt"), "w") as f:
+            f.write(summary)
+
+    def _render_summary(self, top_n: int) -> str:
+        if self._stats is None:
+            return "수집된 프로파일이 없다.\n"
+        buffer = io.StringIO()
+        self._stats.stream = buffer
+        self._stats.sort_stats("cumulative").print_stats(top_n)
+        return f"표본 수: {self.samples}\n" + buffer.getvalue()
+
+    def summary(self, top_n: Optional[int] = None) -> str:
+        """지금까지 수집한 표본을 합친 상위 함수 요약을 반환한다."""
+        with self._lock:
+            return self._render_summary(top_n or self.top_n)
+
+    def wrap(self, name: str, fn: Callable) -> Callable:
+        """
+        함수 호출을 표본 추출하여 프로파일링하도록 감싼다.
+
+        비동기 함수는 측정하지 않고 이름만 기록해 두며, 그 안에서 to_thread()로
+        넘긴 작업이 이 이름으로 측정된다.
+        """
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                token = self._handler.set(name)
+                try:
+                    return await fn(*args, **kwargs)
+                finally:
+                    self._handler.reset(token)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not self.enabled or not self._should_sample():
+                return fn(*args, **kwargs)
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+                return fn(*args, **kwargs)
+            finally:
+                profile.disable()
+                self._active.release()
+                self._record(name, profile)
+        return wrapper
+
+    async def to_thread(self, fn: Callable, *args, **kwargs):
+        """asyncio.to_thread처럼 실행하되, 작업 스레드 안에서 호출한 핸들러 이름으로 측정한다."""
+        name = self._handler.get()
+        if name is not None and self.enabled:
+            fn = self.wrap(name, fn)
+        return await asyncio.to_thread(fn, *args, **kwargs)
+
+
+# 프로세스 전체에서 공유하는 프로파일러
+profiler = Profiler()
@@ -1,19 +1,216 @@
 
-import arxiv
-import json
 import os
-from typing import List
+import sys
+import json
+import time
+from contextlib import asynccontextmanager
+from typing import Annotated, Dict, List, Optional, Tuple
+from pydantic import BaseModel
 from mcp.server.fastmcp import FastMCP
+from mcp.server.fastmcp.exceptions import ToolError
+from mcp.types import CallToolResult, TextContent
+
+from coauthor_graph import RANK_METHODS, CoauthorGraph
+from corpus_export import EXPORT_FORMATS, export_corpus as run_export
+from ingest import arxiv_search, bulk_ingest as run_bulk_ingest
+from paper_store import CATALOG_SORTS, PaperStore, render_topic_markdown, topic_key
+from paper_text import PaperTextService
+from prefetch import prefetcher
+from profiling import profiler
+from subscriptions import hub
+from tracing import TRACEPARENT_KEY, tracer
+import metrics
 
 PAPER_DIR = "papers"
+# 열 단위 내보내기 위치 ('_'로 시작하므로 주제 폴더로 취급하지 않는다)
+EXPORT_DIR = os.path.join(PAPER_DIR, "_export")
+# papers://folders 한 페이지에 보여 줄 주제 수
+FOLDERS_PAGE_SIZE = 50
+
+# 모든 도구와 리소스가 공유하는 논문 저장소
+store = PaperStore(PAPER_DIR)
+# PDF 다운로드와 텍스트 추출 결과를 공유하는 서비스
+texts = PaperTextService(store)
+# 저장소의 저자 목록으로 만드는 공저 그래프 (질의할 때 새 논문을 반영한다)
+coauthors_graph = CoauthorGraph(store)
+
+# 주제 키 -> (주제 목록의 갱신 시각, 렌더링한 papers://{topic} 내용)
+topic_pages: Dict[str, Tuple[float, str]] = {}
+
+
+@asynccontextmanager
+async def session_lifespan(server):
+    """세션마다 미리 읽기 작업 모음을 두고, 세션이 끝나면 남은 작업을 취소한다."""
+    scope = prefetcher.scope()
+    try:
+        yield scope
+    finally:
+        scope.close()
+
 
 # FastMCP 서버 초기화
-mcp = FastMCP("research", port=8001)
+mcp = FastMCP("research", port=8001, lifespan=session_lifespan)
+tracer.configure("research-server")
+
+# 주제가 바뀌면 구독 중인 클라이언트에 resources/updated 알림을 보낸다
+store.listeners.append(hub.topic_changed)
+# 같은 papers/ 디렉토리를 쓰는 다른 서버 프로세스의 변경도 구독자에게 알린다
+hub.watch(store.poll_changes)
+
+
+@mcp._mcp_server.subscribe_resource()
+async def subscribe_resource(uri) -> None:
+    """클라이언트가 리소스 변경 알림을 구독한다."""
+    hub.subscribe(str(uri), mcp.get_context().session)
+
+
+@mcp._mcp_server.unsubscribe_resource()
+async def unsubscribe_resource(uri) -> None:
+    hub.unsubscribe(str(uri), mcp.get_context().session)
+
+
+def _capabilities_with_subscribe(get_capabilities):
+    # FastMCP는 구독 처리기를 등록해도 resources.subscribe를 False로 광고하므로 보정한다
+    def wrapper(*args, **kwargs):
+        capabilities = get_capabilities(*args, **kwargs)
+        if capabilities.resources is not None:
+            capabilities.resources.subscribe = True
+        return capabilities
+    return wrapper
+
+
+mcp._mcp_server.get_capabilities = _capabilities_with_subscribe(mcp._mcp_server.get_capabilities)
+
+
+def _request_traceparent():
+    """현재 MCP 요청의 _meta에 실려 온 traceparent를 읽는다."""
+    try:
+        meta = mcp.get_context().request_context.meta
+    except (LookupError, ValueError):
+        return None
+    return getattr(meta, TRACEPARENT_KEY, None) if meta else None
+
+
+def _prefetch_scope():
+    """현재 세션의 미리 읽기 작업 모음을 반환한다."""
+    try:
+        return mcp.get_context().request_context.lifespan_context
+    except (LookupError, ValueError):
+        return None
+
+
+def prefetch_search_results(topic: str, paper_ids: List[str]) -> None:
+    """검색 직후 이어질 papers://{topic} 읽기와 본문 요청에 대비해 캐시를 채운다."""
+    scope = _prefetch_scope()
+    if scope is None:
+        return
+    if prefetcher.enabled("topic"):
+        scope.submit("topic", render_topic_page, topic)
+    if prefetcher.enabled("text"):
+        for paper_id in paper_ids:
+            scope.submit("text", texts.get_text, paper_id)
+
+
+def instrumented(kind: str):
+    """도구/리소스 핸들러를 호출 단위 스팬, 메트릭, 표본 프로파일링으로 감싸는 데코레이터."""
+    def decorator(fn):
+        fn = profiler.wrap(f"{kind}-{fn.__name__}", fn)
+        fn = metrics.measured(kind, fn.__name__, fn)
+        return tracer.wrap(f"{kind} {fn.__name__}", fn, traceparent=_request_traceparent)
+    return decorator
+
+
+# 도구 출력 스키마
+
+class SearchResult(BaseModel):
+    topic: str
+    paper_ids: List[str]
+    # arXiv에 접근하지 못해 로컬 저장소에서 찾은 결과이면 True
+    stale: bool = False
+    reason: str = ""
+
+
+class PaperInfo(BaseModel):
+    id: str
+    title: str
+    authors: List[str]
+    summary: str
+    pdf_url: str
+    published: str
+
+
+class PaperSummary(BaseModel):
+    id: str
+    title: str
+    authors: List[str]
+    published: str
+
+
+class PaperList(BaseModel):
+    papers: List[PaperSummary]
+
+
+class IngestResult(BaseModel):
+    papers: Dict[str, int]
+    failed: Dict[str, str] = {}
+
+
+class Coauthor(BaseModel):
+    name: str
+    # 함께 쓴 논문 수
+    papers: int
+
+
+class CoauthorList(BaseModel):
+    author: str
+    coauthors: List[Coauthor]
+
+
+class AuthorScore(BaseModel):
+    name: str
+    score: float
+
+
+class AuthorRanking(BaseModel):
+    by: str
+    authors: List[AuthorScore]
+
+
+class AuthorPath(BaseModel):
+    path: List[str]
+    hops: int
+
+
+class ExportResult(BaseModel):
+    format: str
+    rows_written: int
+    rows: int
+    parts: int
+    path: str
+
+
+def structured(data: dict) -> CallToolResult:
+    """
+    구조화된 결과(structuredContent)와 같은 내용을 공백 없는 JSON 텍스트로 함께 반환한다.
+
+    출력 스키마는 각 도구의 Annotated 반환 형식으로 선언하고 FastMCP가 검증한다.
+    """
+    text = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    return CallToolResult(content=[TextContent(type="text", text=text)], structuredContent=data)
+
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metrics_endpoint(request):
+    """Prometheus 형식의 운영 메트릭을 노출한다."""
+    from starlette.responses import PlainTextResponse
+    return PlainTextResponse(metrics.registry.render(), media_type="text/plain; version=0.0.4")
 
 @mcp.tool()
-def search_papers(topic: str, max_results: int = 5) -> List[str]:
+@instrumented("tool")
+async def search_papers(topic: str, max_results: int = 5) -> Annotated[CallToolResult, SearchResult]:
     """
     주제에 따라 arXiv에서 논문을 검색하고 그 정보를 저장한다.
+    arXiv가 느리거나 응답하지 않으면 이미 저장된 논문 중에서 찾아 stale로 표시한다.
     
     인자:
         topic: 검색할 주제
@@ -22,55 +219,27 @@ def search_papers(topic: str, max_results: int = 5) -> List[str]:
     반환:
         검색에서 찾은 논문 ID 목록
     """
+    if not topic_key(topic):
+        raise ToolError(f"주제 이름에 글자나 숫자가 없다: {topic!r}")
     
-    # arxiv를 사용하여 논문 찾기
-    client = arxiv.Client()
-
-    # 검색된 주제와 일치하는 가장 관련성 높은 논문 검색
-    search = arxiv.Search(
-        query = topic,
-        max_results = max_results,
-        sort_by = arxiv.SortCriterion.Relevance
-    )
-
-    papers = client.results(search)
+    # 검색된 주제와 일치하는 가장 관련성 높은 논문 검색 (전역 요청 제한과 시간 예산 적용)
+    outcome = await profiler.to_thread(arxiv_search.search, topic, max_results, store)
+    paper_ids = [record.paper_id for record in outcome.records]
+    if outcome.stale:
+        return structured({"topic": store.topic_dir(topic), "paper_ids": paper_ids,
+                           "stale": True, "reason": outcome.reason})
     
-    # 이 주제에 대한 디렉토리 생성
-    path = os.path.join(PAPER_DIR, topic.lower().replace(" ", "_"))
-    os.makedirs(path, exist_ok=True)
+    # 논문은 코퍼스에 한 번만 기록하고 주제에는 ID만 추가
+    file_path = await profiler.to_thread(store.add_papers, topic, outcome.records)
     
-    file_path = os.path.join(path, "papers_info.json")
-
-    # 기존 논문 정보 로드 시도
-    try:
-        with open(file_path, "r") as json_file:
-            papers_info = json.load(json_file)
-    except (FileNotFoundError, json.JSONDecodeError):
-        papers_info = {}
-
-    # 각 논문을 처리하고 papers_info에 추가
-    paper_ids = []
-    for paper in papers:
-        paper_ids.append(paper.get_short_id())
-        paper_info = {
-            'title': paper.title,
-            'authors': [author.name for author in paper.authors],
-            'summary': paper.summary,
-            'pdf_url': paper.pdf_url,
-            'published': str(paper.published.date())
-        }
-        papers_info[paper.get_short_id()] = paper_info
-    
-    # 업데이트된 papers_info를 json 파일에 저장
-    with open(file_path, "w") as json_file:
-        json.dump(papers_info, json_file, indent=2)
-    
-    print(f"결과가 다음 위치에 저장됨: {file_path}")
-    
-    return paper_ids
+    print(f"결과가 다음 위치에 저장됨: {file_path}", file=sys.stderr)
+    prefetch_search_results(topic, paper_ids)
+    
+    return structured({"topic": store.topic_dir(topic), "paper_ids": paper_ids})
 
 @mcp.tool()
-def extract_info(paper_id: str) -> str:
+@instrumented("tool")
+def extract_info(paper_id: str) -> Annotated[CallToolResult, PaperInfo]:
     """
     모든 주제 디렉토리에서 특정 논문에 대한 정보를 검색한다.
     
@@ -78,57 +247,244 @@ def extract_info(paper_id: str) -> str:
         paper_id: 검색할 논문의 ID
         
     반환:
-        논문이 발견되면 JSON 문자열로 된 논문 정보, 발견되지 않으면 오류 메시지
+        논문 정보. 발견되지 않으면 오류 결과
     """
  
-    for item in os.listdir(PAPER_DIR):
-        item_path = os.path.join(PAPER_DIR, item)
-        if os.path.isdir(item_path):
-            file_path = os.path.join(item_path, "papers_info.json")
-            if os.path.isfile(file_path):
-                try:
-                    with open(file_path, "r") as json_file:
-                        papers_info = json.load(json_file)
-                        if paper_id in papers_info:
-                            return json.dumps(papers_info[paper_id], indent=2)
-                except (FileNotFoundError, json.JSONDecodeError) as e:
-                    print(f"{file_path} 읽기 오류: {str(e)}")
-                    continue
+    record = store.get(paper_id)
+    if record:
+        return structured({"id": record.paper_id, **record.to_dict()})
     
-    return f"논문 {paper_id}와 관련된 저장된 정보가 없다."
+    raise ToolError(f"논문 {paper_id}와 관련된 저장된 정보가 없다.")
 
+@mcp.tool()
+@instrumented("tool")
+def query_papers(author: Optional[str] = None, since: Optional[str] = None, until: Optional[str] = None,
+                 topic: Optional[str] = None, limit: int = 20) -> Annotated[CallToolResult, PaperList]:
+    """
+    로컬에 저장된 논문을 저자, 발행일 범위, 주제로 찾는다. arXiv에 다시 요청하지 않는다.
+    
+    인자:
+        author: 저자 이름 (대소문자 무시, 일부만 입력해도 된다)
+        since: 이 날짜 이후 발행 (예: "2024", "2024-03", "2024-03-15")
+        until: 이 날짜까지 발행 (같은 형식, 해당 기간을 포함한다)
+        topic: 검색했던 주제
+        limit: 반환할 최대 논문 수 (기본값: 20)
+        
+    반환:
+        최신 발행일순으로 정렬된 논문 목록
+    """
+    records = store.query(author=author, since=since, until=until, topic=topic, limit=limit)
+    return structured({"papers": [
+        {"id": r.paper_id, "title": r.title, "authors": list(r.authors), "published": r.published}
+        for r in records
+    ]})
 
 
-@mcp.resource("papers://folders")
-def get_available_folders() -> str:
+
+@mcp.tool()
+@instrumented("tool")
+async def coauthors(author: str, limit: int = 20) -> Annotated[CallToolResult, CoauthorList]:
     """
-    papers 디렉토리에서 사용 가능한 모든 주제 폴더를 나열한다.
+    저장된 논문에서 저자와 함께 논문을 쓴 공저자를 찾는다.
+
+    인자:
+        author: 저자 이름 (대소문자와 공백은 무시한다)
+        limit: 반환할 최대 공저자 수 (기본값: 20)
+
+    반환:
+        함께 쓴 논문 수가 많은 순서의 공저자 목록
+    """
+    try:
+        neighbors = await profiler.to_thread(coauthors_graph.neighbors, author, limit)
+    except KeyError as e:
+        raise ToolError(e.args[0])
+    return structured({"author": author,
+                       "coauthors": [{"name": name, "papers": papers} for name, papers in neighbors]})
+
+@mcp.tool()
+@instrumented("tool")
+async def top_authors(by: str = "degree", k: int = 10, topic: Optional[str] = None) -> Annotated[CallToolResult, AuthorRanking]:
+    """
+    공저 관계에서 가장 중심적인 저자를 찾는다.
+
+    인자:
+        by: degree(공저자 수) 또는 pagerank(공저 논문 수를 가중치로 한 PageRank) (기본값: degree)
+        k: 반환할 저자 수 (기본값: 10)
+        topic: 지정하면 이 주제의 논문만으로 계산한다
+
+    반환:
+        점수가 높은 순서의 저자 목록
+    """
+    if by not in RANK_METHODS:
+        raise ToolError(f"by는 {', '.join(RANK_METHODS)} 중 하나여야 한다: {by}")
+    paper_ids = None
+    if topic:
+        paper_ids = list(store.load_topic(topic_key(topic)))
+        if not paper_ids:
+            raise ToolError(f"저장된 논문이 없는 주제: {topic}")
+    ranking = await profiler.to_thread(coauthors_graph.top, by, k, paper_ids)
+    return structured({"by": by, "authors": [{"name": name, "score": score} for name, score in ranking]})
+
+@mcp.tool()
+@instrumented("tool")
+async def author_path(source: str, target: str, max_hops: int = 6) -> Annotated[CallToolResult, AuthorPath]:
+    """
+    두 저자를 잇는 가장 짧은 공저 경로를 찾는다.
+
+    인자:
+        source: 시작 저자 이름
+        target: 도착 저자 이름
+        max_hops: 찾을 최대 단계 수 (기본값: 6)
+
+    반환:
+        source부터 target까지의 저자 이름 목록과 단계 수
+    """
+    try:
+        path = await profiler.to_thread(coauthors_graph.shortest_path, source, target, max_hops)
+    except KeyError as e:
+        raise ToolError(e.args[0])
+    if path is None:
+        raise ToolError(f"{max_hops}단계 안에 {source}와 {target}를 잇는 공저 경로가 없다.")
+    return structured({"path": path, "hops": len(path) - 1})
+
+@mcp.tool()
+@instrumented("tool")
+async def bulk_ingest(topics: List[str], max_results_per_topic: int = 100) -> Annotated[CallToolResult, IngestResult]:
+    """
+    여러 주제의 논문을 arXiv에서 동시에 수집하여 저장한다.
     
-    이 리소스는 사용 가능한 모든 주제 폴더의 간단한 목록을 제공한다.
+    인자:
+        topics: 수집할 주제 목록
+        max_results_per_topic: 주제당 최대 논문 수 (기본값: 100)
+        
+    반환:
+        주제별로 저장된 논문 수와 수집에 실패한 주제별 오류
     """
-    folders = []
+    # 수집 작업은 별도 스레드에서 실행하여 다른 요청을 막지 않는다
+    # stdio 전송에서는 stdout이 프로토콜 채널이므로 진행 상황은 stderr로 남긴다
+    report = await profiler.to_thread(run_bulk_ingest, store, topics, max_results_per_topic,
+                                      progress=lambda message: print(message, file=sys.stderr))
+    if report.failed and not report.papers:
+        raise ToolError("모든 주제의 수집이 실패했다: " +
+                        "; ".join(f"{topic}: {error}" for topic, error in report.failed.items()))
+    return structured({"papers": report.papers, "failed": report.failed})
+
+@mcp.tool()
+@instrumented("tool")
+async def export_corpus(format: Optional[str] = None, full: bool = False) -> Annotated[CallToolResult, ExportResult]:
+    """
+    논문 코퍼스를 분석용 열 단위 파일(Arrow/Parquet 또는 NumPy)로 내보낸다.
+    기본적으로 지난 내보내기 이후 추가된 논문만 덧붙인다.
+
+    인자:
+        format: arrow, parquet, numpy 중 하나 (기본값: pyarrow가 있으면 arrow, 없으면 numpy)
+        full: True이면 처음부터 다시 내보낸다 (기본값: False)
+
+    반환:
+        형식, 이번에 쓴 행 수, 전체 행 수, 조각 파일 수, 내보낸 경로
+    """
+    if format is not None and format not in EXPORT_FORMATS:
+        raise ToolError(f"format은 {', '.join(EXPORT_FORMATS)} 중 하나여야 한다: {format}")
+    try:
+        result = await profiler.to_thread(run_export, store, EXPORT_DIR, format, not full)
+    except ImportError as e:
+        raise ToolError(f"{format} 형식에 필요한 패키지가 없다: {e}")
+    return structured(result)
+
+@mcp.tool()
+@instrumented("tool")
+async def get_paper_text(paper_id: str) -> str:
+    """
+    저장된 논문의 PDF를 내려받아 추출한 전체 텍스트를 가져온다.
+    긴 논문은 papers://{topic}/{paper_id}/text/{chunk} 리소스로 나누어 읽을 수 있다.
     
-    # 모든 주제 디렉토리 가져오기
-    if os.path.exists(PAPER_DIR):
-        for topic_dir in os.listdir(PAPER_DIR):
-            topic_path = os.path.join(PAPER_DIR, topic_dir)
-            if os.path.isdir(topic_path):
-                papers_file = os.path.join(topic_path, "papers_info.json")
-                if os.path.exists(papers_file):
-                    folders.append(topic_dir)
+    인자:
+        paper_id: 텍스트를 가져올 논문의 ID
+        
+    반환:
+        논문 본문 텍스트. 가져올 수 없으면 오류 결과
+    """
+    try:
+        return await profiler.to_thread(texts.get_text, paper_id)
+    except KeyError:
+        raise ToolError(f"논문 {paper_id}와 관련된 저장된 정보가 없다. 먼저 search_papers로 검색해 보세요.")
+    except Exception as e:
+        raise ToolError(f"논문 {paper_id}의 텍스트를 가져오는 중 오류 발생: {str(e)}")
+
+def set_profiling(enabled: bool, sample_rate: float = 0.1) -> str:
+    """
+    연구 서버의 표본 프로파일링을 켜거나 끈다. (관리자용)
     
-    # 간단한 마크다운 목록 생성
-    content = "# 사용 가능한 주제\n\n"
-    if folders:
-        for folder in folders:
-            content += f"- {folder}\n"
-        content += f"\n해당 주제의 논문에 접근하려면 @{folder}를 사용하세요.\n"
-    else:
-        content += "주제를 찾을 수 없다.\n"
+    인자:
+        enabled: 프로파일링 사용 여부
+        sample_rate: 측정할 요청의 비율, 0~1 (기본값: 0.1)
+        
+    반환:
+        변경된 프로파일링 상태
+    """
+    profiler.configure(enabled, sample_rate)
+    return f"프로파일링: {'켜짐' if profiler.enabled else '꺼짐'}, 표본 비율: {profiler.sample_rate}, 덤프 위치: {profiler.out_dir}"
+
+def get_profile_summary(top_n: int = 30) -> str:
+    """
+    지금까지 수집한 프로파일 표본에서 누적 시간 기준 상위 함수를 요약한다. (관리자용)
     
+    인자:
+        top_n: 표시할 함수 수 (기본값: 30)
+    """
+    return profiler.summary(top_n)
+
+# 관리자용 도구는 RESEARCH_ADMIN_TOOLS=1일 때만 노출한다
+if os.getenv("RESEARCH_ADMIN_TOOLS", "0") == "1":
+    mcp.tool()(set_profiling)
+    mcp.tool()(get_profile_summary)
+
+def render_folders(sort: str, page: int) -> str:
+    """주제 목록의 한 페이지를 마크다운으로 렌더링한다."""
+    page = max(page, 1)
+    total, topics = store.catalog(sort, (page - 1) * FOLDERS_PAGE_SIZE, FOLDERS_PAGE_SIZE)
+
+    content = "# 사용 가능한 주제\n\n"
+    if not topics:
+        content += "주제를 찾을 수 없다.\n" if total == 0 else f"{page}페이지에 주제가 없다.\n"
+        return content
+    for info in topics:
+        updated = time.strftime("%Y-%m-%d %H:%M", time.localtime(info.updated))
+        content += f"- {info.key}: 논문 {info.papers}편, 최신 발행일 {info.newest or '-'}, 갱신 {updated}\n"
+
+    first = (page - 1) * FOLDERS_PAGE_SIZE + 1
+    content += f"\n전체 {total}개 주제 중 {first}-{first + len(topics) - 1} (정렬: {sort})\n"
+    if first + len(topics) - 1 < total:
+        content += f"다음 페이지: papers://folders/{sort}/{page + 1}\n"
+    content += f"\n해당 주제의 논문에 접근하려면 @{topics[-1].key}를 사용하세요.\n"
     return content
 
+@mcp.resource("papers://folders")
+@instrumented("resource")
+def get_available_folders() -> str:
+    """
+    papers 디렉토리에서 사용 가능한 모든 주제 폴더를 나열한다.
+    
+    이 리소스는 최근 갱신된 주제부터 논문 수, 최신 발행일과 함께 첫 페이지를 제공한다.
+    """
+    return render_folders("recent", 1)
+
+@mcp.resource("papers://folders/{sort}/{page}")
+@instrumented("resource")
+def get_folders_page(sort: str, page: int) -> str:
+    """
+    정렬 기준과 페이지를 지정해 주제 목록을 가져온다.
+
+    인자:
+        sort: recent(최근 갱신순), size(논문 수순), name(이름순)
+        page: 1부터 시작하는 페이지 번호
+    """
+    if sort not in CATALOG_SORTS:
+        return f"# 알 수 없는 정렬 기준: {sort}\n\n{', '.join(CATALOG_SORTS)} 중 하나를 사용하세요."
+    return render_folders(sort, page)
+
 @mcp.resource("papers://{topic}")
+@instrumented("resource")
 def get_topic_papers(topic: str) -> str:
     """
     특정 주제에 대한 논문의 상세 정보를 가져온다.
@@ -136,32 +492,61 @@ def get_topic_papers(topic: str) -> str:
     인자:
         topic: 논문을 검색할 연구 주제
     """
-    topic_dir = topic.lower().replace(" ", "_")
-    papers_file = os.path.join(PAPER_DIR, topic_dir, "papers_info.json")
+    try:
+        content = render_topic_page(topic)
+    except json.JSONDecodeError:
+        return f"# {topic}에 대한 논문 데이터 읽기 오류\n\n논문 데이터 파일이 손상되었다."
     
-    if not os.path.exists(papers_file):
+    if content is None:
         return f"# 주제에 대한 논문을 찾을 수 없음: {topic}\n\n먼저 이 주제에 대한 논문을 검색해 보세요."
+    return content
+
+def render_topic_page(topic: str) -> Optional[str]:
+    """
+    papers://{topic} 내용을 렌더링한다. 주제가 바뀌지 않았으면 이전 결과를 재사용한다.
+    """
+    topic_dir = store.topic_dir(topic)
+    info = store.topic_info(topic_dir)
+    cached = topic_pages.get(topic_dir)
+    hit = bool(info and cached and cached[0] == info.updated)
+    metrics.record_cache("topic_page", hit)
+    if hit:
+        return cached[1]
+
+    records = store.load_topic(topic_dir)
+    if not records:
+        return None
+    # 논문 세부 정보가 포함된 마크다운 내용 생성
+    content = render_topic_markdown(store.topic_name(topic_dir), records)
+    if info:
+        topic_pages[topic_dir] = (info.updated, content)
+    return content
+
+@mcp.resource("papers://{topic}/{paper_id}/text/{chunk}")
+@instrumented("resource")
+async def get_paper_text_chunk(topic: str, paper_id: str, chunk: int) -> str:
+    """
+    논문 본문 텍스트를 문단 단위 청크로 나누어 한 조각씩 가져온다.
     
+    인자:
+        topic: 논문이 속한 연구 주제
+        paper_id: 논문의 ID
+        chunk: 0부터 시작하는 청크 번호
+    """
     try:
-        with open(papers_file, 'r') as f:
-            papers_data = json.load(f)
-        
-        # 논문 세부 정보가 포함된 마크다운 내용 생성
-        content = f"# {topic.replace('_', ' ').title()} 주제의 논문\n\n"
-        content += f"총 논문 수: {len(papers_data)}\n\n"
-        
-        for paper_id, paper_info in papers_data.items():
-            content += f"## {paper_info['title']}\n"
-            content += f"- **논문 ID**: {paper_id}\n"
-            content += f"- **저자**: {', '.join(paper_info['authors'])}\n"
-            content += f"- **발행일**: {paper_info['published']}\n"
-            content += f"- **PDF URL**: [{paper_info['pdf_url']}]({paper_info['pdf_url']})\n\n"
-            content += f"### 요약\n{paper_info['summary'][:500]}...\n\n"
-            content += "---\n\n"
-        
-        return content
-    except json.JSONDecodeError:
-        return f"# {topic}에 대한 논문 데이터 읽기 오류\n\n논문 데이터 파일이 손상되었다."
+        # 처음 읽는 논문은 PDF 다운로드와 텍스트 추출이 필요하므로 별도 스레드에서 실행한다
+        text, total = await profiler.to_thread(texts.get_chunk, paper_id, chunk)
+    except KeyError:
+        return f"# 논문을 찾을 수 없음: {paper_id}\n\n먼저 이 주제에 대한 논문을 검색해 보세요."
+    except IndexError:
+        return f"# 청크 범위를 벗어남: {chunk}\n\n0번 청크부터 다시 읽어 보세요."
+    except Exception as e:
+        return f"# {paper_id} 텍스트 읽기 오류\n\n{str(e)}"
+    
+    content = f"# {paper_id} 본문 ({chunk + 1}/{total})\n\n{text}"
+    if chunk + 1 < total:
+        content += f"\n\n---\n다음 청크: papers://{topic}/{paper_id}/text/{chunk + 1}\n"
+    return content
 
 @mcp.prompt()
 def generate_search_prompt(topic: str, num_papers: int = 5) -> str:
@@ -190,5 +575,8 @@ def generate_search_prompt(topic: str, num_papers: int = 5) -> str:
     각 논문에 대한 자세한 정보와 {topic}의 연구 현황에 대한 고수준 종합을 모두 제시해 주세요."""
 
 if __name__ == "__main__":
-    # 서버 초기화 및 실행
-    mcp.run(transport='sse')
+    import uvicorn
+
+    # 서버 초기화 및 실행 (SSE 연결 수를 세는 미들웨어를 거친다)
+    app = metrics.track_sse_sessions(mcp.sse_app(), mcp.settings.sse_path)
+    uvicorn.run(app, host=mcp.settings.host, port=mcp.settings.port, log_level=mcp.settings.log_level.lower())
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import os
+import sys
+import time
+import asyncio
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import TYPE_CHECKING, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+if TYPE_CHECKING:
+    from mcp import ClientSession, types
+
+# 마지막 사용 후 서버를 내리기까지의 기본 대기 시간(초). 0이면 내리지 않는다
+DEFAULT_IDLE_TIMEOUT = float(os.getenv("MCP_IDLE_TIMEOUT", "300"))
+
+InitializedCallback = Callable[[str, "ClientSession", "types.InitializeResult"], Awaitable[None]]
+NotificationCallback = Callable[[str, "types.ServerNotification"], Awaitable[None]]
+
+
+class ManagedServer:
+    """
+    MCP 서버 하나의 연결 수명을 관리한다.
+
+    설정에 "url"이 있으면 SSE로 원격 서버(게이트웨이 등)에 연결하고, 없으면
+    command/args로 프로세스를 띄워 stdio로 연결한다. stdio_client와 ClientSession은 연 태스크에서 닫아야 하므로 연결마다 전용
+    태스크를 두고, stop()은 그 태스크에 종료 신호만 보낸다.
+    """
+
+    def __init__(self, name: str, config: dict, on_notification: Optional[NotificationCallback] = None):
+        self.name = name
+        self.config = config
+        self.on_notification = on_notification
+        self.session: Optional[ClientSession] = None
+        self.init_result: Optional[types.InitializeResult] = None
+        self.last_used = time.monotonic()
+        self.in_use = 0
+        self._task: Optional[asyncio.Task] = None
+        self._stop = asyncio.Event()
+
+    @property
+    def running(self) -> bool:
+        # 종료 신호를 받은 연결은 닫히는 중이므로 새로 빌려주지 않는다
+        return self.session is not None and not self._stop.is_set()
+
+    async def start(self) -> ClientSession:
+        loop = asyncio.get_running_loop()
+        ready: asyncio.Future = loop.create_future()
+        self._stop = asyncio.Event()
+        self._task = asyncio.create_task(self._run(ready), name=f"mcp-server-{self.name}")
+        return await ready
+
+    async def _handle_message(self, message) -> None:
+        from mcp import types
+
+        if self.on_notification and isinstance(message, types.ServerNotification):
+            await self.on_notification(self.name, message)
+
+    async def _run(self, ready: asyncio.Future) -> None:
+        from mcp import ClientSession
+
+        try:
+            async with AsyncExitStack() as stack:
+                read, write = await stack.enter_async_context(self._transport())
+                session = await stack.enter_async_context(
+                    ClientSession(read, write, message_handler=self._handle_message)
+                )
+                self.init_result = await session.initialize()
+                self.session = session
+                self.last_used = time.monotonic()
+                ready.set_result(session)
+                await self._stop.wait()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                print(f"Server '{self.name}' stopped: {e}", file=sys.stderr)
+        finally:
+            self.session = None
+
+    def _transport(self):
+        if "url" in self.config:
+            from mcp.client.sse import sse_client
+            return sse_client(self.config["url"], headers=self.config.get("headers"))
+        from mcp import StdioServerParameters
+        from mcp.client.stdio import stdio_client
+        return stdio_client(StdioServerParameters(**self.config))
+
+    async def stop(self) -> None:
+        self._stop.set()
+        if self._task:
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+
+class Router:
+    """
+    도구/프롬프트 이름과 리소스 URI로 처리할 서버 이름을 찾는 라우팅 표.
+
+    같은 이름이 여러 서버에 있으면 먼저 등록한 서버가 처리한다. 리소스 템플릿은
+    고정 접두사(예: "papers://")로 등록하고, 가장 긴 접두사가 일치하는 서버로 보낸다.
+    """
+
+    def __init__(self):
+        # 도구/프롬프트/리소스 이름 -> 서버 이름
+        self.routes: Dict[str, str] = {}
+        # 리소스 템플릿의 고정 접두사 -> 서버 이름
+        self.resource_prefixes: Dict[str, str] = {}
+
+    def add(self, name: str, server_name: str) -> bool:
+        """이름을 서버에 연결한다. 다른 서버가 이미 가지고 있으면 False"""
+        owner = self.routes.setdefault(name, server_name)
+        if owner != server_name:
+            print(f"'{name}'이(가) '{owner}'와 '{server_name}'에 모두 있어 '{owner}'로 보낸다.",
+                  file=sys.stderr)
+            return False
+        return True
+
+    def add_template(self, uri_template: str, server_name: str) -> bool:
+        """리소스 템플릿의 고정 접두사를 서버에 연결한다. 다른 서버가 이미 가지고 있으면 False"""
+        prefix = uri_template.split("{", 1)[0]
+        return self.resource_prefixes.setdefault(prefix, server_name) == server_name
+
+    def server_for(self, name: str) -> Optional[str]:
+        """도구/프롬프트 이름이나 리소스 URI를 처리할 서버 이름을 찾는다"""
+        server_name = self.routes.get(name)
+        if server_name:
+            return server_name
+        matches = [prefix for prefix in self.resource_prefixes if prefix and name.startswith(prefix)]
+        if matches:
+            return self.resource_prefixes[max(matches, key=len)]
+        return None
+
+
+class ServerManager:
+    """
+    설정된 MCP 서버들을 필요할 때 시작하고, 유휴 시간이 지나면 내린다.
+
+    내려간 서버는 다음에 라우팅될 때 다시 시작되므로 호출하는 쪽에서는
+    차이가 없다. on_initialized는 서버가 (다시) 시작될 때마다, on_notification은
+    서버가 알림을 보낼 때마다 호출된다.
+    """
+
+    def __init__(self, idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+                 on_initialized: Optional[InitializedCallback] = None,
+                 on_notification: Optional[NotificationCallback] = None):
+        self.idle_timeout = idle_timeout
+        self.on_initialized = on_initialized
+        self.on_notification = on_notification
+        self.servers: Dict[str, ManagedServer] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._reaper: Optional[asyncio.Task] = None
+
+    def add(self, name: str, config: dict) -> None:
+        self.servers[name] = ManagedServer(name, config, self.on_notification)
+
+    async def session(self, name: str) -> ClientSession:
+        """서버 세션을 반환한다. 실행 중이 아니면 이때 시작"""
+        server = self.servers[name]
+        if server.running:
+            return server.session
+        lock = self._locks.setdefault(name, asyncio.Lock())
+        async with lock:
+            if not server.running:
+                session = await server.start()
+                if self.on_initialized:
+                    await self.on_initialized(name, session, server.init_result)
+                self._start_reaper()
+        return server.session
+
+    @asynccontextmanager
+    async def use(self, name: str) -> AsyncIterator[ClientSession]:
+        """사용하는 동안에는 유휴 종료 대상에서 빠지도록 세션을 빌려준다"""
+        server = self.servers[name]
+        server.in_use += 1
+        try:
+            yield await self.session(name)
+        finally:
+            server.in_use -= 1
+            server.last_used = time.monotonic()
+
+    def touch(self) -> None:
+        """
+        실행 중인 모든 서버의 마지막 사용 시각을 지금으로 갱신한다.
+
+        쿼리를 시작할 때 호출하면, LLM 응답을 기다리는 동안 그 쿼리가 곧 쓸 서버가
+        유휴 종료되지 않는다.
+        """
+        now = time.monotonic()
+        for server in self.servers.values():
+            if server.running:
+                server.last_used = now
+
+    def _start_reaper(self) -> None:
+        if self.idle_timeout > 0 and (self._reaper is None or self._reaper.done()):
+            self._reaper = asyncio.create_task(self._reap_idle())
+
+    async def _reap_idle(self) -> None:
+        interval = max(self.idle_timeout / 4, 1.0)
+        while any(server.running for server in self.servers.values()):
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            for server in self.servers.values():
+                if server.running and server.in_use == 0 and now - server.last_used > self.idle_timeout:
+                    async with self._locks.setdefault(server.name, asyncio.Lock()):
+                        if server.in_use == 0:
+                            await server.stop()
+
+    async def aclose(self) -> None:
+        if self._reaper:
+            self._reaper.cancel()
+            await asyncio.gather(self._reaper, return_exceptions=True)
+        for server in self.servers.values():
+            await server.stop()
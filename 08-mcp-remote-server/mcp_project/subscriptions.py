@@ -0,0 +1,97 @@
+import os
+import sys
+import asyncio
+import weakref
+from typing import Callable, Dict, Optional, Set
+
+from paper_store import topic_key
+
+# 주제 목록 리소스의 URI 접두사 (papers://folders, papers://folders/{sort}/{page})
+FOLDERS_URI = "papers://folders"
+TOPIC_URI_PREFIX = "papers://"
+# 구독이 있는 동안 다른 프로세스의 변경을 확인하는 간격(초)
+POLL_INTERVAL = float(os.getenv("RESEARCH_SUBSCRIPTION_POLL", "5"))
+
+
+class SubscriptionHub:
+    """
+    리소스 구독을 관리하고 주제가 바뀌면 resources/updated 알림을 보낸다.
+
+    구독은 URI -> 세션 집합이며, 세션은 약한 참조로 두어 연결이 끊긴 세션이
+    남지 않도록 한다. topic_changed()는 어느 스레드에서 불러도 되며, 같은
+    이벤트 루프 차례 안에 바뀐 주제는 한 번의 알림으로 합친다.
+
+    같은 papers/ 디렉토리를 쓰는 다른 프로세스의 변경은 watch()로 등록한 함수를
+    구독이 있는 동안 POLL_INTERVAL초마다 불러 찾는다. 그 함수가 바뀐 주제마다
+    topic_changed()를 부르도록 연결한다.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[str, weakref.WeakSet] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: Set[str] = set()
+        self._poll: Optional[Callable[[], None]] = None
+        self._watcher: Optional[asyncio.Task] = None
+
+    def watch(self, poll: Callable[[], None]) -> None:
+        """구독이 있는 동안 주기적으로 부를 변경 확인 함수를 등록한다 (작업 스레드에서 불린다)."""
+        self._poll = poll
+
+    def subscribe(self, uri: str, session) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._subscribers.setdefault(uri, weakref.WeakSet()).add(session)
+        if self._poll is not None and (self._watcher is None or self._watcher.done()):
+            self._watcher = asyncio.ensure_future(self._watch())
+
+    async def _watch(self) -> None:
+        while self._subscribers:
+            await asyncio.sleep(POLL_INTERVAL)
+            try:
+                await asyncio.to_thread(self._poll)
+            except Exception as e:
+                print(f"변경 확인 오류: {e}", file=sys.stderr)
+
+    def unsubscribe(self, uri: str, session) -> None:
+        sessions = self._subscribers.get(uri)
+        if sessions is not None:
+            sessions.discard(session)
+            if not sessions:
+                del self._subscribers[uri]
+
+    def topic_changed(self, key: str) -> None:
+        """주제 key의 논문이 바뀌었음을 알린다."""
+        if self._loop is None or not self._subscribers or self._loop.is_closed():
+            return
+        self._loop.call_soon_threadsafe(self._schedule, key)
+
+    def _schedule(self, key: str) -> None:
+        if not self._pending:
+            self._loop.call_soon(lambda: asyncio.ensure_future(self._flush()))
+        self._pending.add(key)
+
+    def _affected(self, keys: Set[str]) -> Set[str]:
+        uris = set()
+        for uri in self._subscribers:
+            if uri.startswith(FOLDERS_URI):
+                uris.add(uri)
+            elif uri.startswith(TOPIC_URI_PREFIX):
+                topic = uri[len(TOPIC_URI_PREFIX):]
+                if "/" not in topic and topic_key(topic) in keys:
+                    uris.add(uri)
+        return uris
+
+    async def _flush(self) -> None:
+        from pydantic import AnyUrl
+
+        keys, self._pending = self._pending, set()
+        for uri in self._affected(keys):
+            for session in list(self._subscribers.get(uri, ())):
+                try:
+                    await session.send_resource_updated(AnyUrl(uri))
+                except Exception:
+                    # 닫힌 세션은 구독에서 뺀다
+                    self.unsubscribe(uri, session)
+
+
+# 서버 프로세스 전체에서 공유하는 구독 관리자
+hub = SubscriptionHub()
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# 모듈이 mcp_project 바로 아래에 있으므로 테스트에서 그대로 import할 수 있게 한다
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
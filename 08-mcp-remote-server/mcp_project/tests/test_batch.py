@@ -0,0 +1,55 @@
+"""스크립트 백엔드로 일괄 처리와 중단 후 재실행을 확인한다."""
+import asyncio
+import json
+
+from llm_backend import ScriptedBackend
+from mcp_chatbot import MCP_ChatBot
+
+
+def read_jsonl(path) -> list:
+    """결과 파일을 읽는다. 중단되며 잘린 줄은 건너뛴다."""
+    records = []
+    with open(path) as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except json.JSONDecodeError:
+                pass
+    return records
+
+
+def test_batch_resumes_after_interruption(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    input_path = tmp_path / "queries.jsonl"
+    output_path = tmp_path / "results.jsonl"
+    input_path.write_text(
+        '{"id": "a", "query": "first"}\n'
+        '{"query": "second"}\n'
+        "\n"
+        '{"id": "c", "query": "third"}\n'
+    )
+    backend = ScriptedBackend({"first": [{"content": "one"}], "second": [{"content": "two"}]})
+    chatbot = MCP_ChatBot(backend=backend)
+
+    counts = asyncio.run(chatbot.run_batch(str(input_path), str(output_path), parallelism=2))
+
+    # 스크립트에 없는 쿼리는 오류로 기록되고, id가 없는 줄은 줄 번호를 id로 쓴다
+    assert counts == {"skipped": 0, "succeeded": 2, "failed": 1}
+    results = {record["id"]: record for record in read_jsonl(output_path)}
+    assert results["a"]["answer"] == "one" and results[2]["answer"] == "two"
+    assert "error" in results["c"]
+    assert results["a"]["turns"] == 1
+
+    # 중단되며 잘린 줄을 남기고, 실패한 쿼리를 처리할 수 있게 된 뒤 다시 실행한다
+    with open(output_path, "a") as f:
+        f.write('{"id": "c", "query": "thi')
+    backend.script["third"] = [{"content": "three"}]
+    counts = asyncio.run(chatbot.run_batch(str(input_path), str(output_path), parallelism=2))
+
+    assert counts == {"skipped": 2, "succeeded": 1, "failed": 0}
+    last = read_jsonl(output_path)[-1]
+    assert (last["id"], last["answer"]) == ("c", "three")
+
+    # 모두 끝난 뒤에는 아무것도 다시 보내지 않는다
+    counts = asyncio.run(chatbot.run_batch(str(input_path), str(output_path)))
+    assert counts == {"skipped": 3, "succeeded": 0, "failed": 0}
@@ -0,0 +1,82 @@
+"""공저 그래프의 CSR 구성, PageRank, 이웃, 최단 경로를 확인한다."""
+import numpy as np
+import pytest
+
+from coauthor_graph import CoauthorGraph, _csr, _pagerank
+from paper_store import PaperRecord, PaperStore
+
+
+def record(paper_id: str, *authors: str) -> PaperRecord:
+    return PaperRecord(paper_id, "t", authors, "s", "", "2024-01-01")
+
+
+def test_csr_sums_duplicate_edges_and_drops_cancelled_ones():
+    src = np.array([0, 0, 1, 2, 0, 2], dtype=np.int32)
+    dst = np.array([1, 1, 0, 0, 2, 0], dtype=np.int32)
+    weights = np.array([1, 1, 1, 1, 1, -1])
+    indptr, indices, merged = _csr(src, dst, weights, 4)
+
+    assert indptr.tolist() == [0, 2, 3, 3, 3]
+    assert indices.tolist() == [1, 2, 0]
+    assert merged.tolist() == [2, 1, 1]
+
+
+def test_pagerank_is_a_distribution_favouring_hubs():
+    # 0이 가운데인 별 모양 그래프와 고립된 저자 4
+    src = np.array([0, 1, 0, 2, 0, 3], dtype=np.int32)
+    dst = np.array([1, 0, 2, 0, 3, 0], dtype=np.int32)
+    rank = _pagerank(*_csr(src, dst, np.ones(6), 5))
+
+    assert rank.sum() == pytest.approx(1.0)
+    assert rank[1:4] == pytest.approx([rank[1]] * 3)
+    assert rank[0] > rank[1] > rank[4] > 0
+    assert _pagerank(np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int32), np.zeros(0)).size == 0
+
+
+@pytest.fixture
+def graph(tmp_path):
+    store = PaperStore(str(tmp_path / "papers"))
+    store.add_papers("graphs", [
+        record("p1", "Ada", "Bob", "Cy"),
+        record("p2", "Ada", "bob"),
+        record("p3", "Cy", "Dee"),
+        record("p4", "Dee", "Eve"),
+        record("p5", "Fay"),
+    ])
+    return CoauthorGraph(store)
+
+
+def test_neighbors_are_weighted_by_shared_papers(graph):
+    # 저자 이름은 정규화한 키로 합치고 처음 나온 표기를 쓴다
+    assert graph.neighbors("ada") == [("Bob", 2), ("Cy", 1)]
+    assert graph.neighbors("Fay") == []
+    with pytest.raises(KeyError):
+        graph.neighbors("Nobody")
+
+
+def test_top_ranks_whole_graph_and_topic_subgraph(graph):
+    assert graph.top("degree", 1) == [("Cy", 3.0)]
+    # 공저자가 없는 저자는 순위에 넣지 않는다
+    ranked = [name for name, _ in graph.top("pagerank", 10)]
+    assert ranked[0] == "Cy" and sorted(ranked) == ["Ada", "Bob", "Cy", "Dee", "Eve"]
+    # 주제의 논문만으로 만든 부분 그래프
+    assert graph.top("degree", 5, paper_ids=["p3", "p4"]) == [("Dee", 2.0), ("Cy", 1.0), ("Eve", 1.0)]
+    assert [name for name, _ in graph.top("pagerank", 1, paper_ids=["p3", "p4"])] == ["Dee"]
+    with pytest.raises(ValueError):
+        graph.top("betweenness")
+
+
+def test_shortest_path_respects_max_hops(graph):
+    assert graph.shortest_path("Ada", "Eve") == ["Ada", "Cy", "Dee", "Eve"]
+    assert graph.shortest_path("Eve", "Bob") == ["Eve", "Dee", "Cy", "Bob"]
+    assert graph.shortest_path("Ada", "Ada") == ["Ada"]
+    assert graph.shortest_path("Ada", "Eve", max_hops=2) is None
+    assert graph.shortest_path("Ada", "Fay") is None
+
+
+def test_changed_authors_replace_old_edges(graph):
+    assert graph.neighbors("Ada") == [("Bob", 2), ("Cy", 1)]
+    graph.store.add_papers("graphs", [record("p2", "Ada", "Eve")])
+
+    assert sorted(graph.neighbors("Ada")) == [("Bob", 1), ("Cy", 1), ("Eve", 1)]
+    assert graph.shortest_path("Ada", "Eve") == ["Ada", "Eve"]
@@ -0,0 +1,78 @@
+"""코퍼스 내보내기의 증분 추가와, 실패했을 때 이전 내보내기가 남는지 확인한다."""
+import os
+import sys
+
+import pytest
+
+import corpus_export
+from corpus_export import export_corpus, load_export
+from paper_store import PaperRecord, PaperStore
+
+
+def record(paper_id: str, title: str = "t") -> PaperRecord:
+    return PaperRecord(paper_id, title, ("Ada Lovelace", "Alan Turing"), "요약", "", "2024-01-31")
+
+
+def paper_ids(parts) -> list:
+    return [paper_id for part in parts for paper_id in part["paper_id"].to_list()]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = PaperStore(str(tmp_path / "papers"))
+    store.add_papers("agents", [record("0001"), record("0002")])
+    return store
+
+
+def test_numpy_export_appends_parts(store, tmp_path):
+    out_dir = str(tmp_path / "export")
+    first = export_corpus(store, out_dir, "numpy")
+    assert (first["rows_written"], first["parts"]) == (2, 1)
+
+    store.add_papers("agents", [record("0003"), record("0001", title="changed")])
+    second = export_corpus(store, out_dir, "numpy")
+    assert (second["rows_written"], second["rows"], second["parts"]) == (2, 4, 2)
+
+    parts = load_export(out_dir)
+    assert paper_ids(parts) == ["0001", "0002", "0003", "0001"]
+    assert parts[1]["title"][1] == "changed"
+    assert parts[0]["authors"].to_list() == ["Ada Lovelace", "Alan Turing"] * 2
+    assert [name for name in os.listdir(out_dir) if name.startswith(".export-")] == []
+
+    rebuilt = export_corpus(store, out_dir, "numpy", incremental=False)
+    assert (rebuilt["rows"], rebuilt["parts"]) == (3, 1)
+    assert sorted(paper_ids(load_export(out_dir))) == ["0001", "0002", "0003"]
+
+
+def test_missing_backend_leaves_previous_export(store, tmp_path, monkeypatch):
+    out_dir = str(tmp_path / "export")
+    export_corpus(store, out_dir, "numpy")
+    before = sorted(os.listdir(out_dir))
+    monkeypatch.setitem(sys.modules, "pyarrow", None)
+
+    with pytest.raises(ImportError):
+        export_corpus(store, out_dir, "arrow")
+
+    assert sorted(os.listdir(out_dir)) == before
+    assert paper_ids(load_export(out_dir)) == ["0001", "0002"]
+
+
+def test_failed_rebuild_leaves_previous_export(store, tmp_path, monkeypatch):
+    out_dir = str(tmp_path / "export")
+    export_corpus(store, out_dir, "numpy")
+    store.add_papers("agents", [record("0003")])
+
+    def fail(*args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(corpus_export, "_write_topics", fail)
+    with pytest.raises(OSError):
+        export_corpus(store, out_dir, "numpy", incremental=False)
+
+    assert paper_ids(load_export(out_dir)) == ["0001", "0002"]
+    assert [name for name in os.listdir(out_dir) if name.startswith(".export-")] == []
+
+    # 다음 증분 내보내기는 실패 전 상태에서 이어 간다
+    monkeypatch.undo()
+    assert export_corpus(store, out_dir, "numpy")["rows_written"] == 1
+    assert paper_ids(load_export(out_dir)) == ["0001", "0002", "0003"]
@@ -0,0 +1,28 @@
+"""디스크 캐시의 크기 집계와 제거를 확인한다."""
+import os
+
+from disk_cache import DiskCache
+
+
+def test_overwriting_a_key_does_not_grow_the_total(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=1000)
+    cache.store("aa01", {"value": "x" * 300})
+    for _ in range(10):
+        cache.store("aa02", {"value": "y" * 300})
+
+    # 같은 키를 덮어쓴 크기는 한 번만 센다
+    assert cache._total_bytes == sum(os.path.getsize(cache.path(key)) for key in ("aa01", "aa02"))
+    assert cache.load("aa01") == {"value": "x" * 300}
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = DiskCache(str(tmp_path), max_bytes=1100)
+    for number in range(3):
+        cache.store(f"bb{number}", {"value": "z" * 300})
+        os.utime(cache.path(f"bb{number}"), (number, number))
+    cache.load("bb0")
+    cache.store("bb3", {"value": "z" * 300})
+
+    assert cache.load("bb1") is None
+    assert all(cache.load(f"bb{number}") is not None for number in (0, 2, 3))
+    assert cache._total_bytes <= 990
@@ -0,0 +1,235 @@
+"""로컬 HTTP 서버로 PDF 이어받기와 도구 결과 캐시의 재검증을 확인한다."""
+import asyncio
+import hashlib
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+import pytest
+
+from paper_store import PaperRecord, PaperStore
+from paper_text import PaperTextService
+from tool_cache import HttpToolCache
+
+PDF_TEXT = "Resumable download works"
+
+
+def make_pdf(text: str, padding: int = 256 * 1024) -> bytes:
+    """텍스트 한 줄이 있는 한 쪽짜리 PDF. 다운로드 청크보다 크도록 참조하지 않는 객체로 채운다."""
+    content = f"BT /F1 24 Tf 72 720 Td ({text}) Tj ET".encode("latin-1")
+    filler = b"0" * padding
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+        b"/Contents 4 0 R /Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+        b"<< /Length %d >>\nstream\n%s\nendstream" % (len(filler), filler),
+    ]
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+class Origin(ThreadingHTTPServer):
+    """PDF 하나를 Range, ETag, 조건부 요청을 지원하며 제공하는 서버"""
+
+    daemon_threads = True
+
+    def __init__(self, body: bytes):
+        super().__init__(("127.0.0.1", 0), Handler)
+        self.body = body
+        self.etag = '"%s"' % hashlib.sha256(body).hexdigest()[:16]
+        # 다음 GET 응답을 이 바이트 수만 보내고 끊는다
+        self.cut_after = None
+        self.requests = []
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/paper.pdf"
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _headers(self, status: int, length: int, extra=None) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/pdf")
+        self.send_header("Content-Length", str(length))
+        self.send_header("ETag", self.server.etag)
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Accept-Ranges", "bytes")
+        for name, value in (extra or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+
+    def do_HEAD(self):
+        self.server.requests.append(("HEAD", dict(self.headers)))
+        if self.headers.get("If-None-Match") == self.server.etag:
+            self.send_response(304)
+            self.send_header("ETag", self.server.etag)
+            self.end_headers()
+            return
+        self._headers(200, len(self.server.body))
+
+    def do_GET(self):
+        self.server.requests.append(("GET", dict(self.headers)))
+        body = self.server.body
+        status, extra = 200, {}
+        requested = self.headers.get("Range")
+        if_range = self.headers.get("If-Range")
+        if requested and (if_range is None or if_range == self.server.etag):
+            start = int(requested.split("=")[1].rstrip("-"))
+            if start >= len(body):
+                self._headers(416, 0, {"Content-Range": f"bytes */{len(body)}"})
+                return
+            extra["Content-Range"] = f"bytes {start}-{len(body) - 1}/{len(body)}"
+            status, body = 206, body[start:]
+        self._headers(status, len(body), extra)
+        if self.server.cut_after is not None:
+            self.wfile.write(body[:self.server.cut_after])
+            self.wfile.flush()
+            self.server.cut_after = None
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def origin():
+    server = Origin(make_pdf(PDF_TEXT))
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_interrupted_download_resumes_with_range(origin, tmp_path):
+    store = PaperStore(str(tmp_path / "papers"))
+    store.add_papers("resume", [PaperRecord("0000.0001", "t", ("A",), "s", origin.url, "2024-01-01")])
+    service = PaperTextService(store)
+
+    cut = len(origin.body) // 2
+    origin.cut_after = cut
+    with pytest.raises(httpx.TransportError):
+        service.get_text("0000.0001")
+
+    assert PDF_TEXT in service.get_text("0000.0001")
+    gets = [headers for method, headers in origin.requests if method == "GET"]
+    assert len(gets) == 2
+    assert "Range" not in gets[0]
+    # 이미 받은 부분(다운로드 청크 단위로 기록된 만큼)부터 이어받는다
+    resumed_from = int(gets[1]["Range"].split("=")[1].rstrip("-"))
+    assert 0 < resumed_from <= cut
+
+    assert gets[1]["If-Range"] == origin.etag
+
+    digest = hashlib.sha256(origin.body).hexdigest()
+    with open(service.pdf_path(digest), "rb") as f:
+        assert f.read() == origin.body
+
+
+def test_changed_origin_restarts_instead_of_splicing(origin, tmp_path):
+    store = PaperStore(str(tmp_path / "papers"))
+    store.add_papers("resume", [PaperRecord("0000.0001", "t", ("A",), "s", origin.url, "2024-01-01")])
+    service = PaperTextService(store)
+
+    origin.cut_after = len(origin.body) // 2
+    with pytest.raises(httpx.TransportError):
+        service.get_text("0000.0001")
+
+    # 중단된 사이에 원본이 바뀌면 If-Range가 맞지 않아 전체 본문(200)을 받는다
+    origin.body = make_pdf("Revised version")
+    origin.etag = '"revised"'
+    assert "Revised version" in service.get_text("0000.0001")
+
+    gets = [headers for method, headers in origin.requests if method == "GET"]
+    assert "If-Range" in gets[1]
+    digest = hashlib.sha256(origin.body).hexdigest()
+    with open(service.pdf_path(digest), "rb") as f:
+        assert f.read() == origin.body
+    assert os.listdir(os.path.join(service.pdf_dir, "partial")) == []
+
+
+def test_tool_cache_revalidates_with_304(origin, tmp_path):
+    from mcp import types
+
+    calls = []
+
+    async def fetch_tool() -> types.CallToolResult:
+        calls.append(origin.url)
+        return types.CallToolResult(content=[types.TextContent(type="text", text="paper body")])
+
+    async def run():
+        cache = HttpToolCache(cache_dir=str(tmp_path / "http"), revalidate=True)
+        first = await cache.call("fetch", {"url": origin.url}, fetch_tool)
+        second = await cache.call("fetch", {"url": origin.url}, fetch_tool)
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    # no-cache 응답이라 두 번째 호출은 조건부 HEAD로 확인한 뒤 저장한 결과를 쓴다
+    assert len(calls) == 1
+    assert second.content[0].text == first.content[0].text == "paper body"
+    conditional = [headers for method, headers in origin.requests
+                   if method == "HEAD" and "If-None-Match" in headers]
+    assert [headers["If-None-Match"] for headers in conditional] == [origin.etag]
+
+
+def test_tool_cache_sends_no_head_unless_enabled(origin, tmp_path):
+    from mcp import types
+
+    calls = []
+
+    async def fetch_tool() -> types.CallToolResult:
+        calls.append(origin.url)
+        return types.CallToolResult(content=[types.TextContent(type="text", text="paper body")])
+
+    async def run():
+        cache = HttpToolCache(cache_dir=str(tmp_path / "http"))
+        await cache.call("fetch", {"url": origin.url}, fetch_tool)
+        await cache.call("fetch", {"url": origin.url}, fetch_tool)
+
+    asyncio.run(run())
+
+    # 헤더를 알려 주지 않는 도구의 결과는 저장하지 않고, 챗봇이 원본에 직접 요청하지도 않는다
+    assert len(calls) == 2
+    assert origin.requests == []
+
+
+def test_tool_cache_uses_result_headers_without_head(origin, tmp_path):
+    from mcp import types
+
+    calls = []
+
+    async def fetch_tool() -> types.CallToolResult:
+        calls.append(origin.url)
+        return types.CallToolResult(
+            content=[types.TextContent(type="text", text="paper body")],
+            _meta={"http/headers": {"ETag": origin.etag, "Cache-Control": "max-age=60"}},
+        )
+
+    async def run():
+        cache = HttpToolCache(cache_dir=str(tmp_path / "http"))
+        await cache.call("fetch", {"url": origin.url}, fetch_tool)
+        return await cache.call("fetch", {"url": origin.url}, fetch_tool)
+
+    second = asyncio.run(run())
+
+    # 도구 결과에 검증자와 신선도가 있으면 HEAD 없이 저장하고, 신선한 동안 그대로 쓴다
+    assert len(calls) == 1
+    assert second.content[0].text == "paper body"
+    assert origin.requests == []
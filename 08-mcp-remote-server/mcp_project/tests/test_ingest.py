@@ -0,0 +1,69 @@
+"""요청 간격 제한기와 시간 예산 안의 arXiv 검색(추가 요청, 대체 응답)을 확인한다."""
+import threading
+import time
+
+from ingest import ArxivSearch, RateLimiter
+from paper_store import PaperRecord, PaperStore
+
+
+def record(paper_id: str) -> PaperRecord:
+    return PaperRecord(paper_id, "graph agents", ("A",), "s", "", "2024-01-01")
+
+
+def test_reserve_does_not_take_a_slot_past_the_timeout():
+    limiter = RateLimiter(10.0)
+    assert limiter.reserve(0) == 0
+    assert limiter.reserve(1.0) is None
+    assert limiter.wait(1.0) is False
+    # 예약하지 않았으므로 다음 슬롯은 그대로 약 10초 뒤다
+    assert 9.0 < limiter.reserve() <= 10.0
+
+
+def make_search(interval: float, budget: float, hedge_delay: float) -> ArxivSearch:
+    search = ArxivSearch(RateLimiter(interval), workers=2)
+    search.budget = budget
+    search.default_hedge_delay = hedge_delay
+    return search
+
+
+def test_busy_limiter_falls_back_without_tripping_the_breaker(tmp_path):
+    store = PaperStore(str(tmp_path / "papers"))
+    store.add_papers("graph agents", [record("0001")])
+    search = make_search(interval=60.0, budget=0.2, hedge_delay=0.1)
+    search.limiter.reserve()
+    calls = []
+    search._fetch = lambda topic, max_results: calls.append(topic) or []
+
+    started = time.monotonic()
+    outcome = search.search("graph agents", 5, store)
+
+    assert time.monotonic() - started < 1.0
+    assert outcome.stale and [r.paper_id for r in outcome.records] == ["0001"]
+    assert calls == []
+    assert search.breaker.failures == 0
+
+
+def test_slow_request_is_hedged_on_the_next_slot(tmp_path):
+    store = PaperStore(str(tmp_path / "papers"))
+    # 추가 요청 대기 시간(0.05초)이 요청 간격(0.2초)보다 짧아도 다음 슬롯을 예약해 보낸다
+    search = make_search(interval=0.2, budget=5.0, hedge_delay=0.05)
+    release = threading.Event()
+    calls = []
+
+    def fetch(topic, max_results):
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            release.wait(5.0)
+            return [record("slow")]
+        return [record("fast")]
+
+    search._fetch = fetch
+    started = time.monotonic()
+    outcome = search.search("graph agents", 5, store)
+    release.set()
+
+    assert [r.paper_id for r in outcome.records] == ["fast"]
+    assert not outcome.stale
+    # 추가 요청은 요청 간격을 지켜 나갔다
+    assert calls[1] - calls[0] >= 0.19
+    assert time.monotonic() - started < 1.0
@@ -0,0 +1,132 @@
+"""주제 키 정규화와 papers/ 트리 병합(dedupe)을 확인한다."""
+import json
+import os
+
+import pytest
+
+from paper_store import CORPUS_FILE, LEGACY_PAPERS_FILE, TOPIC_FILE, PaperRecord, PaperStore, topic_key
+
+
+def record(paper_id: str, title: str = "t", published: str = "2024-01-01") -> PaperRecord:
+    return PaperRecord(paper_id, title, ("Ada Lovelace",), "summary", f"https://arxiv.org/pdf/{paper_id}", published)
+
+
+def corpus_lines(paper_dir) -> list:
+    with open(os.path.join(paper_dir, CORPUS_FILE)) as f:
+        return [json.loads(line) for line in f]
+
+
+@pytest.mark.parametrize("topic", ["LLM agents", "llm-agents", "LLM  agents", "llm_agents", "Llm.Agents!"])
+def test_topic_key_folds_separators_and_plurals(topic):
+    assert topic_key(topic) == "llm_agent"
+
+
+@pytest.mark.parametrize("word, key", [
+    ("Studies", "study"), ("classes", "class"), ("boxes", "box"), ("matches", "match"),
+    ("bus", "bus"), ("analysis", "analysis"), ("gas", "gas"), ("ＬＬＭ", "llm"),
+])
+def test_topic_key_stems(word, key):
+    assert topic_key(word) == key
+
+
+def test_topic_without_letters_is_rejected(tmp_path):
+    assert topic_key("!!!") == ""
+    with pytest.raises(ValueError):
+        PaperStore(str(tmp_path)).add_papers("!!!", [record("0001")])
+
+
+def test_dedupe_merges_topics_and_compacts_corpus(tmp_path):
+    paper_dir = tmp_path / "papers"
+    # 이전 버전의 주제별 papers_info.json 폴더
+    legacy = paper_dir / "LLM_Agents"
+    legacy.mkdir(parents=True)
+    (legacy / LEGACY_PAPERS_FILE).write_text(json.dumps({
+        "0001": record("0001").to_dict(),
+        "0002": record("0002").to_dict(),
+    }))
+    # 정규화되지 않은 이름의 주제 폴더와, 같은 논문이 여러 번 기록된 코퍼스
+    store = PaperStore(str(paper_dir))
+    store.add_papers("other", [record("0003", title="old"), record("0004")])
+    store.add_papers("other", [record("0003", title="new")])
+    (paper_dir / "llm_agents").mkdir()
+    (paper_dir / "llm_agents" / TOPIC_FILE).write_text(json.dumps({"name": "llm agents", "paper_ids": ["0003"]}))
+    assert len(corpus_lines(paper_dir)) == 3
+
+    stats = PaperStore(str(paper_dir)).dedupe()
+
+    assert stats == {"merged_folders": 2, "migrated_papers": 2, "papers": 4}
+    assert sorted(p.name for p in paper_dir.iterdir() if p.is_dir()) == ["llm_agent", "other"]
+    store = PaperStore(str(paper_dir))
+    assert list(store.load_topic("llm_agent")) == ["0001", "0002", "0003"]
+    assert store.get("0003").title == "new"
+    # 코퍼스는 논문당 최신 레코드 한 줄만 남는다
+    lines = corpus_lines(paper_dir)
+    assert sorted(line["id"] for line in lines) == ["0001", "0002", "0003", "0004"]
+    _, topics = store.catalog(sort="name")
+    assert [(t.key, t.papers) for t in topics] == [("llm_agent", 3), ("other", 2)]
+
+    # 두 번째 실행은 아무것도 바꾸지 않는다
+    again = PaperStore(str(paper_dir)).dedupe()
+    assert again == {"merged_folders": 0, "migrated_papers": 0, "papers": 4}
+    assert corpus_lines(paper_dir) == lines
+    assert list(PaperStore(str(paper_dir)).load_topic("llm_agent")) == ["0001", "0002", "0003"]
+
+
+@pytest.fixture
+def library(tmp_path):
+    paper_dir = str(tmp_path / "papers")
+    store = PaperStore(paper_dir)
+    store.add_papers("agents", [
+        PaperRecord("a1", "t", ("Ada Lovelace",), "s", "", "2023-05-01"),
+        PaperRecord("a2", "t", ("Alan Turing", "Ada Lovelace"), "s", "", "2024-02-10"),
+        PaperRecord("a3", "t", ("Grace Hopper",), "s", "", "2024-11-30"),
+    ])
+    store.add_papers("compilers", [
+        PaperRecord("c1", "t", ("Grace Hopper",), "s", "", "2022-01-15"),
+        PaperRecord("a3", "t", ("Grace Hopper",), "s", "", "2024-11-30"),
+    ])
+    return paper_dir
+
+
+def ids(records) -> list:
+    return [record.paper_id for record in records]
+
+
+@pytest.mark.parametrize("incremental", [False, True])
+def test_query_filters_newest_first(library, incremental):
+    store = PaperStore(library)
+    expected = ["a3", "a2", "a1", "c1"]
+    if incremental:
+        # 코퍼스를 읽어 정렬한 뒤의 추가는 발행일 인덱스에 제자리로 들어간다
+        assert ids(store.query()) == expected
+        store.add_papers("agents", [PaperRecord("a0", "t", ("Ada Lovelace",), "s", "", "2021-07-07")])
+        expected = expected + ["a0"]
+
+    assert ids(store.query()) == expected
+    assert ids(store.query(since="2024")) == ["a3", "a2"]
+    assert ids(store.query(until="2023")) == expected[2:]
+    assert ids(store.query(since="2024-01", until="2024-02")) == ["a2"]
+    assert ids(store.query(author="  ada   LOVELACE ")) == [p for p in expected if p in ("a2", "a1", "a0")]
+    # 정확히 일치하는 저자가 없으면 이름 일부로 찾는다
+    assert ids(store.query(author="hopper")) == ["a3", "c1"]
+    assert ids(store.query(topic="Compilers")) == ["a3", "c1"]
+    assert ids(store.query(author="Grace Hopper", topic="agents")) == ["a3"]
+    assert ids(store.query(author="Grace Hopper", since="2023")) == ["a3"]
+    assert store.query(author="nobody") == []
+
+
+def test_query_limit_pages_through_dates(library):
+    store = PaperStore(library)
+    assert ids(store.query(limit=2)) == ["a3", "a2"]
+    # 마지막으로 받은 발행일 직전까지를 다음 쪽으로 이어서 읽는다
+    assert ids(store.query(until="2024-02-09", limit=2)) == ["a1", "c1"]
+
+
+def test_query_sees_changed_dates(library):
+    store = PaperStore(library)
+    assert ids(store.query(since="2024")) == ["a3", "a2"]
+    # 발행일이 바뀐 레코드는 이전 위치에서 빠진다 (다른 프로세스의 쓰기도 마찬가지)
+    store.add_papers("agents", [PaperRecord("a3", "t", ("Grace Hopper",), "s", "", "2020-01-01")])
+    assert ids(store.query(since="2024")) == ["a2"]
+    PaperStore(library).add_papers("agents", [PaperRecord("a1", "t", ("Ada Lovelace",), "s", "", "2025-01-01")])
+    assert ids(store.query()) == ["a1", "a2", "c1", "a3"]
@@ -0,0 +1,79 @@
+"""텍스트 청크 인덱스와 청크 단위 읽기를 확인한다."""
+import os
+
+import pytest
+
+from paper_store import PaperStore
+from paper_text import PaperTextService, build_chunk_index
+
+
+def pieces(data: bytes, chunks) -> list:
+    return [data[start:end] for start, end in chunks]
+
+
+def assert_covers(data: bytes, chunks, max_bytes: int) -> None:
+    """청크가 빈틈 없이 이어지고 각각 한도 안이며 UTF-8로 디코딩된다."""
+    assert chunks[0][0] == 0 and chunks[-1][1] == len(data)
+    assert all(end == start for (_, end), (start, _) in zip(chunks, chunks[1:]))
+    assert all(0 < end - start <= max_bytes for start, end in chunks)
+    for piece in pieces(data, chunks):
+        piece.decode("utf-8")
+
+
+def test_chunks_prefer_paragraph_then_line_boundaries():
+    data = b"first para\n\nsecond para\n\nthird line\nfourth"
+    chunks = build_chunk_index(data, max_bytes=25)
+    assert_covers(data, chunks, 25)
+    assert pieces(data, chunks) == [b"first para\n\nsecond para\n\n", b"third line\nfourth"]
+
+    data = b"no paragraphs here, only spaces between words"
+    chunks = build_chunk_index(data, max_bytes=16)
+    assert_covers(data, chunks, 16)
+    assert all(piece.endswith(b" ") for piece in pieces(data, chunks)[:-1])
+
+
+def test_chunks_never_split_utf8_characters():
+    data = "가나다라마바사아자차카타파하".encode("utf-8")
+    chunks = build_chunk_index(data, max_bytes=10)
+    assert_covers(data, chunks, 10)
+    assert b"".join(pieces(data, chunks)) == data
+
+
+def test_empty_text_has_no_chunks():
+    assert build_chunk_index(b"") == []
+
+
+@pytest.fixture
+def service(tmp_path):
+    return PaperTextService(PaperStore(str(tmp_path / "papers")))
+
+
+def put_text(service: PaperTextService, paper_id: str, text: str) -> None:
+    """다운로드와 추출을 건너뛰도록 추출된 텍스트를 바로 저장한다."""
+    digest = paper_id.encode().hex().ljust(64, "0")
+    os.makedirs(os.path.dirname(service.text_path(digest)), exist_ok=True)
+    with open(service.text_path(digest), "w", encoding="utf-8") as f:
+        f.write(text)
+    os.makedirs(service.pdf_dir, exist_ok=True)
+    service._save_digest(paper_id, digest)
+
+
+def test_get_chunk_reads_each_chunk(service):
+    text = "\n\n".join(f"문단 {i} " + "내용 " * 2000 for i in range(3))
+    put_text(service, "0001", text)
+
+    first, count = service.get_chunk("0001", 0)
+    assert count > 1
+    chunks = [first] + [service.get_chunk("0001", i)[0] for i in range(1, count)]
+    assert "".join(chunks) == text
+    assert all(len(chunk.encode("utf-8")) <= 8 * 1024 for chunk in chunks)
+
+    with pytest.raises(IndexError):
+        service.get_chunk("0001", count)
+    with pytest.raises(IndexError):
+        service.get_chunk("0001", -1)
+
+
+def test_get_chunk_of_unknown_paper(service):
+    with pytest.raises(KeyError):
+        service.get_chunk("missing", 0)
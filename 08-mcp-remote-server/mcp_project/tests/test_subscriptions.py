@@ -0,0 +1,71 @@
+"""다른 프로세스가 바꾼 주제도 구독자에게 알리는지 확인한다."""
+import asyncio
+
+import subscriptions
+from paper_store import PaperRecord, PaperStore
+from subscriptions import SubscriptionHub
+
+
+def record(paper_id: str) -> PaperRecord:
+    return PaperRecord(paper_id, "t", ("A",), "s", "", "2024-01-01")
+
+
+def test_poll_changes_reports_topics_written_elsewhere(tmp_path):
+    paper_dir = str(tmp_path / "papers")
+    reader, writer = PaperStore(paper_dir), PaperStore(paper_dir)
+    writer.add_papers("agents", [record("0001")])
+    changed = []
+    reader.listeners.append(changed.append)
+
+    # 처음 읽는 목록은 변경이 아니다
+    reader.poll_changes()
+    assert changed == []
+
+    writer.add_papers("agents", [record("0002")])
+    writer.add_papers("Compilers", [record("0003")])
+    reader.poll_changes()
+    assert changed == ["agent", "compiler"]
+
+    reader.poll_changes()
+    assert changed == ["agent", "compiler"]
+
+
+class Session:
+    def __init__(self):
+        self.updated = []
+
+    async def send_resource_updated(self, uri) -> None:
+        self.updated.append(str(uri))
+
+
+def test_hub_polls_while_subscribed(monkeypatch):
+    monkeypatch.setattr(subscriptions, "POLL_INTERVAL", 0.01)
+    hub = SubscriptionHub()
+    polls = []
+
+    def poll() -> None:
+        polls.append(1)
+        if len(polls) == 2:
+            hub.topic_changed("agent")
+
+    hub.watch(poll)
+    session = Session()
+
+    async def run():
+        hub.subscribe("papers://agents", session)
+        hub.subscribe("papers://compilers", session)
+        for _ in range(100):
+            if session.updated:
+                break
+            await asyncio.sleep(0.01)
+        hub.unsubscribe("papers://agents", session)
+        hub.unsubscribe("papers://compilers", session)
+        await asyncio.sleep(0.05)
+        stopped_at = len(polls)
+        await asyncio.sleep(0.05)
+        return stopped_at
+
+    stopped_at = asyncio.run(run())
+    assert session.updated == ["papers://agents"]
+    # 구독이 모두 풀리면 확인을 멈춘다
+    assert len(polls) == stopped_at
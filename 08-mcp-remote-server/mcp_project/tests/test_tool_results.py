@@ -0,0 +1,53 @@
+"""도구 결과를 가장 짧은 텍스트 형식으로 바꾸는지 확인한다."""
+import json
+
+import pytest
+from mcp import types
+
+import tool_results
+from tool_results import serialize_tool_result
+
+
+@pytest.fixture(autouse=True)
+def char_tokens(monkeypatch):
+    # tiktoken 설치 여부와 관계없이 글자 수를 토큰 수로 센다
+    monkeypatch.setattr(tool_results, "_encode", lambda text: range(len(text)))
+
+
+def result(text: str, structured=None) -> types.CallToolResult:
+    return types.CallToolResult(content=[types.TextContent(type="text", text=text)],
+                                structuredContent=structured)
+
+
+def test_plain_text_is_sent_as_is():
+    text, tokens, baseline = serialize_tool_result(result("no JSON here"))
+    assert (text, tokens, baseline) == ("no JSON here", 12, 12)
+
+
+def test_uniform_rows_become_a_table():
+    rows = [{"id": "a", "title": "First | paper"}, {"id": "b", "title": "Second\n paper"}]
+    original = json.dumps(rows, indent=2)
+    text, tokens, baseline = serialize_tool_result(result(original))
+    assert text == "id|title\na|First \\| paper\nb|Second paper"
+    assert (tokens, baseline) == (len(text), len(original))
+
+
+def test_structured_content_is_preferred_over_text():
+    data = {"count": 2, "papers": [{"id": "a", "authors": ["X", "Y"]}, {"id": "b", "authors": ["Z"]}]}
+    # 텍스트 내용이 JSON이 아니어도 structuredContent로 표를 만든다
+    original = "count=2 papers=" + repr(data["papers"])
+    text, _, baseline = serialize_tool_result(result(original, data))
+    assert text == "count: 2\npapers:\nid|authors\na|X; Y\nb|Z"
+    assert baseline == len(original)
+
+
+def test_mixed_rows_use_compact_json():
+    rows = [{"a": 1}, {"b": [1, 2]}]
+    text, tokens, _ = serialize_tool_result(result(json.dumps(rows, indent=2)))
+    assert text == '[{"a":1},{"b":[1,2]}]'
+    assert tokens == len(text)
+
+
+def test_shortest_original_is_kept():
+    text, tokens, baseline = serialize_tool_result(result("ok", {"status": "ok"}))
+    assert (text, tokens, baseline) == ("ok", 2, 2)
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import os
+import json
+import time
+import asyncio
+import hashlib
+from email.utils import parsedate_to_datetime
+from typing import TYPE_CHECKING, Awaitable, Callable, Dict, Optional, Tuple
+
+import metrics
+from disk_cache import DiskCache
+
+if TYPE_CHECKING:
+    from mcp import types
+
+HTTP_CACHE_DIR = os.getenv("MCP_HTTP_CACHE_DIR", os.path.join(".mcp_cache", "http"))
+HTTP_CACHE_MAX_BYTES = int(os.getenv("MCP_HTTP_CACHE_MAX_BYTES", str(512 * 1024 * 1024)))
+# Last-Modified만 있을 때 추정하는 신선도 시간의 상한(초)
+HEURISTIC_MAX_AGE = 24 * 60 * 60
+# 도구 결과 _meta에서 원본 응답 헤더(ETag, Cache-Control 등)를 담는 키
+HEADERS_META_KEY = "http/headers"
+
+ToolCall = Callable[[], Awaitable["types.CallToolResult"]]
+
+
+def _cache_control(value: str) -> Dict[str, Optional[str]]:
+    directives: Dict[str, Optional[str]] = {}
+    for part in value.split(","):
+        name, _, arg = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = arg.strip('"') if arg else None
+    return directives
+
+
+def _http_date(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def freshness_lifetime(headers: Dict[str, str], now: float) -> Optional[float]:
+    """
+    응답 헤더로 캐시 항목이 신선한 시간(초)을 구한다. 저장하면 안 되는 응답이면 None.
+
+    Cache-Control의 no-store, no-cache, max-age를 먼저 보고, 없으면 Expires,
+    그다음 Last-Modified로부터 지난 시간의 10%(HEURISTIC_MAX_AGE 이하)를 쓴다.
+    """
+    directives = _cache_control(headers.get("cache-control", ""))
+    if "no-store" in directives:
+        return None
+    if "no-cache" in directives:
+        return 0.0
+    date = _http_date(headers.get("date")) or now
+    if directives.get("max-age") is not None:
+        try:
+            age = float(headers.get("age", 0))
+        except ValueError:
+            age = 0.0
+        try:
+            return max(float(directives["max-age"]) - age, 0.0)
+        except ValueError:
+            return 0.0
+    expires = _http_date(headers.get("expires"))
+    if expires is not None:
+        return max(expires - date, 0.0)
+    last_modified = _http_date(headers.get("last-modified"))
+    if last_modified is not None:
+        return min(max(date - last_modified, 0.0) * 0.1, HEURISTIC_MAX_AGE)
+    return 0.0
+
+
+def _result_headers(result: "types.CallToolResult") -> Optional[Dict[str, str]]:
+    """도구 결과 _meta에 담긴 원본 응답 헤더 (소문자 이름). 없으면 None"""
+    headers = (result.meta or {}).get(HEADERS_META_KEY)
+    if not isinstance(headers, dict):
+        return None
+    return {str(k).lower(): str(v) for k, v in headers.items()}
+
+
+class HttpToolCache:
+    """
+    URL을 받는 도구(fetch 등)의 결과를 HTTP 캐시 규칙에 따라 디스크에 저장하고 재사용한다.
+
+    ETag, Last-Modified와 신선도(max-age 등)는 도구 결과의 _meta["http/headers"]에
+    담긴 원본 응답 헤더로 정한다. 신선한 항목은 도구를 부르지 않고 돌려주고, 신선도가
+    지난 항목은 도구를 다시 호출한다.
+
+    revalidate=True이면 헤더를 알려 주지 않는 도구의 결과도 같은 URL로 HEAD 요청을
+    보내 검증자를 얻어 저장하고, 신선도가 지난 항목은 조건부 HEAD(If-None-Match,
+    If-Modified-Since)로 확인해 304이면 그대로 재사용한다. HEAD는 챗봇이 URL로 직접
+    보내므로 도구 서버의 프록시, User-Agent, robots.txt 확인을 거치지 않는다. 그래서
+    서버 설정에 "cache_revalidate": true를 둔 서버에만 켠다.
+
+    항목은 DiskCache에 도구 이름과 인자의 해시별로 저장하므로 여러 챗봇 프로세스가
+    같은 디렉토리를 공유해도 된다.
+    """
+
+    def __init__(self, cache_dir: str = HTTP_CACHE_DIR, max_bytes: int = HTTP_CACHE_MAX_BYTES,
+                 timeout: float = 10.0, revalidate: bool = False):
+        self.cache = DiskCache(cache_dir, max_bytes)
+        self.timeout = timeout
+        self.revalidate = revalidate
+
+    def _key(self, name: str, args: Dict) -> str:
+        payload = json.dumps([name, args], sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def _head(self, url: str, headers: Optional[Dict[str, str]] = None) -> Tuple[Optional[int], Dict[str, str]]:
+        """HEAD 요청의 상태 코드와 (소문자 이름의) 응답 헤더. 실패하면 (None, {})"""
+        import httpx
+
+        try:
+            async with httpx.AsyncClient(timeout=self.timeout, follow_redirects=True) as client:
+                response = await client.head(url, headers=headers)
+        except httpx.HTTPError:
+            return None, {}
+        return response.status_code, {k.lower(): v for k, v in response.headers.items()}
+
+    def _entry(self, url: str, headers: Dict[str, str], result: Dict, now: float) -> Optional[Dict]:
+        max_age = freshness_lifetime(headers, now)
+        etag, last_modified = headers.get("etag"), headers.get("last-modified")
+        # 신선도도 검증자도 없으면 다음 호출에 쓸 수 없으므로 저장하지 않는다
+        if max_age is None or (max_age <= 0 and not etag and not last_modified):
+            return None
+        return {"url": url, "etag": etag, "last_modified": last_modified,
+                "stored_at": now, "max_age": max_age, "result": result}
+
+    async def _revalidate(self, entry: Dict) -> bool:
+        """조건부 HEAD로 저장한 응답이 아직 유효한지 확인하고, 유효하면 신선도를 갱신한다"""
+        conditions = {}
+        if entry.get("etag"):
+            conditions["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            conditions["If-Modified-Since"] = entry["last_modified"]
+        if not conditions:
+            return False
+        status, headers = await self._head(entry["url"], conditions)
+        # 조건부 요청을 무시하는 서버도 ETag가 같으면 바뀌지 않은 것으로 본다
+        unchanged = status == 304 or (status == 200 and entry.get("etag")
+                                       and headers.get("etag") == entry["etag"])
+        if not unchanged:
+            return False
+        max_age = freshness_lifetime(headers, time.time()) if headers.get("cache-control") else None
+        entry["stored_at"] = time.time()
+        if max_age is not None:
+            entry["max_age"] = max_age
+        entry["etag"] = headers.get("etag", entry.get("etag"))
+        entry["last_modified"] = headers.get("last-modified", entry.get("last_modified"))
+        return True
+
+    async def call(self, name: str, args: Dict, call_tool: ToolCall) -> types.CallToolResult:
+        """캐시에 있으면 저장한 결과를, 없으면 call_tool()의 결과를 저장하고 반환한다"""
+        from mcp import types
+
+        url = args.get("url")
+        if not isinstance(url, str) or not url.startswith(("http://", "https://")):
+            return await call_tool()
+
+        key = self._key(name, args)
+        entry = await asyncio.to_thread(self.cache.load, key)
+        if entry is not None:
+            fresh = time.time() - entry["stored_at"] < entry["max_age"]
+            if fresh or (self.revalidate and await self._revalidate(entry)):
+                if not fresh:
+                    await asyncio.to_thread(self.cache.store, key, entry)
+                metrics.http_cache_lookups.inc(result="fresh" if fresh else "not_modified")
+                metrics.record_cache("http", True)
+                return types.CallToolResult.model_validate(entry["result"])
+            metrics.http_cache_lookups.inc(result="changed")
+        metrics.record_cache("http", False)
+
+        result = await call_tool()
+        if result.isError:
+            return result
+        headers = _result_headers(result)
+        if headers is None:
+            if not self.revalidate:
+                return result
+            # 도구가 원본 응답 헤더를 알려 주지 않을 때만 HEAD로 검증자를 얻는다
+            status, headers = await self._head(url)
+            if status is None or status >= 400:
+                return result
+        entry = self._entry(url, headers, result.model_dump(mode="json", by_alias=True), time.time())
+        if entry is not None:
+            await asyncio.to_thread(self.cache.store, key, entry)
+        return result
+
+
+# server_config.json의 "cache" 값 -> 도구 결과 캐시
+TOOL_CACHES = {"http": HttpToolCache}
+
+
+def create_tool_cache(kind: str, revalidate: bool = False):
+    """서버 설정의 "cache" 값에 맞는 도구 결과 캐시를 만든다 ("cache_revalidate"는 HEAD 재검증)"""
+    if kind not in TOOL_CACHES:
+        raise ValueError(f"알 수 없는 도구 캐시: {kind}")
+    return TOOL_CACHES[kind](revalidate=revalidate)
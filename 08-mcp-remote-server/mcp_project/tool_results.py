@@ -0,0 +1,83 @@
+import json
+from typing import Any, Callable, List, Optional, Tuple
+
+_encode: Optional[Callable[[str], list]] = None
+
+
+def count_tokens(text: str) -> int:
+    """
+    모델 토큰 수를 센다.
+
+    tiktoken이 설치되어 있으면 gpt-4o 계열 인코딩(o200k_base)으로 세고, 없으면
+    UTF-8 4바이트당 1토큰으로 어림한다.
+    """
+    global _encode
+    if _encode is None:
+        try:
+            import tiktoken
+            _encode = tiktoken.get_encoding("o200k_base").encode
+        except ImportError:
+            _encode = lambda s: range((len(s.encode("utf-8")) + 3) // 4)
+    return len(_encode(text))
+
+
+def _cell(value: Any) -> str:
+    if isinstance(value, list) and all(not isinstance(v, (dict, list)) for v in value):
+        text = "; ".join(str(v) for v in value)
+    elif isinstance(value, (dict, list)):
+        text = json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+    else:
+        text = "" if value is None else str(value)
+    return " ".join(text.split()).replace("|", "\\|")
+
+
+def _is_table(value: Any) -> bool:
+    return (isinstance(value, list) and len(value) > 1
+            and all(isinstance(row, dict) for row in value)
+            and len({tuple(row) for row in value}) == 1)
+
+
+def _table(rows: List[dict]) -> str:
+    columns = list(rows[0])
+    lines = ["|".join(columns)]
+    lines.extend("|".join(_cell(row[c]) for c in columns) for row in rows)
+    return "\n".join(lines)
+
+
+def _render(value: Any) -> str:
+    """같은 키를 가진 dict 목록은 머리글 한 줄과 값 행으로 된 표로 바꾼다."""
+    if _is_table(value):
+        return _table(value)
+    if isinstance(value, dict):
+        lines = []
+        for key, item in value.items():
+            if _is_table(item):
+                lines.append(f"{key}:\n{_table(item)}")
+            else:
+                lines.append(f"{key}: {_cell(item)}")
+        return "\n".join(lines)
+    return _cell(value)
+
+
+def serialize_tool_result(result) -> Tuple[str, int, int]:
+    """
+    도구 결과를 모델에 보낼 가장 짧은 텍스트로 바꾼다.
+
+    structuredContent가 있으면 그것을, 없으면 텍스트 내용을 JSON으로 읽을 수 있을 때
+    그 값을 후보로 삼아 공백 없는 JSON과 표 형식 중 토큰이 적은 쪽을 고른다.
+    반환값은 (텍스트, 토큰 수, 원래 텍스트 내용을 그대로 보냈을 때의 토큰 수)이다.
+    """
+    original = "\n".join(getattr(item, "text", None) or str(item) for item in result.content)
+    baseline = count_tokens(original)
+
+    data = result.structuredContent
+    if data is None:
+        try:
+            data = json.loads(original)
+        except ValueError:
+            return original, baseline, baseline
+
+    candidates = [original, json.dumps(data, ensure_ascii=False, separators=(",", ":")), _render(data)]
+    measured = [(count_tokens(text), text) for text in candidates]
+    tokens, text = min(measured, key=lambda pair: pair[0])
+    return text, tokens, baseline
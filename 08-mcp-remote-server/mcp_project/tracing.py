@@ -0,0 +1,235 @@
+import os
+import json
+import time
+import queue
+import atexit
+import secrets
+import threading
+import functools
+import inspect
+import urllib.request
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional
+
+# MCP 요청 _meta에 추적 컨텍스트를 실어 보낼 때 쓰는 키 (W3C Trace Context 형식)
+TRACEPARENT_KEY = "traceparent"
+
+
+@dataclass
+class Span:
+    """하나의 작업 구간. OpenTelemetry 스팬과 같은 식별자 체계를 쓴다."""
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: int = 0
+    attributes: Dict[str, object] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def set_attribute(self, key: str, value: object) -> None:
+        self.attributes[key] = value
+
+
+def parse_traceparent(value: Optional[str]) -> Optional[tuple]:
+    """traceparent 헤더 값에서 (trace_id, parent_span_id)를 꺼낸다."""
+    if not value:
+        return None
+    parts = value.split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    return parts[1], parts[2]
+
+
+class FileExporter:
+    """완료된 스팬을 한 줄에 하나씩 JSON으로 기록한다."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def export(self, span: Span, service_name: str) -> None:
+        line = json.dumps({
+            "service": service_name,
+            "name": span.name,
+            "trace_id": span.trace_id,
+            "span_id": span.span_id,
+            "parent_id": span.parent_id,
+            "start_ns": span.start_ns,
+            "duration_ms": round((span.end_ns - span.start_ns) / 1e6, 3),
+            "attributes": span.attributes,
+            "error": span.error,
+        }, ensure_ascii=False, default=str)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+class OtlpHttpExporter:
+    """
+    완료된 스팬을 모아 OTLP/HTTP(JSON) 수집기로 보낸다.
+
+    전송은 백그라운드 스레드에서 일괄 처리하므로 요청 경로를 막지 않는다.
+    """
+
+    def __init__(self, endpoint: str, batch_size: int = 256, interval: float = 2.0):
+        self.url = endpoint.rstrip("/") + "/v1/traces"
+        self.batch_size = batch_size
+        self.interval = interval
+        self._queue: "queue.Queue[tuple]" = queue.Queue(maxsize=10000)
+        threading.Thread(target=self._run, daemon=True).start()
+        atexit.register(self.flush)
+
+    def export(self, span: Span, service_name: str) -> None:
+        try:
+            self._queue.put_nowait((span, service_name))
+        except queue.Full:
+            pass
+
+    def _run(self) -> None:
+        while True:
+            time.sleep(self.interval)
+            self.flush()
+
+    def flush(self) -> None:
+        batch: List[tuple] = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if batch:
+            self._send(batch)
+
+    def _send(self, batch: List[tuple]) -> None:
+        by_service: Dict[str, list] = {}
+        for span, service_name in batch:
+            by_service.setdefault(service_name, []).append({
+                "traceId": span.trace_id,
+                "spanId": span.span_id,
+                "parentSpanId": span.parent_id or "",
+                "name": span.name,
+                "kind": 1,
+                "startTimeUnixNano": str(span.start_ns),
+                "endTimeUnixNano": str(span.end_ns),
+                "attributes": [
+                    {"key": k, "value": {"stringValue": str(v)}} for k, v in span.attributes.items()
+                ],
+                "status": {"code": 2, "message": span.error} if span.error else {"code": 1},
+            })
+        payload = {"resourceSpans": [
+            {
+                "resource": {"attributes": [
+                    {"key": "service.name", "value": {"stringValue": service_name}}
+                ]},
+                "scopeSpans": [{"scope": {"name": "mcp-project"}, "spans": spans}],
+            }
+            for service_name, spans in by_service.items()
+        ]}
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps(payload).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+        try:
+            urllib.request.urlopen(request, timeout=5).close()
+        except OSError as e:
+            print(f"Trace export failed: {e}")
+
+
+class Tracer:
+    """
+    프로세스 단위 추적기.
+
+    내보내기 대상이 설정되지 않으면 span()은 아무 것도 기록하지 않으므로
+    계측 코드를 그대로 두어도 비용이 거의 없다.
+    """
+
+    def __init__(self):
+        self.service_name = "mcp-project"
+        self.exporter = None
+        self._current: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def configure(self, service_name: str, exporter=None) -> None:
+        """
+        서비스 이름과 내보내기 대상을 설정한다.
+
+        exporter를 주지 않으면 환경 변수에서 읽는다:
+        OTEL_EXPORTER_OTLP_ENDPOINT가 있으면 OTLP 수집기로, TRACE_FILE이 있으면 파일로 보낸다.
+        """
+        self.service_name = os.getenv("OTEL_SERVICE_NAME", service_name)
+        if exporter is None:
+            if os.getenv("OTEL_EXPORTER_OTLP_ENDPOINT"):
+                exporter = OtlpHttpExporter(os.environ["OTEL_EXPORTER_OTLP_ENDPOINT"])
+            elif os.getenv("TRACE_FILE"):
+                exporter = FileExporter(os.environ["TRACE_FILE"])
+        self.exporter = exporter
+
+    def current_traceparent(self) -> Optional[str]:
+        span = self._current.get()
+        return span.traceparent if span else None
+
+    @contextmanager
+    def span(self, name: str, attributes: Optional[Dict[str, object]] = None,
+             traceparent: Optional[str] = None) -> Iterator[Optional[Span]]:
+        """
+        현재 컨텍스트 아래에 스팬을 연다.
+
+        traceparent를 주면 다른 프로세스에서 전달받은 스팬을 부모로 삼는다.
+        """
+        if not self.enabled:
+            yield None
+            return
+
+        parent = self._current.get()
+        remote = parse_traceparent(traceparent) if parent is None else None
+        if parent:
+            trace_id, parent_id = parent.trace_id, parent.span_id
+        elif remote:
+            trace_id, parent_id = remote
+        else:
+            trace_id, parent_id = secrets.token_hex(16), None
+
+        span = Span(name, trace_id, secrets.token_hex(8), parent_id, attributes=dict(attributes or {}))
+        token = self._current.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            self._current.reset(token)
+            span.end_ns = time.time_ns()
+            self.exporter.export(span, self.service_name)
+
+    def wrap(self, name: str, fn: Callable,
+             traceparent: Optional[Callable[[], Optional[str]]] = None) -> Callable:
+        """함수 호출 전체를 스팬으로 감싼다. 동기/비동기 함수를 모두 지원한다."""
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                parent = traceparent() if traceparent and self.enabled else None
+                with self.span(name, traceparent=parent):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            parent = traceparent() if traceparent and self.enabled else None
+            with self.span(name, traceparent=parent):
+                return fn(*args, **kwargs)
+        return wrapper
+
+
+# 프로세스 전체에서 공유하는 추적기
+tracer = Tracer()